@@ -1,7 +1,12 @@
-from flask import Flask, g
+from flask import Flask, jsonify
 from app.extensions import db, cors, swagger
+from app.utils.db_pool import build_engine_options, pool_stats
+from app.utils.engine_facts import init_engine_facts
+from app.utils.json_provider import FastJSONProvider
+from app.utils.metrics import register_stats
+from app.utils.scheduler import PeriodicJob
+from app.cli import register_commands
 from config import config
-from sqlalchemy.exc import InvalidRequestError
 from flask_migrate import Migrate
 
 migrate = Migrate()
@@ -9,6 +14,7 @@ migrate = Migrate()
 def create_app(config_name="default"):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    app.json = FastJSONProvider(app)
 
     # Set Swagger config BEFORE init_app
     app.config["SWAGGER"] = {
@@ -31,25 +37,23 @@ def create_app(config_name="default"):
     # Register extensions (db, swagger, etc)
     register_extensions(app)
 
-    # before_request hook
-    @app.before_request
-    def detect_db_dialect():
-        try:
-            bind = db.session.get_bind()
-            if bind:
-                g.db_dialect = bind.dialect.name
-            else:
-                g.db_dialect = None
-        except InvalidRequestError:
-            g.db_dialect = None
-
-    # Register blueprints
+    # Configure service-level caches
+    register_services(app)
+
+    # Register blueprints and error handlers
     register_blueprints(app)
+    register_error_handlers(app)
+
+    # Register CLI commands and background jobs
+    register_commands(app)
+    register_jobs(app)
 
     return app
 
 def register_extensions(app):
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = build_engine_options(app.config)
     db.init_app(app)
+    init_engine_facts(app)
     migrate.init_app(app, db)
     swagger.init_app(app)
 
@@ -57,6 +61,78 @@ def register_extensions(app):
         with app.app_context():
             db.create_all()
 
+def register_services(app):
+    register_stats("db_pool", lambda: pool_stats(db.engine))
+
+    from app.services.password_service import PasswordService
+    PasswordService.init_app(app)
+    register_stats("password_hashing", PasswordService.stats)
+
+    from app.services.mail_service import MailService
+    MailService.init_app(app)
+    register_stats("mail", MailService.stats)
+
+    from app.services.rate_limit_service import RateLimitService
+    RateLimitService.init_app(app)
+    register_stats("rate_limits", RateLimitService.stats)
+
+    from app.services.auth_service import AuthService
+    AuthService.init_app(app)
+    register_stats("decoded_tokens", AuthService.token_cache_stats)
+
+    from app.services.token_blocklist_service import TokenBlocklistService
+    TokenBlocklistService.init_app(app)
+    register_stats("token_blocklist", TokenBlocklistService.stats)
+
+    from app.services.permission_resolver_service import PermissionResolverService
+    PermissionResolverService.init_app(app)
+    register_stats("permission_resolver", PermissionResolverService.stats)
+
+    from app.services.endpoint_permission_service import EndpointPermissionService
+    EndpointPermissionService.init_app(app)
+    register_stats("endpoint_permissions", EndpointPermissionService.stats)
+
 def register_blueprints(app):
     from app.api import api_bp
     app.register_blueprint(api_bp, url_prefix="/api")
+
+def register_error_handlers(app):
+    from app.services.password_service import PasswordHashingBusy
+    from app.services.rate_limit_service import RateLimitExceeded
+
+    @app.errorhandler(PasswordHashingBusy)
+    def password_hashing_busy(e):
+        response = jsonify({"status": "error", "message": str(e)})
+        response.headers["Retry-After"] = str(e.retry_after)
+        return response, 503
+
+    @app.errorhandler(RateLimitExceeded)
+    def rate_limit_exceeded(e):
+        response = jsonify({"status": "error", "message": str(e)})
+        response.headers["Retry-After"] = str(e.retry_after)
+        return response, 429
+
+def register_jobs(app):
+    interval = app.config.get("BLOCKLIST_PURGE_INTERVAL", 0)
+    if interval and not app.config.get("TESTING"):
+        from app.services.token_blocklist_service import TokenBlocklistService
+        batch_size = app.config["BLOCKLIST_PURGE_BATCH_SIZE"]
+        job = PeriodicJob(
+            app,
+            lambda: TokenBlocklistService.purge_expired(batch_size=batch_size),
+            interval,
+            name="blocklist-purge"
+        )
+        job.start()
+        app.extensions["blocklist_purge_job"] = job
+
+    if app.config.get("REVOCATION_BLOOM_ENABLED", True) and not app.config.get("TESTING"):
+        from app.services.token_blocklist_service import TokenBlocklistService
+        job = PeriodicJob(
+            app,
+            TokenBlocklistService.refresh_bloom_filter,
+            app.config.get("REVOCATION_BLOOM_SYNC_SECONDS", 20),
+            name="blocklist-bloom"
+        )
+        job.start()
+        app.extensions["blocklist_bloom_job"] = job
@@ -10,3 +10,4 @@ from app.api.v1 import permission_routes  # This ensures the routes in permissio
 from app.api.v1 import user_roles # This ensures the routes in user_roles.py get registered
 from app.api.v1 import role_permissions # This ensures the routes in role_permissions.py get registered
 from app.api.v1 import endpoint_permission_route
+from app.api.v1 import metrics
@@ -1,40 +1,94 @@
-from flask import request, jsonify
+from flask import request, jsonify, current_app
 from app.api.v1 import api_v1_bp
 from app.services.auth_service import AuthService
+from app.services.endpoint_permission_service import EndpointPermissionService
+from app.services.permission_resolver_service import PermissionResolverService
+from app.services.password_service import PasswordHashingBusy
+from app.services.rate_limit_service import RateLimitService
 from functools import wraps
 import os
 
+def authenticate_request():
+    """Validate the bearer access token; returns (payload, None) or (None, error response)."""
+    token = None
+    
+    # Get token from headers
+    if 'Authorization' in request.headers:
+        auth_header = request.headers['Authorization']
+        if auth_header.startswith('Bearer '):
+            token = auth_header.split(' ')[1]
+    
+    if not token:
+        return None, (jsonify({"status": "error", "message": "Token is missing"}), 401)
+    
+    # Validate token
+    payload = AuthService.validate_token(token)
+    if not payload:
+        return None, (jsonify({"status": "error", "message": "Invalid or expired token"}), 401)
+    
+    # Check token type
+    if payload.get('type') != 'access':
+        return None, (jsonify({"status": "error", "message": "Invalid token type"}), 401)
+    
+    # Add user_id to request, plus role ids when current claims carry them
+    request.user_id = int(payload.get('sub'))
+    request.role_ids = AuthService.trusted_role_ids(payload)
+    
+    return payload, None
+
 # Authentication middleware
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        
-        # Get token from headers
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            if auth_header.startswith('Bearer '):
-                token = auth_header.split(' ')[1]
-        
-        if not token:
-            return jsonify({"status": "error", "message": "Token is missing"}), 401
-        
-        # Validate token
-        payload = AuthService.validate_token(token)
-        if not payload:
-            return jsonify({"status": "error", "message": "Invalid or expired token"}), 401
-        
-        # Check token type
-        if payload.get('type') != 'access':
-            return jsonify({"status": "error", "message": "Invalid token type"}), 401
-        
-        # Add user_id to request
-        request.user_id = payload.get('sub')
+        payload, error = authenticate_request()
+        if error:
+            return error
         
         return f(*args, **kwargs)
     
     return decorated
 
+# Rate limiting middleware
+@api_v1_bp.before_request
+def enforce_rate_limits():
+    """Count the request against RATE_LIMITS for this endpoint, before any expensive work."""
+    if not request.endpoint:
+        return None
+    
+    endpoint_name = request.endpoint.rsplit('.', 1)[-1]
+    if not RateLimitService.is_limited(endpoint_name):
+        return None
+    
+    data = request.get_json(silent=True)
+    email = data.get('email') if isinstance(data, dict) else None
+    account = email.strip().lower() if isinstance(email, str) else None
+    
+    # Raises RateLimitExceeded, rendered as 429 with Retry-After
+    RateLimitService.check(endpoint_name, request.remote_addr, account)
+    return None
+
+# Authorization middleware
+@api_v1_bp.before_request
+def enforce_endpoint_permissions():
+    """Require the permission mapped to this endpoint in endpoint_permissions, if any."""
+    if not current_app.config.get("ENFORCE_ENDPOINT_PERMISSIONS", True) or not request.endpoint:
+        return None
+    
+    # Blueprint endpoints are prefixed ("api.api_v1.get_users"); the map is keyed by the bare name
+    endpoint_name = request.endpoint.rsplit('.', 1)[-1]
+    required_permission = EndpointPermissionService.get_required_permission(endpoint_name)
+    if required_permission is None:
+        return None
+    
+    payload, error = authenticate_request()
+    if error:
+        return error
+    
+    if not PermissionResolverService.has_permission(request.user_id, required_permission, request.role_ids):
+        return jsonify({"status": "error", "message": f"Missing required permission: {required_permission}"}), 403
+    
+    return None
+
 # Auth endpoints
 @api_v1_bp.route("/auth/register", methods=["POST"], endpoint="register_user")
 def register():
@@ -57,6 +111,8 @@ def register():
         
         return jsonify(response), status_code
         
+    except PasswordHashingBusy:
+        raise
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -80,6 +136,8 @@ def login():
         
         return jsonify(response), status_code
         
+    except PasswordHashingBusy:
+        raise
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -139,6 +197,8 @@ def reset_password():
         
         return jsonify(response), status_code
         
+    except PasswordHashingBusy:
+        raise
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -177,6 +237,21 @@ def logout():
     response, status_code = AuthService.logout(token)
     return jsonify(response), status_code
 
+@api_v1_bp.route("/auth/logout-all", methods=["POST"], endpoint="logout_all_sessions")
+@token_required
+def logout_all():
+    """Revoke every claims-mode token issued to the current user; 409 when claims mode is off."""
+    response, status_code = AuthService.revoke_user_tokens(request.user_id)
+    return jsonify(response), status_code
+
+@api_v1_bp.route("/auth/.well-known/jwks.json", methods=["GET"], endpoint="get_jwks")
+def get_jwks():
+    """Publish the public keys used to sign tokens."""
+    response = jsonify(AuthService.get_jwks())
+    response.cache_control.public = True
+    response.cache_control.max_age = 300
+    return response, 200
+
 # Protected route example
 @api_v1_bp.route("/auth/me", methods=["GET"], endpoint="get_me")
 @token_required
@@ -1,16 +1,34 @@
 from flask import request, jsonify
 from app.api.v1 import api_v1_bp
 from app.services.endpoint_permission_service import EndpointPermissionService
+from app.utils.etag import conditional_response, make_etag
+from app.utils.pagination import PaginationError, PAGINATION_SWAGGER_PARAMS, parse_list_args
+from app.utils.streaming import ndjson_response, wants_ndjson
 from flasgger import swag_from
 
 # ---- EndpointPermission Endpoints ----
 
 @api_v1_bp.route("/endpoint-permissions", methods=["GET"], endpoint="get_endpoint_permissions")
-@swag_from({'tags': ['Endpoint Permissions'], 'responses': {200: {'description': 'List all endpoint permissions'}}})
+@swag_from({
+    'tags': ['Endpoint Permissions'],
+    'parameters': PAGINATION_SWAGGER_PARAMS + [
+        {'name': 'endpoint_name', 'in': 'query', 'type': 'string', 'required': False},
+        {'name': 'permission_id', 'in': 'query', 'type': 'integer', 'required': False}
+    ],
+    'responses': {200: {'description': 'List one page of endpoint permissions'}, 304: {'description': 'Not modified since the ETag in If-None-Match'}}
+})
 def get_endpoint_permissions():
     try:
-        endpoint_permissions = EndpointPermissionService.get_all_endpoint_permissions()
-        return jsonify({"status": "success", "data": endpoint_permissions}), 200
+        args = parse_list_args(request.args, EndpointPermissionService.LIST_FILTERS, EndpointPermissionService.LIST_FIELDS)
+        if wants_ndjson():
+            return ndjson_response(EndpointPermissionService.export_endpoint_permissions(args["cursor"], args["filters"], args["fields"]))
+        etag = make_etag("get_endpoint_permissions", EndpointPermissionService.get_endpoint_permissions_version(), request.query_string)
+        def build():
+            page = EndpointPermissionService.get_all_endpoint_permissions(**args)
+            return jsonify({"status": "success", "data": page["items"], "pagination": page["pagination"]}), 200
+        return conditional_response(etag, build)
+    except PaginationError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
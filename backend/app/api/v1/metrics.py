@@ -0,0 +1,16 @@
+from flask import jsonify
+from app.api.v1 import api_v1_bp
+from app.api.v1.auth import token_required
+from app.utils.metrics import collect_stats
+from flasgger import swag_from
+
+# ---- Metrics Endpoints ----
+
+@api_v1_bp.route("/metrics", methods=["GET"], endpoint="get_metrics")
+@swag_from({'tags': ['Metrics'], 'responses': {200: {'description': 'In-process cache and pool statistics'}}})
+@token_required
+def get_metrics():
+    try:
+        return jsonify({"status": "success", "data": collect_stats()}), 200
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
@@ -1,16 +1,33 @@
 from flask import request, jsonify
 from app.api.v1 import api_v1_bp
 from app.services.permission_service import PermissionService
+from app.utils.etag import conditional_response, make_etag
+from app.utils.pagination import PaginationError, PAGINATION_SWAGGER_PARAMS, parse_list_args
+from app.utils.streaming import ndjson_response, wants_ndjson
 from flasgger import swag_from
 
 # ---- Permissions Endpoints ----
 
 @api_v1_bp.route("/permissions", methods=["GET"], endpoint="get_permissions")
-@swag_from({'tags': ['Permissions'], 'responses': {200: {'description': 'List all permissions'}}})
+@swag_from({
+    'tags': ['Permissions'],
+    'parameters': PAGINATION_SWAGGER_PARAMS + [
+        {'name': 'name', 'in': 'query', 'type': 'string', 'required': False}
+    ],
+    'responses': {200: {'description': 'List one page of permissions'}, 304: {'description': 'Not modified since the ETag in If-None-Match'}}
+})
 def get_permissions():
     try:
-        permissions = PermissionService.get_all_permissions()
-        return jsonify({"status": "success", "data": permissions}), 200
+        args = parse_list_args(request.args, PermissionService.LIST_FILTERS, PermissionService.LIST_FIELDS)
+        if wants_ndjson():
+            return ndjson_response(PermissionService.export_permissions(args["cursor"], args["filters"], args["fields"]))
+        etag = make_etag("get_permissions", PermissionService.get_permissions_version(), request.query_string)
+        def build():
+            page = PermissionService.get_all_permissions(**args)
+            return jsonify({"status": "success", "data": page["items"], "pagination": page["pagination"]}), 200
+        return conditional_response(etag, build)
+    except PaginationError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
     
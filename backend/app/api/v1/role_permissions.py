@@ -1,29 +1,41 @@
 from flask import request, jsonify
 from app.api.v1 import api_v1_bp
 from app.services.role_permission_service import RolePermissionService
+from app.utils.pagination import PaginationError, PAGINATION_SWAGGER_PARAMS, parse_list_args
+from app.utils.streaming import ndjson_response, wants_ndjson
 from flasgger import swag_from
 
 
 @api_v1_bp.route("/role-permissions", methods=["GET"], endpoint="get_role_permissions")
 @swag_from({
     'tags': ['RolePermissions'],
+    'parameters': PAGINATION_SWAGGER_PARAMS + [
+        {'name': 'role_id', 'in': 'query', 'type': 'integer', 'required': False},
+        {'name': 'permission_id', 'in': 'query', 'type': 'integer', 'required': False}
+    ],
     'responses': {
         200: {
-            'description': 'List all role-permission assignments',
+            'description': 'List one page of role-permission assignments',
             'examples': {
                 'application/json': {
                     "status": "success",
-                    "data": []
+                    "data": [],
+                    "pagination": {"limit": 100, "has_more": False, "next_cursor": None}
                 }
             }
         }
     }
 })
 def get_role_permissions():
-    """Get all role-permission assignments"""
+    """Get one page of role-permission assignments"""
     try:
-        assignments = RolePermissionService.get_all_role_permissions()
-        return jsonify({"status": "success", "data": assignments}), 200
+        args = parse_list_args(request.args, RolePermissionService.LIST_FILTERS, RolePermissionService.LIST_FIELDS)
+        if wants_ndjson():
+            return ndjson_response(RolePermissionService.export_role_permissions(args["cursor"], args["filters"], args["fields"]))
+        page = RolePermissionService.get_all_role_permissions(**args)
+        return jsonify({"status": "success", "data": page["items"], "pagination": page["pagination"]}), 200
+    except PaginationError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -47,7 +59,8 @@ def get_role_permissions():
     ],
     'responses': {
         201: {'description': 'Permission assigned to role'},
-        400: {'description': 'Missing fields or invalid input'}
+        400: {'description': 'Missing fields, unknown ids or invalid input'},
+        409: {'description': 'Permission already assigned to role'}
     }
 })
 def assign_permission_to_role():
@@ -58,7 +71,11 @@ def assign_permission_to_role():
             return jsonify({"status": "error", "message": "role_id and permission_id required"}), 400
 
         assignment = RolePermissionService.assign_permission_to_role(data['role_id'], data['permission_id'])
+        if assignment is None:
+            return jsonify({"status": "error", "message": "Permission already assigned to role"}), 409
         return jsonify({"status": "success", "data": assignment}), 201
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -103,4 +120,46 @@ def remove_permission_from_role():
 
         return jsonify({"status": "success", "message": "Permission removed from role"}), 200
     except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
\ No newline at end of file
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@api_v1_bp.route("/roles/<int:role_id>/permissions", methods=["PUT"], endpoint="set_role_permissions")
+@swag_from({
+    'tags': ['RolePermissions'],
+    'parameters': [
+        {'name': 'role_id', 'in': 'path', 'type': 'integer', 'required': True, 'description': 'ID of the role'},
+        {
+            'name': 'body',
+            'in': 'body',
+            'schema': {
+                'type': 'object',
+                'required': ['permission_ids'],
+                'properties': {
+                    'permission_ids': {'type': 'array', 'items': {'type': 'integer'}}
+                }
+            }
+        }
+    ],
+    'responses': {
+        200: {'description': 'The role now has exactly these permissions; returns what was added and removed'},
+        400: {'description': 'Missing or unknown permissions'},
+        404: {'description': 'Role not found'}
+    }
+})
+def set_role_permissions(role_id):
+    """Replace the role's permissions with the given set"""
+    try:
+        data = request.get_json()
+        ids = data.get('permission_ids') if isinstance(data, dict) else None
+        if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            return jsonify({"status": "error", "message": "permission_ids must be a list of integers"}), 400
+
+        result = RolePermissionService.set_role_permissions(role_id, ids)
+        if result is None:
+            return jsonify({"status": "error", "message": "Role not found"}), 404
+
+        return jsonify({"status": "success", "data": result}), 200
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
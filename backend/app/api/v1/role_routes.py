@@ -1,6 +1,9 @@
 from flask import request, jsonify
 from app.api.v1 import api_v1_bp
 from app.services.role_service import RoleService
+from app.utils.etag import conditional_response, make_etag
+from app.utils.pagination import PaginationError, PAGINATION_SWAGGER_PARAMS, parse_list_args
+from app.utils.streaming import ndjson_response, wants_ndjson
 from flasgger import swag_from
 
 # ---- Roles Endpoints ----
@@ -8,14 +11,26 @@ from flasgger import swag_from
 @api_v1_bp.route("/roles", methods=["GET"], endpoint="get_roles")
 @swag_from({
     'tags': ['Roles'],
+    'parameters': PAGINATION_SWAGGER_PARAMS + [
+        {'name': 'name', 'in': 'query', 'type': 'string', 'required': False}
+    ],
     'responses': {
-        200: {'description': 'List all roles'}
+        200: {'description': 'List one page of roles'},
+        304: {'description': 'Not modified since the ETag in If-None-Match'}
     }
 })
 def get_roles():
     try:
-        roles = RoleService.get_all_roles()
-        return jsonify({"status": "success", "data": roles}), 200
+        args = parse_list_args(request.args, RoleService.LIST_FILTERS, RoleService.LIST_FIELDS)
+        if wants_ndjson():
+            return ndjson_response(RoleService.export_roles(args["cursor"], args["filters"], args["fields"]))
+        etag = make_etag("get_roles", RoleService.get_roles_version(), request.query_string)
+        def build():
+            page = RoleService.get_all_roles(**args)
+            return jsonify({"status": "success", "data": page["items"], "pagination": page["pagination"]}), 200
+        return conditional_response(etag, build)
+    except PaginationError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
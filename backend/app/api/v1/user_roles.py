@@ -1,6 +1,8 @@
 from flask import request, jsonify
 from app.api.v1 import api_v1_bp
 from app.services.user_role_service import UserRoleService
+from app.utils.pagination import PaginationError, PAGINATION_SWAGGER_PARAMS, parse_list_args
+from app.utils.streaming import ndjson_response, wants_ndjson
 from flasgger import swag_from
 
 # --------- UserRoles Endpoints ---------
@@ -8,23 +10,33 @@ from flasgger import swag_from
 @api_v1_bp.route("/user-roles", methods=["GET"], endpoint="get_user_roles")
 @swag_from({
     'tags': ['UserRoles'],
+    'parameters': PAGINATION_SWAGGER_PARAMS + [
+        {'name': 'user_id', 'in': 'query', 'type': 'integer', 'required': False},
+        {'name': 'role_id', 'in': 'query', 'type': 'integer', 'required': False}
+    ],
     'responses': {
         200: {
-            'description': 'List all user-role assignments',
+            'description': 'List one page of user-role assignments',
             'examples': {
                 'application/json': {
                     "status": "success",
-                    "data": []
+                    "data": [],
+                    "pagination": {"limit": 100, "has_more": False, "next_cursor": None}
                 }
             }
         }
     }
 })
 def get_user_roles():
-    """Get all user-role assignments"""
+    """Get one page of user-role assignments"""
     try:
-        assignments = UserRoleService.get_all_user_roles()
-        return jsonify({"status": "success", "data": assignments}), 200
+        args = parse_list_args(request.args, UserRoleService.LIST_FILTERS, UserRoleService.LIST_FIELDS)
+        if wants_ndjson():
+            return ndjson_response(UserRoleService.export_user_roles(args["cursor"], args["filters"], args["fields"]))
+        page = UserRoleService.get_all_user_roles(**args)
+        return jsonify({"status": "success", "data": page["items"], "pagination": page["pagination"]}), 200
+    except PaginationError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -48,7 +60,8 @@ def get_user_roles():
     ],
     'responses': {
         201: {'description': 'Role assigned to user'},
-        400: {'description': 'Missing fields or invalid input'}
+        400: {'description': 'Missing fields, unknown ids or invalid input'},
+        409: {'description': 'Role already assigned to user'}
     }
 })
 def assign_role_to_user():
@@ -59,7 +72,11 @@ def assign_role_to_user():
             return jsonify({"status": "error", "message": "user_id and role_id required"}), 400
 
         assignment = UserRoleService.assign_role_to_user(data['user_id'], data['role_id'])
+        if assignment is None:
+            return jsonify({"status": "error", "message": "Role already assigned to user"}), 409
         return jsonify({"status": "success", "data": assignment}), 201
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -104,4 +121,46 @@ def remove_role_from_user():
 
         return jsonify({"status": "success", "message": "Role removed from user"}), 200
     except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
\ No newline at end of file
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@api_v1_bp.route("/users/<int:user_id>/roles", methods=["PUT"], endpoint="set_user_roles")
+@swag_from({
+    'tags': ['UserRoles'],
+    'parameters': [
+        {'name': 'user_id', 'in': 'path', 'type': 'integer', 'required': True, 'description': 'ID of the user'},
+        {
+            'name': 'body',
+            'in': 'body',
+            'schema': {
+                'type': 'object',
+                'required': ['role_ids'],
+                'properties': {
+                    'role_ids': {'type': 'array', 'items': {'type': 'integer'}}
+                }
+            }
+        }
+    ],
+    'responses': {
+        200: {'description': 'The user now has exactly these roles; returns what was added and removed'},
+        400: {'description': 'Missing or unknown roles'},
+        404: {'description': 'User not found'}
+    }
+})
+def set_user_roles(user_id):
+    """Replace the user's roles with the given set"""
+    try:
+        data = request.get_json()
+        ids = data.get('role_ids') if isinstance(data, dict) else None
+        if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            return jsonify({"status": "error", "message": "role_ids must be a list of integers"}), 400
+
+        result = UserRoleService.set_user_roles(user_id, ids)
+        if result is None:
+            return jsonify({"status": "error", "message": "User not found"}), 404
+
+        return jsonify({"status": "success", "data": result}), 200
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
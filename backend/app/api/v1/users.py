@@ -1,6 +1,11 @@
 from flask import request, jsonify
 from app.api.v1 import api_v1_bp
 from app.services.user_service import UserService
+from app.services.password_service import PasswordHashingBusy
+from app.utils.etag import conditional_response, make_etag
+from app.utils.pagination import PaginationError, PAGINATION_SWAGGER_PARAMS, parse_list_args
+from app.utils.streaming import ndjson_response, wants_ndjson
+from app.utils.uploads import iter_upload_records
 from flasgger import swag_from
 
 # User endpoints
@@ -8,13 +13,19 @@ from flasgger import swag_from
 @api_v1_bp.route("/users", methods=["GET"], endpoint="get_users")
 @swag_from({
     'tags': ['Users'],
+    'parameters': PAGINATION_SWAGGER_PARAMS + [
+        {'name': 'username', 'in': 'query', 'type': 'string', 'required': False},
+        {'name': 'email', 'in': 'query', 'type': 'string', 'required': False},
+        {'name': 'is_active', 'in': 'query', 'type': 'boolean', 'required': False}
+    ],
     'responses': {
         200: {
-            'description': 'List all users',
+            'description': 'List one page of users',
             'examples': {
                 'application/json': {
                     "status": "success",
-                    "data": []
+                    "data": [],
+                    "pagination": {"limit": 100, "has_more": False, "next_cursor": None}
                 }
             }
         }
@@ -22,10 +33,15 @@ from flasgger import swag_from
 })
 
 def get_users():
-    """Get all users endpoint."""
+    """Get one page of users; pass pagination.next_cursor back as ?cursor= for the next."""
     try:
-        users = UserService.get_all_users()
-        return jsonify({"status": "success", "data": users}), 200
+        args = parse_list_args(request.args, UserService.LIST_FILTERS, UserService.LIST_FIELDS)
+        if wants_ndjson():
+            return ndjson_response(UserService.export_users(args["cursor"], args["filters"], args["fields"]))
+        page = UserService.get_all_users(**args)
+        return jsonify({"status": "success", "data": page["items"], "pagination": page["pagination"]}), 200
+    except PaginationError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -45,6 +61,9 @@ def get_users():
         200: {
             'description': 'Get specific user'
         },
+        304: {
+            'description': 'Not modified since the ETag in If-None-Match'
+        },
         404: {
             'description': 'User not found'
         }
@@ -54,10 +73,15 @@ def get_users():
 def get_user(user_id):
     """Get a specific user endpoint."""
     try:
-        user = UserService.get_user_by_id(user_id)
-        if not user:
+        version = UserService.get_user_version(user_id)
+        if not version:
             return jsonify({"status": "error", "message": "User not found"}), 404
-        return jsonify({"status": "success", "data": user}), 200
+        def build():
+            user = UserService.get_user_by_id(user_id)
+            if not user:
+                return jsonify({"status": "error", "message": "User not found"}), 404
+            return jsonify({"status": "success", "data": user}), 200
+        return conditional_response(make_etag("get_user", *version), build)
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -108,6 +132,67 @@ def create_user():
         )
         
         return jsonify({"status": "success", "data": user}), 201
+    except PasswordHashingBusy:
+        raise
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@api_v1_bp.route("/users/bulk", methods=["POST"], endpoint="bulk_create_users")
+@swag_from({
+    'tags': ['Users'],
+    'consumes': ['application/json', 'application/x-ndjson', 'text/csv', 'multipart/form-data'],
+    'parameters': [
+        {
+            'name': 'body',
+            'in': 'body',
+            'description': 'JSON array, NDJSON or CSV (header: username,email,password) of users; '
+                           'or a multipart upload in the "file" field',
+            'schema': {
+                'type': 'array',
+                'items': {
+                    'type': 'object',
+                    'properties': {
+                        'username': {'type': 'string'},
+                        'email': {'type': 'string'},
+                        'password': {'type': 'string'}
+                    }
+                }
+            }
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'Import summary with per-row errors',
+            'examples': {
+                'application/json': {
+                    "status": "success",
+                    "data": {
+                        "created": 2,
+                        "failed": 1,
+                        "errors": [{"row": 3, "message": "Username already exists"}],
+                        "truncated": False
+                    }
+                }
+            }
+        },
+        400: {
+            'description': 'Unreadable upload'
+        },
+        503: {
+            'description': 'Too many bulk imports in progress (see Retry-After)'
+        }
+    }
+})
+def bulk_create_users():
+    """Bulk user import endpoint."""
+    try:
+        result = UserService.bulk_create_users(iter_upload_records())
+        return jsonify({"status": "success", "data": result}), 200
+    except PasswordHashingBusy:
+        raise
+    except ValueError as e:
+        # UploadError, or a body that isn't valid UTF-8/JSON
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -0,0 +1,300 @@
+import time
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+blocklist_cli = AppGroup("blocklist", help="Maintain the token_blocklist table.")
+passwords_cli = AppGroup("passwords", help="Password hashing tools.")
+bench_cli = AppGroup("bench", help="Performance benchmarks.")
+mail_cli = AppGroup("mail", help="Outbound email tools.")
+
+
+@blocklist_cli.command("purge")
+@click.option("--batch-size", type=int, default=None, help="Rows deleted per transaction.")
+@click.option("--max-batches", type=int, default=None, help="Stop after this many batches.")
+def purge_blocklist(batch_size, max_batches):
+    """Delete expired rows from token_blocklist."""
+    from app.services.token_blocklist_service import TokenBlocklistService
+
+    result = TokenBlocklistService.purge_expired(
+        batch_size=batch_size or current_app.config["BLOCKLIST_PURGE_BATCH_SIZE"],
+        max_batches=max_batches
+    )
+    click.echo(f"Purged {result['purged']} rows in {result['batches']} batches ({result['seconds']:.3f}s)")
+
+
+@passwords_cli.command("benchmark")
+@click.option("--profile", "profile_names", multiple=True, help="Profile to measure (default: all).")
+@click.option("--seconds", type=float, default=2.0, help="Time spent hashing per profile.")
+def benchmark_passwords(profile_names, seconds):
+    """Report hashes per second for each PASSWORD_HASH_PROFILES entry."""
+    from werkzeug.security import generate_password_hash
+
+    profiles = current_app.config["PASSWORD_HASH_PROFILES"]
+    active = current_app.config["PASSWORD_HASH_PROFILE"]
+    workers = current_app.config["PASSWORD_HASH_WORKERS"]
+
+    click.echo(f"{'profile':<12} {'method':<26} {'hashes/s':>10} {'ms/hash':>10} {'pool hashes/s':>14}")
+    for name in profile_names or profiles:
+        if name not in profiles:
+            raise click.BadParameter(f"Unknown profile: {name}", param_hint="--profile")
+        method = profiles[name]
+
+        count = 0
+        started = time.perf_counter()
+        while True:
+            generate_password_hash("benchmark-password", method)
+            count += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= seconds:
+                break
+
+        rate = count / elapsed
+        marker = " *" if name == active else ""
+        # Single-threaded rate times pool size is the ceiling for login throughput per process
+        click.echo(f"{name:<12} {method:<26} {rate:>10.1f} {1000 / rate:>10.2f} {rate * workers:>14.1f}{marker}")
+    click.echo(f"* active profile; pool estimate assumes {workers} workers on free cores")
+
+
+@bench_cli.command("json")
+@click.option("--rows", type=int, default=100000, help="Rows in the serialized payload.")
+@click.option("--repeat", type=int, default=3, help="Runs per pipeline; the best one is reported.")
+def benchmark_json(rows, repeat):
+    """Compare per-row to_dict + stdlib JSON with the model serializers + the fast provider."""
+    from datetime import datetime
+    from flask.json.provider import DefaultJSONProvider
+    from app.models.user import User
+    from app.utils.json_provider import FastJSONProvider, orjson
+
+    app = current_app._get_current_object()
+    now = datetime.utcnow()
+    users = [
+        User(id=i, username=f"user{i}", email=f"user{i}@example.com", created_at=now, is_active=True)
+        for i in range(rows)
+    ]
+
+    def legacy_to_dict(user):
+        # User.to_dict before the shared serializers
+        return {
+            "id": user.id,
+            "username": user.username,
+            "email": user.email,
+            "created_at": user.created_at.isoformat(),
+            "is_active": user.is_active
+        }
+
+    stdlib = DefaultJSONProvider(app)
+    fast_stdlib = FastJSONProvider(app)
+    fast_stdlib.backend = "stdlib"
+    pipelines = [
+        # Compact separators, as jsonify uses outside debug mode
+        ("to_dict+isoformat, stdlib", lambda: stdlib.dumps(
+            {"data": [legacy_to_dict(u) for u in users]}, separators=(",", ":"))),
+        ("serializer, stdlib", lambda: fast_stdlib.dumps(
+            {"data": [u.to_dict() for u in users]}, separators=(",", ":"))),
+    ]
+    if orjson is not None:
+        fast = FastJSONProvider(app)
+        fast.backend = "orjson"
+        pipelines.append(("serializer, orjson", lambda: fast.dumps({"data": [u.to_dict() for u in users]})))
+    else:
+        click.echo("orjson is not installed; skipping the orjson pipeline")
+
+    expected = None
+    baseline = None
+    click.echo(f"{'pipeline':<28} {'best ms':>10} {'rows/s':>12} {'MB':>8} {'speedup':>8}")
+    for name, run in pipelines:
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            body = run()
+            best = min(best, time.perf_counter() - started)
+
+        decoded = stdlib.loads(body)
+        if expected is None:
+            expected = decoded
+        elif decoded != expected:
+            raise click.ClickException(f"{name} produced different JSON than the baseline")
+
+        baseline = baseline or best
+        click.echo(
+            f"{name:<28} {best * 1000:>10.1f} {rows / best:>12.0f} "
+            f"{len(body) / 1e6:>8.2f} {baseline / best:>7.2f}x"
+        )
+
+
+@bench_cli.command("rbac")
+@click.option("--assignments", type=int, default=1000000, help="user_roles rows to generate.")
+@click.option("--lookups", type=int, default=200, help="Timed lookups per query.")
+@click.option("--database-url", default="sqlite://", help="Scratch database; a bench_user_roles table is created and dropped.")
+def benchmark_rbac(assignments, lookups, database_url):
+    """Time user_roles lookups without indexes and with the model's indexes."""
+    import random
+    from sqlalchemy import Column, Index, Integer, MetaData, Table, UniqueConstraint, create_engine, func, select
+    from app.models.rbac import UserRole
+
+    model_table = UserRole.__table__
+    roles_per_user = 10
+    role_count = 1000
+    user_count = max(1, assignments // roles_per_user)
+
+    def scratch_table(indexed):
+        table = Table(
+            "bench_user_roles", MetaData(),
+            Column("id", Integer, primary_key=True),
+            Column("user_id", Integer, nullable=False),
+            Column("role_id", Integer, nullable=False),
+        )
+        if indexed:
+            # Mirror the model's unique constraints and indexes
+            for constraint in model_table.constraints:
+                if isinstance(constraint, UniqueConstraint):
+                    table.append_constraint(UniqueConstraint(*[table.c[c.name] for c in constraint.columns]))
+            for index in model_table.indexes:
+                Index(f"bench_{index.name}", *[table.c[c.name] for c in index.columns], unique=index.unique)
+        return table
+
+    def rows():
+        for user_id in range(1, user_count + 1):
+            for k in range(roles_per_user):
+                yield {"user_id": user_id, "role_id": (user_id * 7 + k * 101) % role_count + 1}
+
+    rng = random.Random(42)
+    user_ids = [rng.randint(1, user_count) for _ in range(lookups)]
+    role_ids = [rng.randint(1, role_count) for _ in range(lookups)]
+
+    engine = create_engine(database_url)
+    results = {}
+    for label in ("before", "after"):
+        table = scratch_table(indexed=label == "after")
+        table.metadata.drop_all(engine)
+        table.metadata.create_all(engine)
+
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            batch = []
+            for row in rows():
+                batch.append(row)
+                if len(batch) == 50000:
+                    conn.execute(table.insert(), batch)
+                    batch = []
+            if batch:
+                conn.execute(table.insert(), batch)
+        click.echo(f"{label}: loaded {user_count * roles_per_user} rows in {time.perf_counter() - started:.1f}s")
+
+        queries = {
+            "roles by user": lambda conn, i: conn.execute(
+                select(table.c.role_id).where(table.c.user_id == user_ids[i])).all(),
+            "users by role": lambda conn, i: conn.execute(
+                select(func.count()).select_from(table).where(table.c.role_id == role_ids[i])).scalar(),
+            "assignment lookup": lambda conn, i: conn.execute(
+                select(table.c.id).where(table.c.user_id == user_ids[i], table.c.role_id == role_ids[i])).first(),
+        }
+        with engine.connect() as conn:
+            for name, run in queries.items():
+                # Queries without an index scan the table, so cap their sample
+                count = lookups if label == "after" else min(lookups, 20)
+                started = time.perf_counter()
+                for i in range(count):
+                    run(conn, i)
+                results[(name, label)] = (time.perf_counter() - started) / count
+        table.metadata.drop_all(engine)
+
+    click.echo(f"{'query':<20} {'before ms':>12} {'after ms':>12} {'speedup':>10}")
+    for name in queries:
+        before, after = results[(name, "before")], results[(name, "after")]
+        click.echo(f"{name:<20} {before * 1000:>12.3f} {after * 1000:>12.3f} {before / after:>9.0f}x")
+
+
+@bench_cli.command("bulk-import")
+@click.option("--rows", type=int, default=200, help="Users created by each method.")
+@click.option("--profile", default=None, help="PASSWORD_HASH_PROFILES entry to hash with (default: the active one).")
+def benchmark_bulk_import(rows, profile):
+    """Compare creating users one at a time with the bulk import path of POST /users/bulk.
+
+    Users named bench-import-* are created in the configured database and
+    deleted afterwards.
+    """
+    import os
+    import uuid
+    from app.extensions import db
+    from app.models.user import User
+    from app.services.password_service import PasswordService
+    from app.services.user_service import UserService
+
+    app = current_app._get_current_object()
+    if profile is not None:
+        if profile not in app.config["PASSWORD_HASH_PROFILES"]:
+            raise click.BadParameter(f"Unknown profile: {profile}", param_hint="--profile")
+        app.config["PASSWORD_HASH_PROFILE"] = profile
+        PasswordService.init_app(app)
+
+    prefix = f"bench-import-{uuid.uuid4().hex[:8]}"
+
+    def records(label):
+        return [
+            {"username": f"{prefix}-{label}-{i}", "email": f"{prefix}-{label}-{i}@example.com", "password": f"password{i}"}
+            for i in range(rows)
+        ]
+
+    timings = []
+    try:
+        single = records("single")
+        started = time.perf_counter()
+        for record in single:
+            UserService.create_user(record["username"], record["email"], record["password"])
+        timings.append(("create_user loop", time.perf_counter() - started))
+
+        bulk = records("bulk")
+        started = time.perf_counter()
+        result = UserService.bulk_create_users(bulk, max_rows=rows)
+        timings.append(("bulk_create_users", time.perf_counter() - started))
+        if result["created"] != rows:
+            raise click.ClickException(f"Bulk import created {result['created']} of {rows} users: {result['errors'][:3]}")
+    finally:
+        db.session.query(User).filter(User.username.like(f"{prefix}-%")).delete(synchronize_session=False)
+        db.session.commit()
+
+    stats = PasswordService.stats()
+    click.echo(
+        f"{rows} users, hash method {stats['method']}, {stats['processes']} hashing process(es), "
+        f"{os.cpu_count()} CPU(s)"
+    )
+    click.echo(f"{'method':<20} {'seconds':>10} {'users/s':>10} {'speedup':>8}")
+    baseline = timings[0][1]
+    for name, seconds in timings:
+        click.echo(f"{name:<20} {seconds:>10.2f} {rows / seconds:>10.1f} {baseline / seconds:>7.1f}x")
+
+
+@mail_cli.command("reset-campaign")
+@click.option("--user-id", "user_ids", type=int, multiple=True, help="Only email these users (default: all active users).")
+def password_reset_campaign(user_ids):
+    """Email a fresh password reset link to many users over one SMTP session."""
+    from app.extensions import db
+    from app.models.user import User
+    from app.services.auth_service import AuthService
+    from app.services.mail_service import MailService
+
+    query = db.select(User.id, User.username, User.email).where(User.is_active.is_(True)).order_by(User.id)
+    if user_ids:
+        query = query.where(User.id.in_(user_ids))
+    rows = db.session.execute(query.execution_options(yield_per=current_app.config["EXPORT_BATCH_SIZE"]))
+
+    report = MailService.send_batch(AuthService.build_password_reset_email(row) for row in rows)
+    click.echo(
+        f"Sent {report['sent']} ({report['failed']} failed) over {report['connections']} connection(s) "
+        f"in {report['seconds']:.3f}s, {report['per_second'] or 0:.1f} messages/s"
+    )
+    if report["aborted"]:
+        for address in report["not_attempted"]:
+            click.echo(f"Not attempted: {address}")
+        raise click.ClickException(
+            f"SMTP server unreachable; aborted with {len(report['not_attempted'])} message(s) not attempted"
+        )
+
+
+def register_commands(app):
+    app.cli.add_command(blocklist_cli)
+    app.cli.add_command(passwords_cli)
+    app.cli.add_command(bench_cli)
+    app.cli.add_command(mail_cli)
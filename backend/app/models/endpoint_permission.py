@@ -1,5 +1,6 @@
 from datetime import datetime
 from app.extensions import db
+from app.utils.serializers import make_serializer
 
 class EndpointPermission(db.Model):
     """Mapping between API endpoints and required permissions."""
@@ -15,14 +16,15 @@ class EndpointPermission(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def __repr__(self):
-        return f"<EndpointPermission endpoint='{self.endpoint_name}' permission='{self.permission.name}'>"
+        # permission_id rather than permission.name, so repr() never triggers a lazy load
+        return f"<EndpointPermission endpoint='{self.endpoint_name}' permission_id={self.permission_id}>"
 
     def to_dict(self):
-        return {
-            "id": self.id,
-            "endpoint_name": self.endpoint_name,
-            "permission_id": self.permission_id,
-            "permission_name": self.permission.name,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat(),
-        }
+        return _serialize_endpoint_permission(self)
+
+
+_serialize_endpoint_permission = make_serializer(
+    ("id", "endpoint_name", "permission_id", "created_at", "updated_at"),
+    extra={"permission_name": "permission.name"}
+)
+
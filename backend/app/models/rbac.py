@@ -1,6 +1,7 @@
 # models/rbac.py
 from datetime import datetime
 from app.extensions import db
+from app.utils.serializers import make_serializer
 
 class Role(db.Model):
     """Role model for storing user roles."""
@@ -16,12 +17,10 @@ class Role(db.Model):
         return f"<Role {self.name}>"
 
     def to_dict(self):
-        return {
-            "id": self.id,
-            "name": self.name,
-            "description": self.description,
-            "created_at": self.created_at.isoformat(),
-        }
+        return _serialize_role(self)
+
+
+_serialize_role = make_serializer(("id", "name", "description", "created_at"))
 
 
 class Permission(db.Model):
@@ -38,17 +37,20 @@ class Permission(db.Model):
         return f"<Permission {self.name}>"
 
     def to_dict(self):
-        return {
-            "id": self.id,
-            "name": self.name,
-            "description": self.description,
-            "created_at": self.created_at.isoformat(),
-        }
+        return _serialize_permission(self)
+
+
+_serialize_permission = make_serializer(("id", "name", "description", "created_at"))
 
 
 class UserRole(db.Model):
     """Association table for users and roles."""
     __tablename__ = "user_roles"
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "role_id", name="uq_user_roles_user_id_role_id"),
+        # Reverse direction: users holding a role, and the ON DELETE CASCADE from roles
+        db.Index("ix_user_roles_role_id_user_id", "role_id", "user_id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
@@ -66,6 +68,11 @@ class UserRole(db.Model):
 class RolePermission(db.Model):
     """Association table for roles and permissions."""
     __tablename__ = "role_permissions"
+    __table_args__ = (
+        db.UniqueConstraint("role_id", "permission_id", name="uq_role_permissions_role_id_permission_id"),
+        # Reverse direction: roles granting a permission, and the ON DELETE CASCADE from permissions
+        db.Index("ix_role_permissions_permission_id_role_id", "permission_id", "role_id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     role_id = db.Column(db.Integer, db.ForeignKey('roles.id', ondelete='CASCADE'), nullable=False)
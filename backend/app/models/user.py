@@ -1,5 +1,6 @@
 from datetime import datetime
 from app.extensions import db
+from app.utils.serializers import make_serializer
 
 class User(db.Model):
     """User model for storing user information."""
@@ -12,15 +13,18 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
+    # Bumped to invalidate every token issued to the user (claims mode)
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    # Bumped whenever the user's role assignments change, so role ids embedded in tokens go stale
+    permissions_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
     
     def __repr__(self):
         return f"<User {self.username}>"
     
     def to_dict(self):
-        return {
-            "id": self.id,
-            "username": self.username,
-            "email": self.email,
-            "created_at": self.created_at.isoformat(),
-            "is_active": self.is_active
-        }
\ No newline at end of file
+        return _serialize_user(self)
+
+
+# An explicit field list, so a column added later is never exposed by default.
+# Datetimes stay native; the app's JSON provider writes them as ISO 8601
+_serialize_user = make_serializer(("id", "username", "email", "created_at", "is_active"))
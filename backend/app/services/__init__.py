@@ -5,3 +5,8 @@ from .role_permission_service import RolePermissionService
 from .role_service import RoleService
 from .auth_service import AuthService
 from .endpoint_permission_service import EndpointPermissionService
+from .token_blocklist_service import TokenBlocklistService
+from .permission_resolver_service import PermissionResolverService
+from .password_service import PasswordService
+from .mail_service import MailService
+from .rate_limit_service import RateLimitService
@@ -1,53 +1,142 @@
 import jwt
 import datetime
+import hashlib
 import uuid
 from datetime import timedelta, timezone
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from werkzeug.security import generate_password_hash, check_password_hash
-from sqlalchemy.exc import SQLAlchemyError
+from types import MappingProxyType
+from flask import current_app, has_app_context
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from app.extensions import db
 from app.models.user import User
-from app.models.token_blocklist import TokenBlocklist
+from app.services.token_blocklist_service import TokenBlocklistService
+from app.services.permission_resolver_service import PermissionResolverService
+from app.services.password_service import PasswordService, PasswordHashingBusy
+from app.services.mail_service import MailService
+from app.utils.cache import TTLCache
+from app.utils.db_errors import integrity_error_text
+from app.utils.jwt_keys import KeyRing
 import os
 
 class AuthService:
     """Service class for authentication operations"""
     
+    # Defaults used until init_app loads the configured keys (see JWT_* in config.py)
     JWT_SECRET = os.environ.get('JWT_SECRET', 'your-secret-key')  # Should be in environment variables
     JWT_ALGORITHM = 'HS256'
     JWT_ACCESS_EXPIRY = datetime.timedelta(hours=1)
     JWT_REFRESH_EXPIRY = datetime.timedelta(days=30)
     
+    # Version of the claims block embedded in access tokens when JWT_EMBED_CLAIMS is on
+    CLAIMS_VERSION = 1
+    # user_id -> (is_active, token_version, permissions_version), so claims are checked without a query
+    _user_versions = TTLCache(maxsize=10000, ttl=30)
+    # Signing/verification keys, parsed once
+    _keyring = KeyRing.from_config({"JWT_ALGORITHM": JWT_ALGORITHM, "JWT_SECRET": JWT_SECRET})
+    # sha256(raw token) -> verified payload, kept until the token's exp
+    _decoded_tokens = TTLCache(maxsize=10000)
+    
+    @classmethod
+    def init_app(cls, app):
+        """Load the signing keys and size the user version cache from the app config."""
+        cls._keyring = KeyRing.from_config(app.config)
+        cls._decoded_tokens = TTLCache(maxsize=app.config.get("TOKEN_DECODE_CACHE_SIZE", 10000))
+        cls._user_versions = TTLCache(
+            maxsize=app.config.get("USER_VERSION_CACHE_SIZE", 10000),
+            ttl=app.config.get("USER_VERSION_CACHE_TTL", 30)
+        )
+    
+    @staticmethod
+    def encode_token(payload):
+        """Sign a payload with the active key."""
+        return AuthService._keyring.encode(payload)
+    
+    @staticmethod
+    def decode_token(token):
+        """Verify and decode a token with the key named by its kid header."""
+        return AuthService._keyring.decode(token)
+    
+    @staticmethod
+    def decode_token_cached(token):
+        """Decode a token, reusing the verified payload of an identical token seen before.
+
+        Entries expire at the token's exp, so an expired token always goes
+        back through jwt.decode and is rejected there. The payload is shared by
+        every request presenting the token, so it is returned read-only.
+        """
+        cache = AuthService._decoded_tokens
+        if not cache.maxsize:
+            return AuthService._freeze(AuthService.decode_token(token))
+        
+        key = hashlib.sha256(token.encode('utf-8')).digest()
+        payload = cache.get(key)
+        if payload is None:
+            payload = AuthService._freeze(AuthService.decode_token(token))
+            if payload.get('exp'):
+                cache.set(key, payload, expires_at=payload['exp'])
+        return payload
+    
+    @staticmethod
+    def _freeze(value):
+        """Read-only copy of a decoded payload: dicts become mapping proxies and lists tuples."""
+        if isinstance(value, dict):
+            return MappingProxyType({key: AuthService._freeze(item) for key, item in value.items()})
+        if isinstance(value, list):
+            return tuple(AuthService._freeze(item) for item in value)
+        return value
+    
+    @staticmethod
+    def forget_decoded_token(token):
+        AuthService._decoded_tokens.pop(hashlib.sha256(token.encode('utf-8')).digest())
+    
+    @staticmethod
+    def token_cache_stats():
+        return AuthService._decoded_tokens.stats()
+    
+    @staticmethod
+    def get_jwks():
+        """Public verification keys as a JWK Set."""
+        return AuthService._keyring.jwks()
+    
     @staticmethod
     def register(username, email, password):
-        """Register a new user."""
+        """Register a new user.
+        
+        There is no existence pre-check: the unique indexes on username and email
+        decide, so concurrent sign-ups for the same name can't both succeed.
+        """
         try:
-            # Check if user already exists
-            if User.query.filter_by(username=username).first() or User.query.filter_by(email=email).first():
-                return {"status": "error", "message": "Username or email already exists"}, 400
+            # Cheap validation first; hashing is the expensive step
+            error = AuthService._validate_registration(username, email, password)
+            if error:
+                return {"status": "error", "message": error}, 400
             
             # Create new user
-            password_hash = generate_password_hash(password)
+            password_hash = PasswordService.hash_password(password)
             new_user = User(
                 username=username,
                 email=email,
                 password_hash=password_hash
             )
             
-            db.session.add(new_user)
-            db.session.commit()
-            
-            # Generate tokens
-            access_token = AuthService.generate_access_token(new_user.id)
-            refresh_token = AuthService.generate_refresh_token(new_user.id)
+            try:
+                db.session.add(new_user)
+                db.session.flush()
+                
+                # Build the response before commit expires the new row's attributes
+                user_data = new_user.to_dict()
+                access_token = AuthService.generate_access_token(new_user.id, user=new_user)
+                refresh_token = AuthService.generate_refresh_token(new_user.id, user=new_user)
+                
+                db.session.commit()
+            except IntegrityError as e:
+                db.session.rollback()
+                return {"status": "error", "message": AuthService._duplicate_user_message(e)}, 400
             
             return {
                 "status": "success",
                 "message": "User registered successfully",
                 "data": {
-                    "user": new_user.to_dict(),
+                    "user": user_data,
                     "access_token": access_token,
                     "refresh_token": refresh_token
                 }
@@ -57,6 +146,27 @@ class AuthService:
             db.session.rollback()
             return {"status": "error", "message": str(e)}, 500
     
+    @staticmethod
+    def _validate_registration(username, email, password):
+        for field, value in (("username", username), ("email", email), ("password", password)):
+            if not isinstance(value, str) or not value:
+                return f"Missing required field: {field}"
+        if len(username) > User.username.type.length:
+            return "Username is too long"
+        if len(email) > User.email.type.length or "@" not in email:
+            return "Invalid email address"
+        return None
+    
+    @staticmethod
+    def _duplicate_user_message(error):
+        """Name the unique column an IntegrityError hit, when the driver reports it."""
+        text = integrity_error_text(error)
+        if "username" in text:
+            return "Username already exists"
+        if "email" in text:
+            return "Email already exists"
+        return "Username or email already exists"
+    
     @staticmethod
     def login(email, password):
         """Login a user."""
@@ -65,16 +175,20 @@ class AuthService:
             user = User.query.filter_by(email=email).first()
             
             # Check if user exists and password is correct
-            if not user or not check_password_hash(user.password_hash, password):
+            if not user or not PasswordService.verify_password(user.password_hash, password):
                 return {"status": "error", "message": "Invalid credentials"}, 401
             
             # Check if user is active
             if not user.is_active:
                 return {"status": "error", "message": "Account is deactivated"}, 403
             
+            # Upgrade hashes made with an older method or cost, now that we know the password
+            if PasswordService.needs_rehash(user.password_hash):
+                AuthService._rehash_password(user, password)
+            
             # Generate tokens
-            access_token = AuthService.generate_access_token(user.id)
-            refresh_token = AuthService.generate_refresh_token(user.id)
+            access_token = AuthService.generate_access_token(user.id, user=user)
+            refresh_token = AuthService.generate_refresh_token(user.id, user=user)
             
             return {
                 "status": "success",
@@ -86,29 +200,46 @@ class AuthService:
                 }
             }, 200
             
+        except PasswordHashingBusy:
+            raise
         except Exception as e:
             return {"status": "error", "message": str(e)}, 500
     
+    @staticmethod
+    def _rehash_password(user, password):
+        """Best effort: a busy pool or failed write must not fail the login."""
+        try:
+            user.password_hash = PasswordService.hash_password(password)
+            db.session.commit()
+        except PasswordHashingBusy:
+            pass
+        except SQLAlchemyError:
+            db.session.rollback()
+    
     @staticmethod
     def refresh_token(refresh_token):
         """Generate new access token using refresh token."""
         try:
             # Decode refresh token
-            payload = jwt.decode(refresh_token, AuthService.JWT_SECRET, algorithms=[AuthService.JWT_ALGORITHM])
+            payload = AuthService.decode_token(refresh_token)
             
             # Check if token type is refresh
             if payload.get('type') != 'refresh':
                 return {"status": "error", "message": "Invalid token type"}, 401
             
             # Get user
-            user_id = payload.get('sub')
+            user_id = int(payload.get('sub'))
             user = User.query.get(user_id)
             
             if not user or not user.is_active:
                 return {"status": "error", "message": "User not found or inactive"}, 401
             
+            # Tokens issued before the user's token version was bumped are void
+            if payload.get('tv') is not None and payload['tv'] != user.token_version:
+                return {"status": "error", "message": "Refresh token has been revoked"}, 401
+            
             # Generate new access token
-            new_access_token = AuthService.generate_access_token(user_id)
+            new_access_token = AuthService.generate_access_token(user_id, user=user)
             
             return {
                 "status": "success",
@@ -139,85 +270,55 @@ class AuthService:
                     "message": "If the email exists, a reset link will be sent"
                 }, 200
             
-            # Generate password reset token (short expiry)
-            reset_token = AuthService.generate_password_reset_token(user.id)
-            
-            # Create reset URL
-            baseServerUrl = os.environ.get('BASE_SERVER_URL', 'http://localhost:5000/api/v1')
-            reset_url = f"{baseServerUrl}/auth/reset-password/{reset_token}"
-            
-            # Send email with reset link
-            try:
-                # Email configuration
-                my_email = os.environ.get('EMAIL_USER')
-                password = os.environ.get('EMAIL_PASSWORD')
-                
-                # Create message
-                msg = MIMEMultipart()
-                msg['To'] = email
-                msg['Subject'] = "Password Reset Request"
-                msg['From'] = my_email
-                
-                # Create email body
-                body = f"""
-                Hello {user.username},
-                
-                You recently requested to reset your password. Please click the link below to reset it:
-                
-                {reset_url}
-                
-                This link will expire in 1 hour.
-                
-                If you did not request a password reset, please ignore this email.
-                
-                Regards,
-                Your Application Team
-                """
-                
-                msg.attach(MIMEText(body, 'plain', 'utf-8'))
-                
-                # Send email
-                with smtplib.SMTP('smtp.gmail.com', 587) as connection:
-                    connection.starttls()
-                    connection.login(my_email, password)
-                    connection.sendmail(my_email, email, msg.as_string())
-                
-                return {
-                    "status": "success",
-                    "message": "Password reset email sent. Please check your inbox."
-                }, 200
-                
-            except Exception as e:
-                # Log the email sending error but don't expose details to client
-                print(f"Email sending error: {str(e)}")
+            # Queue the email; delivery happens on the mail sender threads
+            if not MailService.enqueue(AuthService.build_password_reset_email(user)):
                 return {
                     "status": "error", 
                     "message": "Failed to send reset email. Please try again later."
                 }, 500
             
+            return {
+                "status": "success",
+                "message": "Password reset email sent. Please check your inbox."
+            }, 200
+            
         except Exception as e:
             return {"status": "error", "message": str(e)}, 500
     
+    @staticmethod
+    def build_password_reset_email(user):
+        """Render the password reset email, with a fresh reset link, for ``user``."""
+        # Generate password reset token (short expiry)
+        reset_token = AuthService.generate_password_reset_token(user.id)
+        
+        # Create reset URL
+        baseServerUrl = os.environ.get('BASE_SERVER_URL', 'http://localhost:5000/api/v1')
+        reset_url = f"{baseServerUrl}/auth/reset-password/{reset_token}"
+        
+        return MailService.render(
+            "password_reset", user.email, username=user.username, reset_url=reset_url, expires_in="1 hour"
+        )
+    
     @staticmethod
     def reset_password(reset_token, new_password):
         """Reset password using reset token."""
         try:
             # Decode reset token
-            payload = jwt.decode(reset_token, AuthService.JWT_SECRET, algorithms=[AuthService.JWT_ALGORITHM])
+            payload = AuthService.decode_token(reset_token)
             
             # Check if token type is reset
             if payload.get('type') != 'reset':
                 return {"status": "error", "message": "Invalid token type"}, 401
             
             # Get user
-            user_id = payload.get('sub')
+            user_id = int(payload.get('sub'))
             user = User.query.get(user_id)
             
             if not user:
                 return {"status": "error", "message": "User not found"}, 404
             
             # Update password
-            user.password_hash = generate_password_hash(new_password)
+            user.password_hash = PasswordService.hash_password(new_password)
             db.session.commit()
             
             return {
@@ -234,52 +335,118 @@ class AuthService:
             return {"status": "error", "message": str(e)}, 500
     
     @staticmethod
-    def generate_access_token(user_id):
+    def claims_enabled():
+        return has_app_context() and current_app.config.get("JWT_EMBED_CLAIMS", False)
+    
+    @staticmethod
+    def get_user_versions(user_id, user=None):
+        """Return (is_active, token_version, permissions_version) for a user, or None if it doesn't exist."""
+        versions = AuthService._user_versions.get(user_id)
+        if versions is None:
+            if user is not None:
+                versions = (user.is_active, user.token_version, user.permissions_version)
+            else:
+                row = db.session.query(
+                    User.is_active, User.token_version, User.permissions_version
+                ).filter_by(id=user_id).first()
+                if row is None:
+                    return None
+                versions = tuple(row)
+            AuthService._user_versions.set(user_id, versions)
+        return versions
+    
+    @staticmethod
+    def invalidate_user_versions(user_id):
+        """Forget cached versions after the user's status or role assignments change."""
+        AuthService._user_versions.pop(user_id)
+    
+    @staticmethod
+    def build_claims(user_id, user=None):
+        """Build the compact claims block embedded in access tokens."""
+        versions = AuthService.get_user_versions(user_id, user)
+        if versions is None:
+            return None
+        is_active, token_version, permissions_version = versions
+        return {
+            'v': AuthService.CLAIMS_VERSION,
+            'act': bool(is_active),
+            'rid': sorted(PermissionResolverService.get_user_role_ids(user_id)),
+            'pv': permissions_version,
+            'tv': token_version
+        }
+    
+    @staticmethod
+    def trusted_role_ids(payload):
+        """Return the role ids embedded in a validated token if they are still current, else None."""
+        claims = payload.get('clm')
+        if not claims:
+            return None
+        versions = AuthService.get_user_versions(int(payload.get('sub')))
+        if versions is None or versions[2] != claims.get('pv'):
+            return None
+        return claims.get('rid')
+    
+    @staticmethod
+    def generate_access_token(user_id, user=None):
         """Generate JWT access token."""
         jti = str(uuid.uuid4())  # Generate a unique token ID
         payload = {
-            'sub': user_id,
+            'sub': str(user_id),  # PyJWT requires a string subject
             'type': 'access',
             'jti': jti,  # JWT ID for token revocation
             'iat': datetime.datetime.now(timezone.utc),
             'exp': datetime.datetime.now(timezone.utc) + AuthService.JWT_ACCESS_EXPIRY
         }
-        return jwt.encode(payload, AuthService.JWT_SECRET, algorithm=AuthService.JWT_ALGORITHM)
+        if AuthService.claims_enabled():
+            claims = AuthService.build_claims(user_id, user)
+            if claims is not None:
+                payload['clm'] = claims
+        return AuthService.encode_token(payload)
     
     @staticmethod
-    def generate_refresh_token(user_id):
+    def generate_refresh_token(user_id, user=None):
         """Generate JWT refresh token."""
         jti = str(uuid.uuid4())  # Generate a unique token ID
         payload = {
-            'sub': user_id,
+            'sub': str(user_id),  # PyJWT requires a string subject
             'type': 'refresh',
             'jti': jti,  # JWT ID for token revocation
             'iat': datetime.datetime.now(timezone.utc),
             'exp': datetime.datetime.now(timezone.utc) + AuthService.JWT_REFRESH_EXPIRY
         }
-        return jwt.encode(payload, AuthService.JWT_SECRET, algorithm=AuthService.JWT_ALGORITHM)
+        if AuthService.claims_enabled():
+            versions = AuthService.get_user_versions(user_id, user)
+            if versions is not None:
+                payload['tv'] = versions[1]
+        return AuthService.encode_token(payload)
     
     @staticmethod
     def generate_password_reset_token(user_id):
         """Generate password reset token."""
         payload = {
-            'sub': user_id,
+            'sub': str(user_id),  # PyJWT requires a string subject
             'type': 'reset',
             'iat': datetime.datetime.now(timezone.utc),
             'exp': datetime.datetime.now(timezone.utc) + datetime.timedelta(hours=1)  # Short expiry for security
         }
-        return jwt.encode(payload, AuthService.JWT_SECRET, algorithm=AuthService.JWT_ALGORITHM)
+        return AuthService.encode_token(payload)
 
     @staticmethod
     def validate_token(token):
         """Validate JWT token."""
         try:
-            payload = jwt.decode(token, AuthService.JWT_SECRET, algorithms=[AuthService.JWT_ALGORITHM])
+            # Signature check is skipped for tokens already verified in this process
+            payload = AuthService.decode_token_cached(token)
             
-            # Check if token is revoked
+            # Check if token is revoked (served from the in-process cache when possible)
             jti = payload.get('jti')
-            if jti and TokenBlocklist.is_token_revoked(jti):
+            if jti and TokenBlocklistService.is_token_revoked(jti, payload.get('exp')):
                 return None  # Token is revoked
+            
+            # Check embedded claims against the user's current status and token version
+            claims = payload.get('clm')
+            if claims is not None and not AuthService._claims_valid(int(payload.get('sub')), claims):
+                return None
                 
             return payload
         except jwt.ExpiredSignatureError:
@@ -287,29 +454,63 @@ class AuthService:
         except jwt.InvalidTokenError:
             return None  # Invalid token
             
+    @staticmethod
+    def _claims_valid(user_id, claims):
+        if claims.get('v') != AuthService.CLAIMS_VERSION or not claims.get('act'):
+            return False
+        versions = AuthService.get_user_versions(user_id)
+        return versions is not None and bool(versions[0]) and versions[1] == claims.get('tv')
+    
+    @staticmethod
+    def revoke_user_tokens(user_id):
+        """Invalidate every claims-mode token issued to a user by bumping their token version.
+
+        Tokens issued without claims never carry a version, so outside claims
+        mode this would revoke nothing; refuse rather than report success.
+        """
+        if not AuthService.claims_enabled():
+            return {
+                "status": "error",
+                "message": "Revoking all sessions requires JWT_EMBED_CLAIMS; log out each token instead"
+            }, 409
+        
+        try:
+            updated = User.query.filter_by(id=user_id).update(
+                {User.token_version: User.token_version + 1}, synchronize_session=False
+            )
+            db.session.commit()
+            AuthService.invalidate_user_versions(user_id)
+            
+            if not updated:
+                return {"status": "error", "message": "User not found"}, 404
+            
+            return {
+                "status": "success",
+                "message": "All tokens revoked successfully"
+            }, 200
+            
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return {
+                "status": "error", 
+                "message": f"Database error: {str(e)}"
+            }, 500
+            
     @staticmethod
     def logout(token):
         """Revoke a token."""
         try:
             # Decode token
-            payload = jwt.decode(token, AuthService.JWT_SECRET, algorithms=[AuthService.JWT_ALGORITHM])
-            
-            # Get token data
-            jti = payload.get('jti')
-            token_type = payload.get('type')
-            user_id = payload.get('sub')
-            exp = datetime.datetime.fromtimestamp(payload.get('exp'))
-            
-            # Add token to blocklist
-            revoked_token = TokenBlocklist(
-                jti=jti,
-                token_type=token_type,
-                user_id=user_id,
-                expires_at=exp
+            payload = AuthService.decode_token(token)
+            
+            # Add token to blocklist and the revocation cache
+            TokenBlocklistService.revoke_token(
+                jti=payload.get('jti'),
+                token_type=payload.get('type'),
+                user_id=int(payload.get('sub')),
+                expires_at=payload.get('exp')
             )
-            
-            db.session.add(revoked_token)
-            db.session.commit()
+            AuthService.forget_decoded_token(token)
             
             return {
                 "status": "success",
@@ -1,16 +1,72 @@
+import threading
+import time
+from types import MappingProxyType
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import joinedload
 from app.extensions import db
 from app.models.rbac import Permission
 from app.models.endpoint_permission import EndpointPermission
+from app.utils.etag import table_version
+from app.utils.pagination import paginate, iter_rows
 
 class EndpointPermissionService:
     """Service class for endpoint permission operations"""
 
+    LIST_FILTERS = {"endpoint_name": str, "permission_id": int}
+    LIST_FIELDS = {
+        "id": EndpointPermission.id,
+        "endpoint_name": EndpointPermission.endpoint_name,
+        "permission_id": EndpointPermission.permission_id,
+        # Correlated subquery, so the permission name needs no join or per-row lazy load
+        "permission_name": (
+            db.select(Permission.name)
+            .where(Permission.id == EndpointPermission.permission_id)
+            .scalar_subquery()
+        ),
+        "created_at": EndpointPermission.created_at,
+        "updated_at": EndpointPermission.updated_at,
+    }
+    DEFAULT_FIELDS = ("id", "endpoint_name", "permission_id", "permission_name", "created_at", "updated_at")
+
+    # Read-only endpoint_name -> permission name map, replaced wholesale on recompile
+    _endpoint_map = None
+    _compiled_at = 0.0
+    _map_ttl = 60
+    _compile_lock = threading.Lock()
+
+    @classmethod
+    def init_app(cls, app):
+        cls._map_ttl = app.config.get("ENDPOINT_PERMISSION_MAP_TTL", 60)
+        cls._endpoint_map = None
+
+    @staticmethod
+    def get_all_endpoint_permissions(cursor=None, limit=None, filters=None, fields=None):
+        try:
+            return paginate(
+                EndpointPermission, EndpointPermissionService.LIST_FIELDS,
+                fields or EndpointPermissionService.DEFAULT_FIELDS, cursor, limit, filters
+            )
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
+    @staticmethod
+    def export_endpoint_permissions(cursor=None, filters=None, fields=None):
+        """Yield every endpoint permission as a dict, reading the table in batches."""
+        try:
+            yield from iter_rows(
+                EndpointPermission, EndpointPermissionService.LIST_FIELDS,
+                fields or EndpointPermissionService.DEFAULT_FIELDS, cursor, filters
+            )
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
     @staticmethod
-    def get_all_endpoint_permissions():
+    def get_endpoint_permissions_version():
+        """Cheap probe for ETags on GET /endpoint-permissions; listings include permission names."""
         try:
-            endpoint_permissions = EndpointPermission.query.all()
-            return [ep.to_dict() for ep in endpoint_permissions]
+            return table_version(EndpointPermission, Permission)
         except SQLAlchemyError as e:
             db.session.rollback()
             raise e
@@ -18,7 +74,11 @@ class EndpointPermissionService:
     @staticmethod
     def get_endpoint_permission_by_id(endpoint_permission_id):
         try:
-            ep = EndpointPermission.query.get(endpoint_permission_id)
+            # to_dict reads permission.name; join it in rather than lazy-loading it afterwards
+            ep = db.session.get(
+                EndpointPermission, endpoint_permission_id,
+                options=[joinedload(EndpointPermission.permission)]
+            )
             return ep.to_dict() if ep else None
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -35,6 +95,7 @@ class EndpointPermissionService:
             ep = EndpointPermission(endpoint_name=endpoint_name, permission_id=permission_id)
             db.session.add(ep)
             db.session.commit()
+            EndpointPermissionService.compile_endpoint_map()
             return ep.to_dict()
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -52,6 +113,7 @@ class EndpointPermissionService:
                     setattr(ep, key, value)
 
             db.session.commit()
+            EndpointPermissionService.compile_endpoint_map()
             return ep.to_dict()
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -66,7 +128,54 @@ class EndpointPermissionService:
 
             db.session.delete(ep)
             db.session.commit()
+            EndpointPermissionService.compile_endpoint_map()
             return True
         except SQLAlchemyError as e:
             db.session.rollback()
             raise e
+
+    @classmethod
+    def get_endpoint_map(cls):
+        """Return the compiled endpoint -> permission map, recompiling it once it is older than the TTL."""
+        endpoint_map = cls._endpoint_map
+        if endpoint_map is None or (cls._map_ttl and time.time() - cls._compiled_at > cls._map_ttl):
+            endpoint_map = cls.compile_endpoint_map()
+        return endpoint_map
+
+    @classmethod
+    def get_required_permission(cls, endpoint_name):
+        return cls.get_endpoint_map().get(endpoint_name)
+
+    @classmethod
+    def compile_endpoint_map(cls):
+        """Load the whole endpoint_permissions table into an immutable dict and swap it in."""
+        try:
+            rows = (
+                db.session.query(EndpointPermission.endpoint_name, Permission.name)
+                .join(Permission, Permission.id == EndpointPermission.permission_id)
+                .all()
+            )
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
+        endpoint_map = MappingProxyType(dict(rows))
+        with cls._compile_lock:
+            cls._endpoint_map = endpoint_map
+            cls._compiled_at = time.time()
+        return endpoint_map
+
+    @classmethod
+    def invalidate_endpoint_map(cls):
+        """Force a recompile on next use, e.g. after a permission is renamed."""
+        cls._endpoint_map = None
+
+    @classmethod
+    def stats(cls):
+        endpoint_map = cls._endpoint_map
+        return {
+            "compiled": endpoint_map is not None,
+            "endpoints": len(endpoint_map) if endpoint_map is not None else None,
+            "compiled_at": cls._compiled_at or None,
+            "ttl": cls._map_ttl,
+        }
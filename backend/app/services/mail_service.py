@@ -0,0 +1,309 @@
+import logging
+import os
+import queue
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
+from app.utils.mail_templates import MailTemplates
+
+logger = logging.getLogger(__name__)
+
+# Settings copied from the app config when the senders start
+MAIL_SETTINGS = (
+    "MAIL_SERVER", "MAIL_PORT", "MAIL_USE_TLS", "MAIL_USE_SSL", "MAIL_USERNAME", "MAIL_PASSWORD",
+    "MAIL_DEFAULT_SENDER", "MAIL_TIMEOUT", "MAIL_MAX_RETRIES", "MAIL_RETRY_BACKOFF", "MAIL_IDLE_TIMEOUT",
+    "MAIL_BATCH_MAX_CONNECT_FAILURES",
+)
+
+def open_smtp_connection(settings):
+    """Open an SMTP session from MAIL_* settings: connect, STARTTLS and log in as configured."""
+    if settings["MAIL_USE_SSL"]:
+        connection = smtplib.SMTP_SSL(settings["MAIL_SERVER"], settings["MAIL_PORT"], timeout=settings["MAIL_TIMEOUT"])
+    else:
+        connection = smtplib.SMTP(settings["MAIL_SERVER"], settings["MAIL_PORT"], timeout=settings["MAIL_TIMEOUT"])
+        if settings["MAIL_USE_TLS"]:
+            connection.starttls()
+    if settings["MAIL_USERNAME"]:
+        connection.login(settings["MAIL_USERNAME"], settings["MAIL_PASSWORD"])
+    return connection
+
+def close_smtp_connection(connection):
+    try:
+        connection.quit()
+    except (smtplib.SMTPException, OSError):
+        connection.close()
+
+def is_permanent_failure(error):
+    """5xx replies and refused recipients will fail the same way on every retry."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+class MailSender(threading.Thread):
+    """Background thread delivering queued messages over one long-lived SMTP connection."""
+
+    def __init__(self, service, settings, jobs, index, max_connect_failures=None):
+        super().__init__(name=f"mail-sender-{index}", daemon=True)
+        self.service = service
+        self.settings = settings
+        self.jobs = jobs
+        self.connection = None
+        self.connections = 0
+        # Failed attempts to open a connection since the last one that succeeded
+        self.connect_failures = 0
+        self.max_connect_failures = max_connect_failures
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while True:
+            try:
+                message = self.jobs.get(timeout=self.settings["MAIL_IDLE_TIMEOUT"])
+            except queue.Empty:
+                # Don't hold an idle session open on the SMTP server
+                self.disconnect()
+                continue
+            try:
+                if message is None:
+                    break
+                self.deliver(message)
+            finally:
+                self.jobs.task_done()
+        self.disconnect()
+
+    def deliver(self, message):
+        """Send one message, retrying transient failures with exponential backoff.
+
+        Gives up early once the server looks unreachable (see ``unreachable``).
+        """
+        retries = self.settings["MAIL_MAX_RETRIES"]
+        backoff = self.settings["MAIL_RETRY_BACKOFF"]
+        attempt = 0
+        while True:
+            reused = self.connection is not None
+            started = time.perf_counter()
+            try:
+                if self.connection is None:
+                    try:
+                        self.connection = open_smtp_connection(self.settings)
+                    except (smtplib.SMTPException, OSError):
+                        self.connect_failures += 1
+                        raise
+                    self.connect_failures = 0
+                    self.connections += 1
+                    self.service.record("connections")
+                self.connection.send_message(message)
+                self.service.record("sent", time.perf_counter() - started)
+                return True
+            except (smtplib.SMTPException, OSError) as e:
+                self.disconnect()
+                if reused and isinstance(e, smtplib.SMTPServerDisconnected):
+                    # The server closed an idle session; reconnect without spending a retry
+                    continue
+                if is_permanent_failure(e) or attempt >= retries or self._stop_event.is_set() or self.unreachable:
+                    self.service.record("failed")
+                    logger.error("Giving up on mail to %s after %d attempt(s): %s", message["To"], attempt + 1, e)
+                    return False
+                self.service.record("retried")
+                self._stop_event.wait(backoff * 2 ** attempt)
+                attempt += 1
+
+    @property
+    def unreachable(self):
+        """True after ``max_connect_failures`` failed connection attempts in a row."""
+        return bool(self.max_connect_failures) and self.connect_failures >= self.max_connect_failures
+
+    def disconnect(self):
+        if self.connection is not None:
+            close_smtp_connection(self.connection)
+            self.connection = None
+
+    def stop(self):
+        self._stop_event.set()
+
+class MailService:
+    """Service class for outbound email on an in-memory queue drained by background senders.
+
+    Callers only build and enqueue a message, so a slow or unreachable SMTP
+    server never holds up a request. Messages still queued when the process
+    exits are lost.
+    """
+
+    _settings = {}
+    _templates = None
+    _jobs = None
+    _senders = []
+    _metrics_lock = threading.Lock()
+    _metrics = {
+        "queued": 0,
+        "sent": 0,
+        "failed": 0,
+        "retried": 0,
+        "rejected": 0,
+        "connections": 0,
+        "send_time_total": 0.0,
+        "send_time_max": 0.0,
+    }
+
+    @classmethod
+    def init_app(cls, app):
+        """Stop any running senders and start MAIL_SENDER_THREADS new ones from the app config."""
+        cls.shutdown()
+        cls._settings = {key: app.config.get(key) for key in MAIL_SETTINGS}
+        cls._templates = MailTemplates(os.path.join(app.root_path, "templates", "email"))
+        cls._jobs = queue.Queue(maxsize=app.config.get("MAIL_QUEUE_SIZE", 1000))
+        cls._senders = [
+            MailSender(cls, cls._settings, cls._jobs, index)
+            for index in range(app.config.get("MAIL_SENDER_THREADS", 2))
+        ]
+        for sender in cls._senders:
+            sender.start()
+        with cls._metrics_lock:
+            for key in cls._metrics:
+                cls._metrics[key] = 0
+
+    @classmethod
+    def shutdown(cls, timeout=5):
+        """Stop the senders within ``timeout`` seconds.
+
+        Queued messages get one more attempt each, without retries or backoff.
+        Whatever is still queued when the time is up is dropped.
+        """
+        senders, cls._senders = cls._senders, []
+        if not senders:
+            return
+        deadline = time.monotonic() + timeout
+        # Stop first: a sender in backoff wakes up now instead of holding the full queue
+        for sender in senders:
+            sender.stop()
+        for sender in senders:
+            try:
+                cls._jobs.put(None, timeout=max(0, deadline - time.monotonic()))
+            except queue.Full:
+                logger.warning("Mail queue still full at shutdown; dropping %d message(s)", cls._jobs.qsize())
+                break
+        for sender in senders:
+            sender.join(max(0, deadline - time.monotonic()))
+
+    @classmethod
+    def build_message(cls, to, subject, body, html=None, sender=None):
+        message = EmailMessage()
+        message["From"] = sender or cls._settings["MAIL_DEFAULT_SENDER"]
+        message["To"] = to
+        message["Subject"] = subject
+        message.set_content(body)
+        if html is not None:
+            message.add_alternative(html, subtype="html")
+        return message
+
+    @classmethod
+    def render(cls, template, to, sender=None, **context):
+        """Build a message from a precompiled template in app/templates/email."""
+        subject, body, html = cls._templates.render(template, **context)
+        return cls.build_message(to, subject, body, html=html, sender=sender)
+
+    @classmethod
+    def send(cls, to, subject, body, html=None, sender=None):
+        """Queue a message for delivery. Returns False if the queue is full."""
+        return cls.enqueue(cls.build_message(to, subject, body, html=html, sender=sender))
+
+    @classmethod
+    def enqueue(cls, message):
+        if not cls._senders:
+            # No sender threads configured: deliver inline
+            cls.record("queued")
+            sender = MailSender(cls, cls._settings, None, 0)
+            try:
+                return sender.deliver(message)
+            finally:
+                sender.disconnect()
+        try:
+            cls._jobs.put_nowait(message)
+        except queue.Full:
+            cls.record("rejected")
+            return False
+        cls.record("queued")
+        return True
+
+    @classmethod
+    def send_batch(cls, messages):
+        """Deliver ``messages`` in the calling thread over a single SMTP session.
+
+        For mass notifications: ``messages`` may be a generator, so rendering
+        and sending overlap. Returns counts and throughput. After
+        MAIL_BATCH_MAX_CONNECT_FAILURES failed connection attempts in a row the
+        batch is aborted; the recipients of the remaining messages are listed
+        under ``not_attempted``.
+        """
+        sender = MailSender(
+            cls, cls._settings, None, 0, max_connect_failures=cls._settings["MAIL_BATCH_MAX_CONNECT_FAILURES"]
+        )
+        sent = failed = 0
+        not_attempted = []
+        messages = iter(messages)
+        started = time.perf_counter()
+        try:
+            for message in messages:
+                if sender.deliver(message):
+                    sent += 1
+                else:
+                    failed += 1
+                if sender.unreachable:
+                    # Don't spend the full retries and backoff on every remaining message
+                    not_attempted = [rest["To"] for rest in messages]
+                    logger.error(
+                        "Aborting mail batch after %d failed connection attempts; %d message(s) not attempted",
+                        sender.connect_failures, len(not_attempted)
+                    )
+                    break
+        finally:
+            sender.disconnect()
+        seconds = time.perf_counter() - started
+        return {
+            "sent": sent,
+            "failed": failed,
+            "aborted": sender.unreachable,
+            "not_attempted": not_attempted,
+            "connections": sender.connections,
+            "seconds": round(seconds, 3),
+            "per_second": round(sent / seconds, 1) if seconds else None,
+        }
+
+    @classmethod
+    def flush(cls, timeout=None):
+        """Wait until every queued message has been sent or given up on. Returns False on timeout."""
+        jobs = cls._jobs
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with jobs.all_tasks_done:
+            while jobs.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                jobs.all_tasks_done.wait(remaining)
+        return True
+
+    @classmethod
+    def record(cls, event, send_time=None):
+        with cls._metrics_lock:
+            cls._metrics[event] += 1
+            if send_time is not None:
+                cls._metrics["send_time_total"] += send_time
+                cls._metrics["send_time_max"] = max(cls._metrics["send_time_max"], send_time)
+
+    @classmethod
+    def stats(cls):
+        with cls._metrics_lock:
+            metrics = dict(cls._metrics)
+        sent = metrics["sent"]
+        return {
+            "senders": len(cls._senders),
+            "queue_depth": cls._jobs.qsize() if cls._jobs is not None else 0,
+            "queued": metrics["queued"],
+            "sent": sent,
+            "failed": metrics["failed"],
+            "retried": metrics["retried"],
+            "rejected": metrics["rejected"],
+            "connections": metrics["connections"],
+            "send_time_avg_ms": round(metrics["send_time_total"] / sent * 1000, 3) if sent else None,
+            "send_time_max_ms": round(metrics["send_time_max"] * 1000, 3),
+        }
@@ -0,0 +1,194 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from werkzeug.security import generate_password_hash, check_password_hash
+
+class PasswordHashingBusy(Exception):
+    """Raised when the password hashing queue is full; maps to 503 with Retry-After."""
+
+    def __init__(self, retry_after):
+        super().__init__("Password hashing capacity exhausted, please retry shortly")
+        self.retry_after = retry_after
+
+class PasswordService:
+    """Service class for password hashing on a dedicated, bounded worker pool"""
+
+    _executor = None
+    # One slot per running or queued hash; when none is free, callers fail fast
+    _slots = threading.BoundedSemaphore(36)
+    _retry_after = 1
+    # Canonical werkzeug method string of the active hashing profile, e.g. "scrypt:32768:8:1"
+    _method = "scrypt:32768:8:1"
+    # Process pool for hash_many (bulk imports); created on first use
+    _process_pool = None
+    _processes = 0
+    _process_pool_lock = threading.Lock()
+    # One slot per bulk import in progress; hash_many bypasses _slots, so imports are capped here
+    _bulk_slots = threading.BoundedSemaphore(1)
+    _metrics_lock = threading.Lock()
+    _metrics = {
+        "completed": 0,
+        "rejected": 0,
+        "in_flight": 0,
+        "queue_wait_total": 0.0,
+        "queue_wait_max": 0.0,
+        "hash_time_total": 0.0,
+        "hash_time_max": 0.0,
+        "bulk_hashed": 0,
+        "bulk_rejected": 0,
+    }
+
+    @classmethod
+    def init_app(cls, app):
+        """Create the worker pool and select the hashing profile from the app config."""
+        workers = app.config.get("PASSWORD_HASH_WORKERS", 4)
+        queue_size = app.config.get("PASSWORD_HASH_QUEUE_SIZE", 32)
+
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=False)
+        cls._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash") if workers else None
+        cls._slots = threading.BoundedSemaphore(workers + queue_size)
+        cls._retry_after = app.config.get("PASSWORD_HASH_RETRY_AFTER", 1)
+
+        with cls._process_pool_lock:
+            if cls._process_pool is not None:
+                cls._process_pool.shutdown(wait=False, cancel_futures=True)
+                cls._process_pool = None
+            cls._processes = app.config.get("PASSWORD_HASH_PROCESSES", 0)
+        cls._bulk_slots = threading.BoundedSemaphore(app.config.get("PASSWORD_HASH_BULK_IMPORTS", 1))
+
+        profiles = app.config.get("PASSWORD_HASH_PROFILES", {})
+        profile = app.config.get("PASSWORD_HASH_PROFILE")
+        if profile not in profiles:
+            raise ValueError(f"Unknown PASSWORD_HASH_PROFILE: {profile}")
+        cls._method = cls.canonical_method(profiles[profile])
+        with cls._metrics_lock:
+            for key in cls._metrics:
+                cls._metrics[key] = 0
+
+    @staticmethod
+    def canonical_method(method):
+        """Expand a method like "pbkdf2" to the full string werkzeug stores, "pbkdf2:sha256:1000000"."""
+        return generate_password_hash("", method).split("$", 1)[0]
+
+    @classmethod
+    def hash_password(cls, password):
+        return cls._run(generate_password_hash, password, cls._method)
+
+    @classmethod
+    def hash_many(cls, passwords):
+        """Hash a batch of passwords across PASSWORD_HASH_PROCESSES worker processes.
+
+        Used by bulk imports, where hashing dominates and one pool thread per
+        request would serialize it. With no processes configured, hashes inline.
+        Callers hold a ``bulk_hashing()`` slot for the whole import.
+        """
+        passwords = list(passwords)
+        hash_one = partial(generate_password_hash, method=cls._method)
+
+        if cls._processes and len(passwords) > 1:
+            chunksize = max(1, len(passwords) // (cls._processes * 4))
+            hashes = list(cls._get_process_pool().map(hash_one, passwords, chunksize=chunksize))
+        else:
+            hashes = [hash_one(password) for password in passwords]
+
+        with cls._metrics_lock:
+            cls._metrics["bulk_hashed"] += len(hashes)
+        return hashes
+
+    @classmethod
+    @contextmanager
+    def bulk_hashing(cls):
+        """Hold one of PASSWORD_HASH_BULK_IMPORTS slots, or raise PasswordHashingBusy if all are taken."""
+        slots = cls._bulk_slots
+        if not slots.acquire(blocking=False):
+            with cls._metrics_lock:
+                cls._metrics["bulk_rejected"] += 1
+            raise PasswordHashingBusy(cls._retry_after)
+        try:
+            yield
+        finally:
+            slots.release()
+
+    @classmethod
+    def _get_process_pool(cls):
+        with cls._process_pool_lock:
+            if cls._process_pool is None:
+                # spawn, not fork: the parent has live threads (hashing pool, scheduler)
+                cls._process_pool = ProcessPoolExecutor(
+                    max_workers=cls._processes, mp_context=multiprocessing.get_context("spawn")
+                )
+            return cls._process_pool
+
+    @classmethod
+    def needs_rehash(cls, password_hash):
+        """True when a stored hash was made with a different method or cost than the active profile."""
+        return bool(password_hash) and password_hash.split("$", 1)[0] != cls._method
+
+    @classmethod
+    def verify_password(cls, password_hash, password):
+        if not password_hash:
+            return False
+        return cls._run(check_password_hash, password_hash, password)
+
+    @classmethod
+    def _run(cls, func, *args):
+        """Run a KDF call on the pool and wait for it, or raise PasswordHashingBusy if the queue is full."""
+        if not cls._slots.acquire(blocking=False):
+            with cls._metrics_lock:
+                cls._metrics["rejected"] += 1
+            raise PasswordHashingBusy(cls._retry_after)
+
+        slots = cls._slots
+        enqueued = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                cls._record(started - enqueued, time.perf_counter() - started)
+
+        with cls._metrics_lock:
+            cls._metrics["in_flight"] += 1
+        try:
+            if cls._executor is None:
+                return task()
+            return cls._executor.submit(task).result()
+        finally:
+            with cls._metrics_lock:
+                cls._metrics["in_flight"] -= 1
+            slots.release()
+
+    @classmethod
+    def _record(cls, queue_wait, hash_time):
+        with cls._metrics_lock:
+            metrics = cls._metrics
+            metrics["completed"] += 1
+            metrics["queue_wait_total"] += queue_wait
+            metrics["queue_wait_max"] = max(metrics["queue_wait_max"], queue_wait)
+            metrics["hash_time_total"] += hash_time
+            metrics["hash_time_max"] = max(metrics["hash_time_max"], hash_time)
+
+    @classmethod
+    def stats(cls):
+        with cls._metrics_lock:
+            metrics = dict(cls._metrics)
+        completed = metrics["completed"]
+        return {
+            "method": cls._method,
+            "workers": cls._executor._max_workers if cls._executor is not None else 0,
+            "completed": completed,
+            "rejected": metrics["rejected"],
+            "bulk_hashed": metrics["bulk_hashed"],
+            "bulk_rejected": metrics["bulk_rejected"],
+            "processes": cls._processes,
+            "in_flight": metrics["in_flight"],
+            "queue_wait_avg_ms": round(metrics["queue_wait_total"] / completed * 1000, 3) if completed else None,
+            "queue_wait_max_ms": round(metrics["queue_wait_max"] * 1000, 3),
+            "hash_time_avg_ms": round(metrics["hash_time_total"] / completed * 1000, 3) if completed else None,
+            "hash_time_max_ms": round(metrics["hash_time_max"] * 1000, 3),
+        }
@@ -0,0 +1,162 @@
+import threading
+from flask import g, has_app_context
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from app.models.rbac import Permission, UserRole, RolePermission
+from app.utils.cache import TTLCache
+
+class PermissionResolverService:
+    """Service class for resolving a user's effective permissions, cached per user"""
+
+    # user_id -> (frozenset of role ids, frozenset of permission names)
+    _cache = TTLCache(maxsize=10000, ttl=300)
+    # role_id -> frozenset of permission names, used when role ids come from token claims
+    _role_cache = TTLCache(maxsize=1000, ttl=300)
+    # Bumped on every invalidation so a resolve racing a mutation is not cached
+    _generation = 0
+    _lock = threading.Lock()
+
+    @classmethod
+    def init_app(cls, app):
+        """Size the cache from the app config."""
+        cls._cache = TTLCache(
+            maxsize=app.config.get("PERMISSION_CACHE_SIZE", 10000),
+            ttl=app.config.get("PERMISSION_CACHE_TTL", 300)
+        )
+        cls._role_cache = TTLCache(
+            maxsize=app.config.get("PERMISSION_ROLE_CACHE_SIZE", 1000),
+            ttl=app.config.get("PERMISSION_CACHE_TTL", 300)
+        )
+
+    @classmethod
+    def get_user_permissions(cls, user_id, role_ids=None):
+        """Return the names of every permission granted to the user through their roles.
+
+        ``role_ids`` may be passed from verified, current token claims; the
+        user's role assignments are then not looked up at all.
+        """
+        if role_ids is not None:
+            return cls.get_role_permissions(role_ids)
+
+        memo = cls._request_memo()
+        if memo is not None and user_id in memo:
+            return memo[user_id]
+
+        entry = cls._cache.get(user_id)
+        if entry is None:
+            entry = cls._resolve(user_id)
+
+        if memo is not None:
+            memo[user_id] = entry[1]
+        return entry[1]
+
+    @classmethod
+    def has_permission(cls, user_id, permission_name, role_ids=None):
+        return permission_name in cls.get_user_permissions(user_id, role_ids)
+
+    @classmethod
+    def get_user_role_ids(cls, user_id):
+        entry = cls._cache.get(user_id)
+        if entry is None:
+            entry = cls._resolve(user_id)
+        return entry[0]
+
+    @classmethod
+    def get_role_permissions(cls, role_ids):
+        """Return the union of the permissions of the given roles, loading uncached roles in one query."""
+        permissions = set()
+        missing = []
+        for role_id in role_ids:
+            cached = cls._role_cache.get(role_id)
+            if cached is None:
+                missing.append(role_id)
+            else:
+                permissions.update(cached)
+
+        if missing:
+            generation = cls._generation
+            try:
+                rows = (
+                    db.session.query(RolePermission.role_id, Permission.name)
+                    .join(Permission, Permission.id == RolePermission.permission_id)
+                    .filter(RolePermission.role_id.in_(missing))
+                    .all()
+                )
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                raise e
+
+            loaded = {role_id: set() for role_id in missing}
+            for role_id, name in rows:
+                loaded[role_id].add(name)
+            with cls._lock:
+                for role_id, names in loaded.items():
+                    if generation == cls._generation:
+                        cls._role_cache.set(role_id, frozenset(names))
+                    permissions.update(names)
+
+        return frozenset(permissions)
+
+    @classmethod
+    def _resolve(cls, user_id):
+        """Load role ids and permission names for a user in a single joined query."""
+        generation = cls._generation
+        try:
+            rows = (
+                db.session.query(UserRole.role_id, Permission.name)
+                .outerjoin(RolePermission, RolePermission.role_id == UserRole.role_id)
+                .outerjoin(Permission, Permission.id == RolePermission.permission_id)
+                .filter(UserRole.user_id == user_id)
+                .all()
+            )
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
+        entry = (
+            frozenset(role_id for role_id, _ in rows),
+            frozenset(name for _, name in rows if name is not None)
+        )
+        with cls._lock:
+            if generation == cls._generation:
+                cls._cache.set(user_id, entry)
+        return entry
+
+    @staticmethod
+    def _request_memo():
+        if not has_app_context():
+            return None
+        if "user_permissions" not in g:
+            g.user_permissions = {}
+        return g.user_permissions
+
+    @classmethod
+    def _bump(cls):
+        with cls._lock:
+            cls._generation += 1
+        if has_app_context():
+            g.pop("user_permissions", None)
+
+    @classmethod
+    def invalidate_user(cls, user_id):
+        """Forget a user's permissions after their role assignments change."""
+        cls._bump()
+        cls._cache.pop(user_id)
+
+    @classmethod
+    def invalidate_role(cls, role_id):
+        """Forget the permissions of every cached user holding the role."""
+        cls._bump()
+        cls._cache.evict_where(lambda entry: role_id in entry[0])
+        cls._role_cache.pop(role_id)
+
+    @classmethod
+    def invalidate_all(cls):
+        """Forget everything, e.g. after a permission is renamed or deleted."""
+        cls._bump()
+        cls._cache.clear()
+        cls._role_cache.clear()
+
+    @classmethod
+    def stats(cls):
+        return {"cache": cls._cache.stats(), "role_cache": cls._role_cache.stats(), "generation": cls._generation}
@@ -1,15 +1,46 @@
 from sqlalchemy.exc import SQLAlchemyError
 from app.extensions import db
 from app.models.rbac import Permission
+from app.services.permission_resolver_service import PermissionResolverService
+from app.services.endpoint_permission_service import EndpointPermissionService
+from app.utils.etag import table_version
+from app.utils.pagination import paginate, iter_rows
 
 class PermissionService:
     """Service class for permission operations"""
 
+    LIST_FILTERS = {"name": str}
+    LIST_FIELDS = {
+        "id": Permission.id,
+        "name": Permission.name,
+        "description": Permission.description,
+        "created_at": Permission.created_at,
+        "updated_at": Permission.updated_at,
+    }
+    DEFAULT_FIELDS = ("id", "name", "description", "created_at")
+
+    @staticmethod
+    def get_all_permissions(cursor=None, limit=None, filters=None, fields=None):
+        try:
+            return paginate(Permission, PermissionService.LIST_FIELDS, fields or PermissionService.DEFAULT_FIELDS, cursor, limit, filters)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
+    @staticmethod
+    def export_permissions(cursor=None, filters=None, fields=None):
+        """Yield every permission as a dict, reading the table in batches."""
+        try:
+            yield from iter_rows(Permission, PermissionService.LIST_FIELDS, fields or PermissionService.DEFAULT_FIELDS, cursor, filters)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
     @staticmethod
-    def get_all_permissions():
+    def get_permissions_version():
+        """Cheap probe for ETags on GET /permissions."""
         try:
-            permissions = Permission.query.all()
-            return [perm.to_dict() for perm in permissions]
+            return table_version(Permission)
         except SQLAlchemyError as e:
             db.session.rollback()
             raise e
@@ -46,6 +77,9 @@ class PermissionService:
                     setattr(permission, key, value)
 
             db.session.commit()
+            if "name" in kwargs:
+                PermissionResolverService.invalidate_all()
+                EndpointPermissionService.invalidate_endpoint_map()
             return permission.to_dict()
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -60,6 +94,8 @@ class PermissionService:
 
             db.session.delete(permission)
             db.session.commit()
+            PermissionResolverService.invalidate_all()
+            EndpointPermissionService.invalidate_endpoint_map()
             return True
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -0,0 +1,82 @@
+import hashlib
+import math
+import threading
+from app.utils.rate_limit import create_rate_limit_backend
+
+class RateLimitExceeded(Exception):
+    """Raised when a client is over an endpoint's rate limit; maps to 429 with Retry-After."""
+
+    def __init__(self, retry_after):
+        super().__init__("Too many requests, please retry later")
+        self.retry_after = retry_after
+
+class RateLimitService:
+    """Service class for per-endpoint rate limits keyed by client IP and by account"""
+
+    _enabled = False
+    # Endpoint name -> {"ip": (limit, window_seconds), "account": (limit, window_seconds)}
+    _limits = {}
+    _backend = None
+    _metrics_lock = threading.Lock()
+    _metrics = {"allowed": 0, "limited": 0}
+
+    @classmethod
+    def init_app(cls, app, backend=None):
+        """Load RATE_LIMITS and connect the RATE_LIMIT_STORAGE_URL backend, unless ``backend`` is given."""
+        cls._enabled = app.config.get("RATE_LIMIT_ENABLED", True)
+        cls._limits = {}
+        for endpoint_name, scopes in app.config.get("RATE_LIMITS", {}).items():
+            for scope, (limit, window) in scopes.items():
+                if scope not in ("ip", "account"):
+                    raise ValueError(f"Unknown rate limit scope for {endpoint_name}: {scope}")
+                if limit < 1 or window <= 0:
+                    raise ValueError(f"Invalid rate limit for {endpoint_name}.{scope}: {limit}/{window}s")
+                cls._limits.setdefault(endpoint_name, {})[scope] = (limit, window)
+        cls._backend = backend or create_rate_limit_backend(app.config.get("RATE_LIMIT_STORAGE_URL"))
+        with cls._metrics_lock:
+            for key in cls._metrics:
+                cls._metrics[key] = 0
+
+    @classmethod
+    def is_limited(cls, endpoint_name):
+        return cls._enabled and endpoint_name in cls._limits
+
+    @classmethod
+    def check(cls, endpoint_name, ip, account=None):
+        """Count a request against the endpoint's limits or raise RateLimitExceeded.
+
+        The request counts against every scope or, if any scope rejects it, none.
+        """
+        if not cls.is_limited(endpoint_name):
+            return
+        hits = []
+        for scope, identity in (("ip", ip), ("account", account)):
+            rule = cls._limits[endpoint_name].get(scope)
+            if rule is None or not identity:
+                continue
+            # Hash identities so emails and addresses never sit in shared storage in clear text
+            digest = hashlib.sha256(identity.encode("utf-8")).hexdigest()[:32]
+            hits.append((f"{endpoint_name}:{scope}:{digest}", *rule))
+        if hits:
+            allowed, retry_after = cls._backend.hit_many(hits)
+            if not allowed:
+                cls._record("limited")
+                raise RateLimitExceeded(max(1, math.ceil(retry_after)))
+        cls._record("allowed")
+
+    @classmethod
+    def _record(cls, event):
+        with cls._metrics_lock:
+            cls._metrics[event] += 1
+
+    @classmethod
+    def stats(cls):
+        with cls._metrics_lock:
+            metrics = dict(cls._metrics)
+        return {
+            "enabled": cls._enabled,
+            "backend": cls._backend.name if cls._backend is not None else None,
+            "endpoints": sorted(cls._limits),
+            "allowed": metrics["allowed"],
+            "limited": metrics["limited"],
+        }
@@ -1,21 +1,48 @@
-from sqlalchemy.exc import SQLAlchemyError
+from flask import current_app
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from app.extensions import db
-from app.models.rbac import RolePermission
+from app.models.rbac import Permission, Role, RolePermission
+from app.services.permission_resolver_service import PermissionResolverService
+from app.utils.db_errors import is_unique_violation
+from app.utils.pagination import paginate, iter_rows
 
 class RolePermissionService:
     """Service class for role-permission assignments"""
 
+    LIST_FILTERS = {"role_id": int, "permission_id": int}
+    LIST_FIELDS = {
+        "id": RolePermission.id,
+        "role_id": RolePermission.role_id,
+        "permission_id": RolePermission.permission_id,
+        "created_at": RolePermission.created_at,
+        "updated_at": RolePermission.updated_at,
+    }
+    DEFAULT_FIELDS = ("id", "role_id", "permission_id")
+
     @staticmethod
     def assign_permission_to_role(role_id, permission_id):
+        """Assign one permission; returns None if the role already has it, raises ValueError for an unknown role or permission."""
         try:
             role_perm = RolePermission(role_id=role_id, permission_id=permission_id)
             db.session.add(role_perm)
             db.session.commit()
+            PermissionResolverService.invalidate_role(role_id)
             return {
                 "id": role_perm.id,
                 "role_id": role_perm.role_id,
                 "permission_id": role_perm.permission_id
             }
+        except IntegrityError as e:
+            db.session.rollback()
+            if is_unique_violation(e, RolePermission.__table__, "uq_role_permissions_role_id_permission_id"):
+                return None
+            # Otherwise a foreign key: report whichever side doesn't exist
+            if db.session.scalar(select(Role.id).where(Role.id == role_id)) is None:
+                raise ValueError(f"Unknown role id: {role_id}")
+            if db.session.scalar(select(Permission.id).where(Permission.id == permission_id)) is None:
+                raise ValueError(f"Unknown permission id: {permission_id}")
+            raise e
         except SQLAlchemyError as e:
             db.session.rollback()
             raise e
@@ -23,39 +50,105 @@ class RolePermissionService:
     @staticmethod
     def remove_permission_from_role(role_id, permission_id):
         try:
-            role_perm = RolePermission.query.filter_by(role_id=role_id, permission_id=permission_id).first()
-            if not role_perm:
+            # Single DELETE that seeks the (role_id, permission_id) unique index
+            deleted = db.session.execute(
+                delete(RolePermission)
+                .where(RolePermission.role_id == role_id)
+                .where(RolePermission.permission_id == permission_id)
+            ).rowcount
+            if not deleted:
+                db.session.rollback()
                 return False
 
-            db.session.delete(role_perm)
             db.session.commit()
+            PermissionResolverService.invalidate_role(role_id)
             return True
         except SQLAlchemyError as e:
             db.session.rollback()
             raise e
 
+    @staticmethod
+    def set_role_permissions(role_id, permission_ids):
+        """Make ``permission_ids`` the exact permission set of a role.
+
+        The current set is read in one query and only the difference is
+        written: one executemany INSERT for additions and batched DELETEs for
+        removals, all in a single transaction. Returns None if the role does
+        not exist; raises ValueError for unknown permission ids.
+        """
+        target = set(permission_ids)
+        batch_size = current_app.config.get("RBAC_SYNC_BATCH_SIZE", 500)
+        try:
+            # Lock the role row so concurrent syncs of the same role serialize
+            role = db.session.execute(
+                select(Role.id).where(Role.id == role_id).with_for_update()
+            ).first()
+            if role is None:
+                db.session.rollback()
+                return None
+
+            current = set(db.session.scalars(
+                select(RolePermission.permission_id).where(RolePermission.role_id == role_id)
+            ))
+            to_add = sorted(target - current)
+            to_remove = sorted(current - target)
+
+            if to_add:
+                known = set(db.session.scalars(select(Permission.id).where(Permission.id.in_(to_add))))
+                unknown = sorted(set(to_add) - known)
+                if unknown:
+                    db.session.rollback()
+                    raise ValueError(f"Unknown permission ids: {unknown}")
+                db.session.execute(
+                    insert(RolePermission),
+                    [{"role_id": role_id, "permission_id": permission_id} for permission_id in to_add]
+                )
+            for start in range(0, len(to_remove), batch_size):
+                db.session.execute(
+                    delete(RolePermission)
+                    .where(RolePermission.role_id == role_id)
+                    .where(RolePermission.permission_id.in_(to_remove[start:start + batch_size]))
+                )
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
+        if to_add or to_remove:
+            PermissionResolverService.invalidate_role(role_id)
+        return {
+            "role_id": role_id,
+            "permission_ids": sorted(target),
+            "added": to_add,
+            "removed": to_remove
+        }
+
     @staticmethod
     def get_permissions_by_role(role_id):
         try:
-            role_perms = RolePermission.query.filter_by(role_id=role_id).all()
-            return [{"permission_id": rp.permission_id} for rp in role_perms]
+            # Selecting only permission_id lets this be answered from the (role_id, permission_id) index
+            permission_ids = db.session.scalars(
+                select(RolePermission.permission_id).where(RolePermission.role_id == role_id)
+            )
+            return [{"permission_id": permission_id} for permission_id in permission_ids]
         except SQLAlchemyError as e:
             db.session.rollback()
             raise e
         
     @staticmethod
-    def get_all_role_permissions():
-        """Retrieve all role-permission assignments"""
+    def get_all_role_permissions(cursor=None, limit=None, filters=None, fields=None):
+        """Retrieve one page of role-permission assignments"""
+        try:
+            return paginate(RolePermission, RolePermissionService.LIST_FIELDS, fields or RolePermissionService.DEFAULT_FIELDS, cursor, limit, filters)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
+    @staticmethod
+    def export_role_permissions(cursor=None, filters=None, fields=None):
+        """Yield every role-permission assignment, reading the table in batches."""
         try:
-            role_perms = RolePermission.query.all()
-            return [
-                {
-                    "id": rp.id,
-                    "role_id": rp.role_id,
-                    "permission_id": rp.permission_id
-                }
-                for rp in role_perms
-            ]
+            yield from iter_rows(RolePermission, RolePermissionService.LIST_FIELDS, fields or RolePermissionService.DEFAULT_FIELDS, cursor, filters)
         except SQLAlchemyError as e:
             db.session.rollback()
             raise e
@@ -1,15 +1,45 @@
 from sqlalchemy.exc import SQLAlchemyError
 from app.extensions import db
 from app.models.rbac import Role
+from app.services.permission_resolver_service import PermissionResolverService
+from app.utils.etag import table_version
+from app.utils.pagination import paginate, iter_rows
 
 class RoleService:
     """Service class for role operations"""
 
+    LIST_FILTERS = {"name": str}
+    LIST_FIELDS = {
+        "id": Role.id,
+        "name": Role.name,
+        "description": Role.description,
+        "created_at": Role.created_at,
+        "updated_at": Role.updated_at,
+    }
+    DEFAULT_FIELDS = ("id", "name", "description", "created_at")
+
+    @staticmethod
+    def get_all_roles(cursor=None, limit=None, filters=None, fields=None):
+        try:
+            return paginate(Role, RoleService.LIST_FIELDS, fields or RoleService.DEFAULT_FIELDS, cursor, limit, filters)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
+    @staticmethod
+    def export_roles(cursor=None, filters=None, fields=None):
+        """Yield every role as a dict, reading the table in batches."""
+        try:
+            yield from iter_rows(Role, RoleService.LIST_FIELDS, fields or RoleService.DEFAULT_FIELDS, cursor, filters)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
     @staticmethod
-    def get_all_roles():
+    def get_roles_version():
+        """Cheap probe for ETags on GET /roles."""
         try:
-            roles = Role.query.all()
-            return [role.to_dict() for role in roles]
+            return table_version(Role)
         except SQLAlchemyError as e:
             db.session.rollback()
             raise e
@@ -60,6 +90,7 @@ class RoleService:
 
             db.session.delete(role)
             db.session.commit()
+            PermissionResolverService.invalidate_role(role_id)
             return True
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -0,0 +1,290 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from app.models.token_blocklist import TokenBlocklist
+from app.utils.bloom import BloomFilter
+from app.utils.cache import TTLCache
+
+class TokenBlocklistService:
+    """Service class for token revocation, with in-process caches in front of TokenBlocklist"""
+
+    # Revoked JTIs, each kept until the token itself expires
+    _revoked = TTLCache(maxsize=10000)
+    # JTIs confirmed as not revoked, kept for at most _negative_ttl seconds
+    _not_revoked = TTLCache(maxsize=100000)
+    _negative_ttl = 60
+
+    # Bloom filter of revoked JTIs; a miss means "not revoked as of the last sync".
+    # Misses are only trusted while the filter was synced within _negative_ttl seconds.
+    _bloom = None
+    _bloom_enabled = True
+    _bloom_capacity = 100000
+    _bloom_error_rate = 0.001
+    _bloom_refresh_interval = 300
+    _bloom_built_at = 0.0
+    _bloom_synced_at = 0.0
+    _bloom_build_seconds = None
+    # JTIs revoked while a rebuild is running, merged into the new filter before it is swapped in
+    _bloom_pending = None
+    # Held by the one thread rebuilding or syncing
+    _bloom_lock = threading.Lock()
+    # Held for every change to a filter's bits
+    _bloom_add_lock = threading.Lock()
+    _bloom_counters = {
+        "checks": 0, "negatives": 0, "true_positives": 0, "false_positives": 0,
+        "rebuilds": 0, "syncs": 0, "failures": 0,
+    }
+
+    # Result of the most recent purge_expired run
+    _last_purge = None
+
+    @classmethod
+    def init_app(cls, app):
+        """Size the caches and the Bloom filter from the app config."""
+        cls._revoked = TTLCache(maxsize=app.config.get("REVOCATION_CACHE_SIZE", 10000))
+        cls._not_revoked = TTLCache(maxsize=app.config.get("REVOCATION_NEGATIVE_CACHE_SIZE", 100000))
+        cls._negative_ttl = app.config.get("REVOCATION_NEGATIVE_CACHE_TTL", 60)
+
+        cls._bloom_enabled = app.config.get("REVOCATION_BLOOM_ENABLED", True)
+        cls._bloom_capacity = app.config.get("REVOCATION_BLOOM_CAPACITY", 100000)
+        cls._bloom_error_rate = app.config.get("REVOCATION_BLOOM_ERROR_RATE", 0.001)
+        cls._bloom_refresh_interval = app.config.get("REVOCATION_BLOOM_REFRESH_SECONDS", 300)
+        cls._reset_bloom()
+
+    @classmethod
+    def is_token_revoked(cls, jti, expires_at=None):
+        """Check whether a token is revoked, hitting the database only when the caches can't answer.
+
+        ``expires_at`` is the token's ``exp`` claim (epoch seconds); cached
+        answers never outlive it.
+        """
+        if cls._revoked.get(jti):
+            return True
+        if cls._not_revoked.get(jti):
+            return False
+
+        bloom = cls._get_bloom()
+        if bloom is not None:
+            cls._bloom_counters["checks"] += 1
+            if jti not in bloom:
+                cls._bloom_counters["negatives"] += 1
+                return False
+
+        now = time.time()
+        expires_at = expires_at or now + cls._negative_ttl
+        revoked = TokenBlocklist.is_token_revoked(jti)
+
+        if bloom is not None:
+            cls._bloom_counters["true_positives" if revoked else "false_positives"] += 1
+
+        if expires_at <= now:
+            return revoked
+        if revoked:
+            cls._revoked.set(jti, True, expires_at=expires_at)
+        else:
+            cls._not_revoked.set(jti, True, expires_at=min(expires_at, now + cls._negative_ttl))
+        return revoked
+
+    @classmethod
+    def revoke_token(cls, jti, token_type, user_id, expires_at):
+        """Add a token to the blocklist and record it in the caches.
+
+        ``expires_at`` is the token's ``exp`` claim (epoch seconds).
+        """
+        try:
+            revoked_token = TokenBlocklist(
+                jti=jti,
+                token_type=token_type,
+                user_id=user_id,
+                expires_at=datetime.fromtimestamp(expires_at)
+            )
+            db.session.add(revoked_token)
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
+        cls._remember_revoked(jti, expires_at)
+        return revoked_token
+
+    @classmethod
+    def _remember_revoked(cls, jti, expires_at):
+        """Record a revocation made by this process in the caches and the Bloom filter."""
+        cls._not_revoked.pop(jti)
+        cls._revoked.set(jti, True, expires_at=expires_at)
+        with cls._bloom_add_lock:
+            if cls._bloom is not None:
+                cls._bloom.add(jti)
+            if cls._bloom_pending is not None:
+                cls._bloom_pending.append(jti)
+
+    @classmethod
+    def _get_bloom(cls):
+        """Return the Bloom filter if it was synced within the negative-cache TTL, else None.
+
+        Request threads only read the filter; the blocklist-bloom job keeps it
+        fresh (see refresh_bloom_filter). Until it has been built, or when the
+        job falls behind, callers get None and ask the database, so a
+        revocation by another worker is never missed for longer than the
+        negative cache would miss it.
+        """
+        if not cls._bloom_enabled:
+            return None
+        bloom = cls._bloom
+        if bloom is None or time.time() - cls._bloom_synced_at > cls._negative_ttl:
+            return None
+        return bloom
+
+    @classmethod
+    def refresh_bloom_filter(cls):
+        """Rebuild the filter every _bloom_refresh_interval, otherwise add recent revocations to it.
+
+        Run by the blocklist-bloom job every REVOCATION_BLOOM_SYNC_SECONDS.
+        """
+        if not cls._bloom_enabled:
+            return None
+        with cls._bloom_lock:
+            try:
+                if cls._bloom is None or time.time() - cls._bloom_built_at > cls._bloom_refresh_interval:
+                    return {"rebuilt": len(cls.rebuild_bloom_filter())}
+                return {"synced": cls.sync_bloom_filter()}
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                cls._bloom_counters["failures"] += 1
+                raise e
+
+    @classmethod
+    def rebuild_bloom_filter(cls):
+        """Build a fresh Bloom filter from the unexpired rows of token_blocklist and swap it in."""
+        started = time.perf_counter()
+        synced_at = time.time()
+        with cls._bloom_add_lock:
+            cls._bloom_pending = []
+        try:
+            # expires_at is stored in server local time (see revoke_token)
+            query = (
+                db.session.query(TokenBlocklist.jti)
+                .filter(TokenBlocklist.expires_at > datetime.now())
+            )
+            row_count = query.count()
+
+            # Oversize the filter so incremental adds keep it near the target error rate
+            bloom = BloomFilter(
+                capacity=max(cls._bloom_capacity, int(row_count * 1.5)),
+                error_rate=cls._bloom_error_rate
+            )
+            for (jti,) in query.yield_per(10000):
+                bloom.add(jti)
+
+            # Revocations made by this process while the query ran would otherwise be lost
+            with cls._bloom_add_lock:
+                for jti in cls._bloom_pending:
+                    bloom.add(jti)
+                cls._bloom = bloom
+        finally:
+            with cls._bloom_add_lock:
+                cls._bloom_pending = None
+
+        cls._bloom_built_at = cls._bloom_synced_at = synced_at
+        cls._bloom_build_seconds = round(time.perf_counter() - started, 4)
+        cls._bloom_counters["rebuilds"] += 1
+        return bloom
+
+    @classmethod
+    def sync_bloom_filter(cls):
+        """Add revocations recorded since the last sync, including other workers', to the filter.
+
+        Reads rows by revoked_at, overlapping the previous sync by the negative
+        TTL to allow for clock skew between hosts and slow commits.
+        """
+        synced_at = time.time()
+        # revoked_at is stored in UTC (TokenBlocklist default)
+        since = datetime.utcnow() - timedelta(seconds=synced_at - cls._bloom_synced_at + cls._negative_ttl)
+        jtis = [
+            jti for (jti,) in db.session.query(TokenBlocklist.jti).filter(TokenBlocklist.revoked_at >= since)
+        ]
+        with cls._bloom_add_lock:
+            bloom = cls._bloom
+            for jti in jtis:
+                if jti not in bloom:
+                    bloom.add(jti)
+        cls._bloom_synced_at = synced_at
+        cls._bloom_counters["syncs"] += 1
+        return len(jtis)
+
+    @classmethod
+    def _reset_bloom(cls):
+        cls._bloom = None
+        cls._bloom_built_at = cls._bloom_synced_at = 0.0
+
+    @classmethod
+    def purge_expired(cls, batch_size=1000, max_batches=None):
+        """Delete expired blocklist rows in bounded batches, committing after each one.
+
+        Small batches keep each DELETE short, so the table is never locked for
+        long. Returns the number of rows purged and the time the run took.
+        """
+        started = time.perf_counter()
+        # expires_at is stored in server local time (see revoke_token)
+        cutoff = datetime.now()
+        purged = 0
+        batches = 0
+
+        try:
+            while max_batches is None or batches < max_batches:
+                ids = [
+                    row_id for (row_id,) in db.session.query(TokenBlocklist.id)
+                    .filter(TokenBlocklist.expires_at <= cutoff)
+                    .order_by(TokenBlocklist.expires_at)
+                    .limit(batch_size)
+                ]
+                if not ids:
+                    break
+
+                db.session.query(TokenBlocklist).filter(TokenBlocklist.id.in_(ids)).delete(synchronize_session=False)
+                db.session.commit()
+                purged += len(ids)
+                batches += 1
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
+        cls._last_purge = {
+            "purged": purged,
+            "batches": batches,
+            "seconds": round(time.perf_counter() - started, 4),
+            "finished_at": datetime.utcnow().isoformat(),
+        }
+        return dict(cls._last_purge)
+
+    @classmethod
+    def clear_cache(cls):
+        cls._revoked.clear()
+        cls._not_revoked.clear()
+        cls._reset_bloom()
+        for key in cls._bloom_counters:
+            cls._bloom_counters[key] = 0
+
+    @classmethod
+    def stats(cls):
+        counters = dict(cls._bloom_counters)
+        checks = counters["checks"]
+        bloom = cls._bloom
+        return {
+            "revoked_cache": cls._revoked.stats(),
+            "not_revoked_cache": cls._not_revoked.stats(),
+            "bloom": {
+                "enabled": cls._bloom_enabled,
+                "filter": bloom.stats() if bloom is not None else None,
+                "built_at": cls._bloom_built_at or None,
+                "synced_at": cls._bloom_synced_at or None,
+                "build_seconds": cls._bloom_build_seconds,
+                "refresh_interval": cls._bloom_refresh_interval,
+                "negative_rate": round(counters["negatives"] / checks, 4) if checks else None,
+                "observed_false_positive_rate": round(counters["false_positives"] / checks, 6) if checks else None,
+                **counters,
+            },
+            "last_purge": cls._last_purge,
+        }
@@ -1,23 +1,41 @@
-from sqlalchemy.exc import SQLAlchemyError
+from flask import current_app
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from app.extensions import db
-from app.models.rbac import UserRole
+from app.models.rbac import Role, UserRole
+from app.models.user import User
+from app.services.auth_service import AuthService
+from app.services.permission_resolver_service import PermissionResolverService
+from app.utils.db_errors import is_unique_violation
+from app.utils.pagination import paginate, iter_rows
 
 class UserRoleService:
     """Service class for user-role assignments"""
 
+    LIST_FILTERS = {"user_id": int, "role_id": int}
+    LIST_FIELDS = {
+        "id": UserRole.id,
+        "user_id": UserRole.user_id,
+        "role_id": UserRole.role_id,
+        "created_at": UserRole.created_at,
+        "updated_at": UserRole.updated_at,
+    }
+    DEFAULT_FIELDS = ("id", "user_id", "role_id")
+
     @staticmethod
-    def get_all_user_roles():
-        """Retrieve all user-role assignments"""
+    def get_all_user_roles(cursor=None, limit=None, filters=None, fields=None):
+        """Retrieve one page of user-role assignments"""
         try:
-            user_roles = UserRole.query.all()
-            return [
-                {
-                    "id": ur.id,
-                    "user_id": ur.user_id,
-                    "role_id": ur.role_id
-                }
-                for ur in user_roles
-            ]
+            return paginate(UserRole, UserRoleService.LIST_FIELDS, fields or UserRoleService.DEFAULT_FIELDS, cursor, limit, filters)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
+    @staticmethod
+    def export_user_roles(cursor=None, filters=None, fields=None):
+        """Yield every user-role assignment, reading the table in batches."""
+        try:
+            yield from iter_rows(UserRole, UserRoleService.LIST_FIELDS, fields or UserRoleService.DEFAULT_FIELDS, cursor, filters)
         except SQLAlchemyError as e:
             db.session.rollback()
             raise e
@@ -25,15 +43,29 @@ class UserRoleService:
 
     @staticmethod
     def assign_role_to_user(user_id, role_id):
+        """Assign one role; returns None if the user already has it, raises ValueError for an unknown user or role."""
         try:
             user_role = UserRole(user_id=user_id, role_id=role_id)
             db.session.add(user_role)
+            UserRoleService._bump_permissions_version(user_id)
             db.session.commit()
+            PermissionResolverService.invalidate_user(user_id)
+            AuthService.invalidate_user_versions(user_id)
             return {
                 "id": user_role.id,
                 "user_id": user_role.user_id,
                 "role_id": user_role.role_id
             }
+        except IntegrityError as e:
+            db.session.rollback()
+            if is_unique_violation(e, UserRole.__table__, "uq_user_roles_user_id_role_id"):
+                return None
+            # Otherwise a foreign key: report whichever side doesn't exist
+            if db.session.scalar(select(User.id).where(User.id == user_id)) is None:
+                raise ValueError(f"Unknown user id: {user_id}")
+            if db.session.scalar(select(Role.id).where(Role.id == role_id)) is None:
+                raise ValueError(f"Unknown role id: {role_id}")
+            raise e
         except SQLAlchemyError as e:
             db.session.rollback()
             raise e
@@ -41,22 +73,97 @@ class UserRoleService:
     @staticmethod
     def remove_role_from_user(user_id, role_id):
         try:
-            user_role = UserRole.query.filter_by(user_id=user_id, role_id=role_id).first()
-            if not user_role:
+            # Single DELETE that seeks the (user_id, role_id) unique index
+            deleted = db.session.execute(
+                delete(UserRole)
+                .where(UserRole.user_id == user_id)
+                .where(UserRole.role_id == role_id)
+            ).rowcount
+            if not deleted:
+                db.session.rollback()
                 return False
 
-            db.session.delete(user_role)
+            UserRoleService._bump_permissions_version(user_id)
             db.session.commit()
+            PermissionResolverService.invalidate_user(user_id)
+            AuthService.invalidate_user_versions(user_id)
             return True
         except SQLAlchemyError as e:
             db.session.rollback()
             raise e
 
+    @staticmethod
+    def set_user_roles(user_id, role_ids):
+        """Make ``role_ids`` the exact role set of a user.
+
+        Same diffing as RolePermissionService.set_role_permissions; when the
+        set changes, permissions_version is bumped in the same transaction.
+        Returns None if the user does not exist; raises ValueError for
+        unknown role ids.
+        """
+        target = set(role_ids)
+        batch_size = current_app.config.get("RBAC_SYNC_BATCH_SIZE", 500)
+        try:
+            # Lock the user row so concurrent syncs of the same user serialize
+            user = db.session.execute(
+                select(User.id).where(User.id == user_id).with_for_update()
+            ).first()
+            if user is None:
+                db.session.rollback()
+                return None
+
+            current = set(db.session.scalars(
+                select(UserRole.role_id).where(UserRole.user_id == user_id)
+            ))
+            to_add = sorted(target - current)
+            to_remove = sorted(current - target)
+
+            if to_add:
+                known = set(db.session.scalars(select(Role.id).where(Role.id.in_(to_add))))
+                unknown = sorted(set(to_add) - known)
+                if unknown:
+                    db.session.rollback()
+                    raise ValueError(f"Unknown role ids: {unknown}")
+                db.session.execute(
+                    insert(UserRole),
+                    [{"user_id": user_id, "role_id": role_id} for role_id in to_add]
+                )
+            for start in range(0, len(to_remove), batch_size):
+                db.session.execute(
+                    delete(UserRole)
+                    .where(UserRole.user_id == user_id)
+                    .where(UserRole.role_id.in_(to_remove[start:start + batch_size]))
+                )
+            if to_add or to_remove:
+                UserRoleService._bump_permissions_version(user_id)
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
+        if to_add or to_remove:
+            PermissionResolverService.invalidate_user(user_id)
+            AuthService.invalidate_user_versions(user_id)
+        return {
+            "user_id": user_id,
+            "role_ids": sorted(target),
+            "added": to_add,
+            "removed": to_remove
+        }
+
     @staticmethod
     def get_roles_by_user(user_id):
         try:
-            user_roles = UserRole.query.filter_by(user_id=user_id).all()
-            return [{"role_id": ur.role_id} for ur in user_roles]
+            # Selecting only role_id lets this be answered from the (user_id, role_id) index
+            role_ids = db.session.scalars(select(UserRole.role_id).where(UserRole.user_id == user_id))
+            return [{"role_id": role_id} for role_id in role_ids]
         except SQLAlchemyError as e:
             db.session.rollback()
             raise e
+
+    @staticmethod
+    def _bump_permissions_version(user_id):
+        """Mark role ids embedded in the user's tokens as stale (same transaction as the change)."""
+        User.query.filter_by(id=user_id).update(
+            {User.permissions_version: User.permissions_version + 1}, synchronize_session=False
+        )
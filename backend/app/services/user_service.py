@@ -1,24 +1,59 @@
-from sqlalchemy.exc import SQLAlchemyError
+from flask import current_app
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from app.extensions import db
 from app.models.user import User
-from sqlalchemy import text
-from werkzeug.security import generate_password_hash, check_password_hash # Import the hashing function
+from app.services.permission_resolver_service import PermissionResolverService
+from app.services.auth_service import AuthService
+from app.services.password_service import PasswordService
+from app.utils.pagination import paginate, iter_rows
 
 class UserService:
     """Service class for user operations"""
-    
+
+    # Query parameters accepted as equality filters on GET /users
+    LIST_FILTERS = {"username": str, "email": str, "is_active": bool}
+    # Columns selectable with ?fields=; password_hash is deliberately not listed
+    LIST_FIELDS = {
+        "id": User.id,
+        "username": User.username,
+        "email": User.email,
+        "created_at": User.created_at,
+        "updated_at": User.updated_at,
+        "is_active": User.is_active,
+    }
+    DEFAULT_FIELDS = ("id", "username", "email", "created_at", "is_active")
+    # Columns update_user never takes from the caller; the versions only move through AuthService/UserRoleService
+    PROTECTED_FIELDS = frozenset({"token_version", "permissions_version"})
+
+    @staticmethod
+    def get_all_users(cursor=None, limit=None, filters=None, fields=None):
+        """Get one page of users, ordered by id."""
+        try:
+            return paginate(User, UserService.LIST_FIELDS, fields or UserService.DEFAULT_FIELDS, cursor, limit, filters)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
     @staticmethod
-    def get_all_users():
-        """Get all users."""
+    def export_users(cursor=None, filters=None, fields=None):
+        """Yield every user as a dict, reading the table in batches."""
         try:
-            # Example of raw SQL query with mappings
-            users = db.session.execute(text("SELECT * FROM users")).mappings().all()
-            return [dict(user) for user in users]
+            yield from iter_rows(User, UserService.LIST_FIELDS, fields or UserService.DEFAULT_FIELDS, cursor, filters)
         except SQLAlchemyError as e:
             db.session.rollback()
             raise e
 
     
+    @staticmethod
+    def get_user_version(user_id):
+        """(id, updated_at) for ETags on GET /users/<id>, or None if the user doesn't exist."""
+        try:
+            return db.session.execute(select(User.id, User.updated_at).where(User.id == user_id)).first()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+    
     @staticmethod
     def get_user_by_id(user_id):
         """Get user by ID."""
@@ -34,9 +69,8 @@ class UserService:
     def create_user(username, email, password):
         """Create a new user with a hashed password."""
         try:
-            # Hash the plain text password using Werkzeug's generate_password_hash
-            # We are using a common method here, Werkzeug supports different algorithms
-            hashed_password = generate_password_hash(password)
+            # Hash the plain text password on the dedicated hashing pool
+            hashed_password = PasswordService.hash_password(password)
 
             # Example using ORM (assuming User model has a password_hash field)
             user = User(
@@ -54,6 +88,116 @@ class UserService:
             print(f"Error creating user: {e}")
             raise e
     
+    @staticmethod
+    def bulk_create_users(records, chunk_size=None, max_rows=None):
+        """Create users from an iterable of {username, email, password} records.
+
+        Records are processed in chunks: existing usernames/emails are looked
+        up with one query, passwords are hashed in parallel, and the chunk is
+        written with a single executemany INSERT and one commit. Invalid or
+        duplicate rows are reported by their 1-based row number instead of
+        aborting the import.
+        """
+        chunk_size = chunk_size or current_app.config.get("BULK_IMPORT_CHUNK_SIZE", 1000)
+        max_rows = max_rows or current_app.config.get("BULK_IMPORT_MAX_ROWS", 100000)
+        result = {"created": 0, "failed": 0, "errors": [], "truncated": False}
+        seen_usernames = set()
+        seen_emails = set()
+        chunk = []
+
+        # Raises PasswordHashingBusy before any row is read if too many imports are running
+        with PasswordService.bulk_hashing():
+            for row_number, record in enumerate(records, start=1):
+                if row_number > max_rows:
+                    result["truncated"] = True
+                    break
+
+                error = UserService._validate_bulk_record(record)
+                if error is None:
+                    if record["username"] in seen_usernames:
+                        error = "Duplicate username in upload"
+                    elif record["email"] in seen_emails:
+                        error = "Duplicate email in upload"
+                if error is not None:
+                    UserService._bulk_error(result, row_number, error)
+                    continue
+
+                seen_usernames.add(record["username"])
+                seen_emails.add(record["email"])
+                chunk.append((row_number, record))
+                if len(chunk) >= chunk_size:
+                    UserService._insert_chunk(chunk, result)
+                    chunk = []
+
+            if chunk:
+                UserService._insert_chunk(chunk, result)
+        result["errors"].sort(key=lambda error: error["row"])
+        return result
+
+    @staticmethod
+    def _validate_bulk_record(record):
+        if not isinstance(record, dict):
+            return "Row must be an object with username, email and password"
+        for field in ("username", "email", "password"):
+            if not isinstance(record.get(field), str) or not record[field]:
+                return f"Missing required field: {field}"
+        return None
+
+    @staticmethod
+    def _bulk_error(result, row_number, message):
+        result["failed"] += 1
+        result["errors"].append({"row": row_number, "message": message})
+
+    @staticmethod
+    def _insert_chunk(chunk, result):
+        """Insert one chunk of validated records with a single executemany and commit."""
+        try:
+            usernames = [record["username"] for _, record in chunk]
+            emails = [record["email"] for _, record in chunk]
+            existing = db.session.execute(
+                select(User.username, User.email)
+                .where(or_(User.username.in_(usernames), User.email.in_(emails)))
+            ).all()
+            taken_usernames = {username for username, _ in existing}
+            taken_emails = {email for _, email in existing}
+
+            rows = []
+            for row_number, record in chunk:
+                if record["username"] in taken_usernames:
+                    UserService._bulk_error(result, row_number, "Username already exists")
+                elif record["email"] in taken_emails:
+                    UserService._bulk_error(result, row_number, "Email already exists")
+                else:
+                    rows.append((row_number, record))
+            if not rows:
+                db.session.rollback()
+                return
+
+            hashes = PasswordService.hash_many(record["password"] for _, record in rows)
+            values = [
+                {"username": record["username"], "email": record["email"], "password_hash": password_hash}
+                for (_, record), password_hash in zip(rows, hashes)
+            ]
+
+            try:
+                db.session.execute(insert(User), values)
+                db.session.commit()
+                result["created"] += len(values)
+            except IntegrityError:
+                # A concurrent writer took some of these names; retry row by row to find which
+                db.session.rollback()
+                for (row_number, _), value in zip(rows, values):
+                    try:
+                        db.session.execute(insert(User), [value])
+                        db.session.commit()
+                        result["created"] += 1
+                    except IntegrityError:
+                        db.session.rollback()
+                        UserService._bulk_error(result, row_number, "Username or email already exists")
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
     @staticmethod
     def update_user(user_id, **kwargs):
         """Update user data."""
@@ -63,10 +207,11 @@ class UserService:
                 return None
             
             for key, value in kwargs.items():
-                if hasattr(user, key):
+                if hasattr(user, key) and key not in UserService.PROTECTED_FIELDS:
                     setattr(user, key, value)
             
             db.session.commit()
+            AuthService.invalidate_user_versions(user_id)
             return user.to_dict()
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -82,6 +227,8 @@ class UserService:
             
             db.session.delete(user)
             db.session.commit()
+            PermissionResolverService.invalidate_user(user_id)
+            AuthService.invalidate_user_versions(user_id)
             return True
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -1,3 +1,16 @@
 from .helpers import (
     fix_postgres_url
-)
\ No newline at end of file
+)
+from .cache import TTLCache
+from .bloom import BloomFilter
+from .metrics import register_stats, collect_stats
+from .pagination import PaginationError, paginate, iter_rows, parse_list_args
+from .streaming import wants_ndjson, ndjson_response
+from .json_provider import FastJSONProvider
+from .serializers import make_serializer
+from .uploads import UploadError, iter_upload_records
+from .engine_facts import register_engine_fact, get_engine_facts, get_engine_fact
+from .mail_templates import MailTemplates
+from .rate_limit import MemoryRateLimitBackend, RedisRateLimitBackend, create_rate_limit_backend
+from .etag import make_etag, table_version, conditional_response
+from .db_errors import integrity_error_text, is_unique_violation
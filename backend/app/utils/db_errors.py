@@ -0,0 +1,21 @@
+def integrity_error_text(error):
+    """The constraint an IntegrityError names, or the first line of the driver's message.
+
+    PostgreSQL reports the constraint name; MySQL ends its message with
+    "... for key 'name'"; SQLite only says e.g.
+    "UNIQUE constraint failed: users.email".
+    """
+    orig = error.orig
+    text = getattr(getattr(orig, "diag", None), "constraint_name", None) or str(orig).splitlines()[0]
+    return text.rsplit(" for key ", 1)[-1]
+
+
+def is_unique_violation(error, table, name):
+    """True if ``error`` was raised by the unique constraint ``name`` of ``table``."""
+    text = integrity_error_text(error)
+    if name in text:
+        return True
+    # SQLite lists the constraint's columns instead of its name
+    constraint = next(c for c in table.constraints if c.name == name)
+    columns = ", ".join(f"{table.name}.{column.name}" for column in constraint.columns)
+    return text == f"UNIQUE constraint failed: {columns}"
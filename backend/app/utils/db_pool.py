@@ -0,0 +1,137 @@
+import threading
+import time
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool, QueuePool
+
+# Environment overrides applied on top of the selected DB_POOL_PROFILES entry
+_OVERRIDES = {
+    "DB_POOL_SIZE": ("pool_size", int),
+    "DB_MAX_OVERFLOW": ("max_overflow", int),
+    "DB_POOL_TIMEOUT": ("pool_timeout", float),
+    "DB_POOL_RECYCLE": ("pool_recycle", int),
+    "DB_POOL_PRE_PING": ("pool_pre_ping", lambda value: str(value).lower() in ("1", "true", "yes")),
+    "DB_STATEMENT_TIMEOUT_MS": ("statement_timeout_ms", int),
+}
+_QUEUE_POOL_OPTIONS = ("pool_size", "max_overflow", "pool_timeout")
+
+
+class PoolMetrics:
+    """Checkout counters for one engine's connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.acquire_total = 0.0
+        self.acquire_max = 0.0
+
+    def record(self, seconds, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.acquire_total += seconds
+                self.acquire_max = max(self.acquire_max, seconds)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times every checkout.
+
+    The acquire time covers waiting for a free connection and, when the
+    pool grows, opening a new one. Timeouts are requests that gave up after
+    ``pool_timeout`` seconds, the sign of an undersized pool.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except sa_exc.TimeoutError:
+            self.metrics.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep counting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def build_engine_options(config):
+    """Build SQLALCHEMY_ENGINE_OPTIONS from DB_POOL_PROFILE and the DB_* overrides.
+
+    Options already present in ``config["SQLALCHEMY_ENGINE_OPTIONS"]`` win.
+    In-memory SQLite is left alone, since Flask-SQLAlchemy gives it a static pool.
+    """
+    explicit = dict(config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    uri = config.get("SQLALCHEMY_DATABASE_URI")
+    if not uri:
+        return explicit
+    url = make_url(uri)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return explicit
+
+    profiles = config.get("DB_POOL_PROFILES", {})
+    profile = config.get("DB_POOL_PROFILE", "default")
+    if profile not in profiles:
+        raise ValueError(f"Unknown DB_POOL_PROFILE: {profile}")
+    options = dict(profiles[profile])
+    for key, (option, cast) in _OVERRIDES.items():
+        value = config.get(key)
+        if value not in (None, ""):
+            options[option] = cast(value)
+
+    if options.pop("poolclass", "queue") == "null":
+        # Nothing to size; e.g. behind PgBouncer in transaction mode
+        options["poolclass"] = NullPool
+        for option in _QUEUE_POOL_OPTIONS:
+            options.pop(option, None)
+    else:
+        options["poolclass"] = InstrumentedQueuePool
+
+    statement_timeout = options.pop("statement_timeout_ms", 0)
+    if statement_timeout:
+        connect_args = dict(options.get("connect_args", {}))
+        backend = url.get_backend_name()
+        if backend == "postgresql":
+            connect_args["options"] = f"{connect_args.get('options', '')} -c statement_timeout={statement_timeout}".strip()
+        elif backend in ("mysql", "mariadb"):
+            # MySQL only enforces this for read-only SELECTs
+            connect_args["init_command"] = f"SET SESSION max_execution_time={statement_timeout}"
+        if connect_args:
+            options["connect_args"] = connect_args
+
+    options.update(explicit)
+    return options
+
+
+def pool_stats(engine):
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+        })
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        checkouts = metrics.checkouts
+        stats.update({
+            "checkouts": checkouts,
+            "timeouts": metrics.timeouts,
+            "acquire_avg_ms": round(metrics.acquire_total / checkouts * 1000, 3) if checkouts else None,
+            "acquire_max_ms": round(metrics.acquire_max * 1000, 3),
+        })
+    return stats
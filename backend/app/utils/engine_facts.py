@@ -0,0 +1,43 @@
+"""Registry of per-engine facts, computed once per engine instead of in request hooks.
+
+Register a provider with ``register_engine_fact(name, provider)``; ``provider``
+receives the Engine and its result is cached for that engine's lifetime.
+Facts for the app's engines are computed at startup by ``init_engine_facts``.
+"""
+import weakref
+from app.extensions import db
+
+_providers = {}
+_facts = weakref.WeakKeyDictionary()
+
+
+def register_engine_fact(name, provider):
+    """Register ``provider(engine)``; engines already seen are recomputed on next access."""
+    _providers[name] = provider
+    _facts.clear()
+
+
+def get_engine_facts(engine=None):
+    """Return the facts dict for ``engine`` (the app's default engine if omitted)."""
+    if engine is None:
+        engine = db.engine
+    facts = _facts.get(engine)
+    if facts is None:
+        facts = _facts[engine] = {name: provider(engine) for name, provider in _providers.items()}
+    return facts
+
+
+def get_engine_fact(name, engine=None):
+    return get_engine_facts(engine)[name]
+
+
+def init_engine_facts(app):
+    with app.app_context():
+        for engine in db.engines.values():
+            get_engine_facts(engine)
+
+
+# None of these open a connection
+register_engine_fact("dialect", lambda engine: engine.dialect.name)
+register_engine_fact("driver", lambda engine: engine.dialect.driver)
+register_engine_fact("supports_returning", lambda engine: engine.dialect.insert_returning)
@@ -0,0 +1,46 @@
+"""Conditional GET: weak ETags derived from cheap version probes, answered with 304 when unchanged."""
+import hashlib
+from flask import current_app, make_response, request
+from sqlalchemy import func, select, true
+from app.extensions import db
+
+
+def make_etag(*parts):
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+
+def table_version(*models):
+    """Row count, max id and max updated_at of each model's table, in one round trip.
+
+    Any insert or delete moves the count or max id, and any ORM update moves
+    max updated_at, so together they change whenever a listing could.
+    """
+    probes = [
+        select(func.count(), func.max(model.id), func.max(model.updated_at)).select_from(model).subquery()
+        for model in models
+    ]
+    # Each probe is a single row, so joining them on true just puts them side by side
+    joined = probes[0]
+    for probe in probes[1:]:
+        joined = joined.join(probe, true())
+    columns = [column for probe in probes for column in probe.c]
+    return tuple(db.session.execute(select(*columns).select_from(joined)).one())
+
+
+def conditional_response(etag, build):
+    """Return 304 if If-None-Match already holds ``etag``; otherwise ``build()`` tagged with it.
+
+    ``build`` is only called on a miss, so an unchanged resource skips the
+    full query and serialization. Error responses from ``build`` are not tagged.
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = make_response(build())
+        if response.status_code != 200:
+            return response
+    # Weak: the same data may be encoded differently by another JSON backend
+    response.set_etag(etag, weak=True)
+    # Let clients keep the body but revalidate on every poll
+    response.cache_control.no_cache = True
+    return response
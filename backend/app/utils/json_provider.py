@@ -0,0 +1,68 @@
+import json
+from datetime import date, datetime
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency; fall back to the stdlib encoder
+    orjson = None
+
+
+def _default(o):
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider that encodes with orjson when it is installed.
+
+    ``JSON_ENCODER`` selects the backend: ``"auto"`` (orjson if importable),
+    ``"orjson"`` or ``"stdlib"``. Both backends write datetimes as ISO 8601,
+    so models can hand native datetimes to ``jsonify`` instead of calling
+    ``isoformat()`` per value.
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        backend = app.config.get("JSON_ENCODER", "auto")
+        if backend not in ("auto", "orjson", "stdlib"):
+            raise ValueError(f"Unknown JSON_ENCODER: {backend}")
+        if backend == "orjson" and orjson is None:
+            raise RuntimeError("JSON_ENCODER is 'orjson' but the orjson package is not installed")
+        self.backend = "orjson" if orjson is not None and backend != "stdlib" else "stdlib"
+
+    def dumps(self, obj, **kwargs):
+        return self._dumps(obj, **kwargs) if self.backend == "stdlib" else self._orjson_dumps(obj, **kwargs).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if self.backend == "stdlib" or kwargs:
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if self.backend == "stdlib":
+            return super().response(*args, **kwargs)
+
+        # Build the body as bytes directly instead of str -> bytes
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._orjson_dumps(obj, indent=indent) + b"\n", mimetype=self.mimetype)
+
+    def _dumps(self, obj, **kwargs):
+        kwargs.setdefault("default", _default)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def _orjson_dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=_default, option=option)
+        except TypeError:
+            # e.g. integers wider than 64 bits, which orjson refuses
+            return self._dumps(obj, **kwargs).encode("utf-8")
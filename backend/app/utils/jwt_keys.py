@@ -0,0 +1,114 @@
+import base64
+import hashlib
+import os
+import jwt
+from jwt.algorithms import has_crypto
+
+SYMMETRIC_ALGORITHMS = {"HS256", "HS384", "HS512"}
+ASYMMETRIC_ALGORITHMS = {"EdDSA", "ES256", "ES384", "ES512", "RS256", "RS384", "RS512", "PS256", "PS384", "PS512"}
+
+
+class SigningKey:
+    """A parsed JWT key. ``signing_key`` is None for verify-only (retired) keys."""
+
+    def __init__(self, kid, algorithm, signing_key, verifying_key):
+        self.kid = kid
+        self.algorithm = algorithm
+        self.signing_key = signing_key
+        self.verifying_key = verifying_key
+
+    def to_jwk(self):
+        jwk = jwt.get_algorithm_by_name(self.algorithm).to_jwk(self.verifying_key, as_dict=True)
+        jwk.update({"kid": self.kid, "alg": self.algorithm, "use": "sig"})
+        return jwk
+
+
+class KeyRing:
+    """JWT keys parsed once at startup and selected by ``kid``.
+
+    Tokens are signed with the active key and carry its ``kid`` header.
+    Verification accepts any key in the ring, so retired keys keep
+    validating outstanding tokens during a rotation. Tokens without a
+    ``kid`` are verified with the active key.
+    """
+
+    def __init__(self, keys, active_kid):
+        self.keys = {key.kid: key for key in keys}
+        if active_kid not in self.keys or self.keys[active_kid].signing_key is None:
+            raise ValueError(f"No private key available for JWT key id '{active_kid}'")
+        self.active = self.keys[active_kid]
+
+    @classmethod
+    def from_config(cls, config):
+        algorithm = config.get("JWT_ALGORITHM", "HS256")
+
+        if algorithm in SYMMETRIC_ALGORITHMS:
+            secret = config.get("JWT_SECRET")
+            if not secret:
+                raise ValueError("JWT_SECRET is required for symmetric JWT algorithms")
+            kid = config.get("JWT_KEY_ID") or "default"
+            return cls([SigningKey(kid, algorithm, secret, secret)], kid)
+
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            raise ValueError(f"Unsupported JWT algorithm: {algorithm}")
+        if not has_crypto:
+            raise RuntimeError(f"The 'cryptography' package is required for {algorithm} tokens")
+
+        pems = {}
+        keys_dir = config.get("JWT_KEYS_DIR")
+        if keys_dir:
+            for filename in sorted(os.listdir(keys_dir)):
+                if filename.endswith(".pem"):
+                    with open(os.path.join(keys_dir, filename), "rb") as f:
+                        pems[filename[:-len(".pem")]] = f.read()
+        if config.get("JWT_PRIVATE_KEY"):
+            pem = config["JWT_PRIVATE_KEY"].encode("utf-8")
+            pems[config.get("JWT_KEY_ID")] = pem
+        if not pems:
+            raise ValueError(f"JWT_PRIVATE_KEY or JWT_KEYS_DIR is required for {algorithm} tokens")
+
+        keys = [_load_pem(kid, algorithm, pem) for kid, pem in pems.items()]
+        active_kid = config.get("JWT_KEY_ID")
+        if not active_kid:
+            signers = [key.kid for key in keys if key.signing_key is not None]
+            active_kid = signers[-1] if signers else None
+        return cls(keys, active_kid)
+
+    def encode(self, payload):
+        key = self.active
+        return jwt.encode(payload, key.signing_key, algorithm=key.algorithm, headers={"kid": key.kid})
+
+    def decode(self, token, **kwargs):
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self.keys.get(kid) if kid else self.active
+        if key is None:
+            raise jwt.InvalidTokenError(f"Unknown key id: {kid}")
+        return jwt.decode(token, key.verifying_key, algorithms=[key.algorithm], **kwargs)
+
+    def jwks(self):
+        """Public keys in JWK Set format; empty for symmetric algorithms."""
+        return {
+            "keys": [
+                key.to_jwk() for key in self.keys.values()
+                if key.algorithm in ASYMMETRIC_ALGORITHMS
+            ]
+        }
+
+
+def _load_pem(kid, algorithm, pem):
+    """Parse a PEM key; without an explicit kid, one is derived from the public key."""
+    from cryptography.hazmat.primitives.serialization import (
+        Encoding, PublicFormat, load_pem_private_key, load_pem_public_key
+    )
+
+    if b"PRIVATE KEY" in pem:
+        signing_key = load_pem_private_key(pem, password=None)
+        verifying_key = signing_key.public_key()
+    else:
+        signing_key = None
+        verifying_key = load_pem_public_key(pem)
+
+    if not kid:
+        der = verifying_key.public_bytes(Encoding.DER, PublicFormat.SubjectPublicKeyInfo)
+        kid = base64.urlsafe_b64encode(hashlib.sha256(der).digest()[:12]).decode("ascii").rstrip("=")
+    return SigningKey(kid, algorithm, signing_key, verifying_key)
@@ -0,0 +1,31 @@
+import os
+from jinja2 import Environment, FileSystemLoader, StrictUndefined
+
+
+class MailTemplates:
+    """Email templates compiled once at startup.
+
+    Each ``<name>.jinja`` file defines a ``subject`` and a ``text`` block and
+    optionally an ``html`` block; the html block turns on autoescaping itself.
+    """
+
+    def __init__(self, directory):
+        self.env = Environment(
+            loader=FileSystemLoader(directory),
+            undefined=StrictUndefined,
+            trim_blocks=True,
+            lstrip_blocks=True,
+        )
+        names = self.env.list_templates(extensions=["jinja"]) if os.path.isdir(directory) else []
+        self.templates = {os.path.splitext(name)[0]: self.env.get_template(name) for name in names}
+
+    def render(self, name, **context):
+        """Return ``(subject, text, html)`` for template ``name``; html is None if the template has none."""
+        template = self.templates.get(name)
+        if template is None:
+            raise ValueError(f"Unknown email template: {name}")
+        parts = {
+            block: "".join(render(template.new_context(context))).strip()
+            for block, render in template.blocks.items()
+        }
+        return parts["subject"], parts["text"] + "\n", parts.get("html")
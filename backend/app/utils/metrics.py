@@ -0,0 +1,12 @@
+"""Registry of in-process stats providers exposed through GET /api/v1/metrics."""
+
+_providers = {}
+
+
+def register_stats(name, provider):
+    """Register a zero-argument callable returning a JSON-serialisable dict."""
+    _providers[name] = provider
+
+
+def collect_stats():
+    return {name: provider() for name, provider in _providers.items()}
@@ -0,0 +1,137 @@
+import base64
+import binascii
+import json
+from flask import current_app
+from app.extensions import db
+
+
+class PaginationError(ValueError):
+    """Raised for malformed cursor, limit, filter or fields query parameters."""
+
+
+# Swagger parameters shared by every paginated list endpoint
+PAGINATION_SWAGGER_PARAMS = [
+    {'name': 'cursor', 'in': 'query', 'type': 'string', 'required': False,
+     'description': 'Opaque cursor from pagination.next_cursor of the previous page'},
+    {'name': 'limit', 'in': 'query', 'type': 'integer', 'required': False,
+     'description': 'Page size (capped at PAGINATION_MAX_LIMIT)'},
+    {'name': 'fields', 'in': 'query', 'type': 'string', 'required': False,
+     'description': 'Comma-separated columns to return; id is always included'},
+    {'name': 'stream', 'in': 'query', 'type': 'boolean', 'required': False,
+     'description': 'Stream every matching row as NDJSON (same as Accept: application/x-ndjson)'},
+]
+
+
+def encode_cursor(last_id):
+    payload = json.dumps({"id": last_id}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))["id"]
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+        raise PaginationError("Invalid cursor")
+    if not isinstance(last_id, int):
+        raise PaginationError("Invalid cursor")
+    return last_id
+
+
+def parse_list_args(args, filter_fields=None, list_fields=None):
+    """Read cursor, limit, whitelisted equality filters and ``fields`` from request args.
+
+    ``filter_fields`` maps filter names to the Python type of the column
+    (``int``, ``str`` or ``bool``); other query parameters are ignored.
+    ``list_fields`` is the whitelist ``fields=`` may select from.
+    """
+    limit = args.get("limit")
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise PaginationError("limit must be an integer")
+        if limit < 1:
+            raise PaginationError("limit must be at least 1")
+
+    filters = {}
+    for name, field_type in (filter_fields or {}).items():
+        if name not in args:
+            continue
+        value = args[name]
+        if field_type is bool:
+            if value.lower() not in ("true", "false", "1", "0"):
+                raise PaginationError(f"{name} must be true or false")
+            filters[name] = value.lower() in ("true", "1")
+        elif field_type is int:
+            try:
+                filters[name] = int(value)
+            except ValueError:
+                raise PaginationError(f"{name} must be an integer")
+        else:
+            filters[name] = value
+
+    fields = None
+    if args.get("fields"):
+        fields = [name.strip() for name in args["fields"].split(",") if name.strip()]
+        unknown = [name for name in fields if name not in (list_fields or {})]
+        if unknown:
+            raise PaginationError(f"Unknown field(s): {', '.join(unknown)}")
+
+    cursor = args.get("cursor")
+    if cursor:
+        # Validate up front: streamed responses can't report errors once rows are flowing
+        decode_cursor(cursor)
+
+    return {"cursor": cursor, "limit": limit, "filters": filters, "fields": fields}
+
+
+def project(model, columns, fields, cursor=None, filters=None):
+    """Build a query selecting only ``fields`` (plus ``id``) from the ``columns`` whitelist.
+
+    ``columns`` maps field names to column expressions. Filters are
+    applied to ``model`` attributes, so they may use unselected columns.
+    """
+    names = ["id"] + [name for name in fields if name != "id"]
+    query = db.session.query(*[columns[name].label(name) for name in names]).select_from(model)
+
+    if filters:
+        query = query.filter(*[getattr(model, name) == value for name, value in filters.items()])
+    if cursor:
+        query = query.filter(model.id > decode_cursor(cursor))
+    return query.order_by(model.id)
+
+
+def paginate(model, columns, fields, cursor=None, limit=None, filters=None):
+    """Return one keyset page of ``model`` rows, projected to ``fields``.
+
+    Rows are fetched with ``WHERE id > :last_id ORDER BY id LIMIT :limit + 1``,
+    so the cost of a page does not depend on how deep into the table it is.
+    """
+    max_limit = current_app.config.get("PAGINATION_MAX_LIMIT", 500)
+    limit = min(limit or current_app.config.get("PAGINATION_DEFAULT_LIMIT", 100), max_limit)
+
+    rows = project(model, columns, fields, cursor, filters).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return {
+        "items": [row._asdict() for row in rows],
+        "pagination": {
+            "limit": limit,
+            "has_more": has_more,
+            "next_cursor": encode_cursor(rows[-1].id) if has_more else None,
+        },
+    }
+
+
+def iter_rows(model, columns, fields, cursor=None, filters=None, batch_size=None):
+    """Yield every ``model`` row projected to ``fields``, in id order, starting after ``cursor``.
+
+    Rows are fetched through a server-side cursor in ``batch_size`` chunks
+    (``yield_per``), so only one chunk is held in memory at a time.
+    """
+    batch_size = batch_size or current_app.config.get("EXPORT_BATCH_SIZE", 1000)
+
+    for row in project(model, columns, fields, cursor, filters).yield_per(batch_size):
+        yield row._asdict()
@@ -0,0 +1,137 @@
+import math
+import threading
+import time
+from app.utils.cache import TTLCache
+
+try:
+    import redis
+except ImportError:  # optional dependency; only needed for redis:// storage
+    redis = None
+
+
+def _window_state(now, window):
+    """Current window index and the fraction of it already elapsed."""
+    index = int(now // window)
+    return index, (now - index * window) / window
+
+
+def _retry_after(previous, current, limit, window, elapsed):
+    """Seconds until the sliding estimate leaves room for one more hit."""
+    if current >= limit:
+        # Wait for this window to end and then for the previous count's weight to decay enough
+        fraction = 1.0 - (limit - 1) / current
+        return (1.0 - elapsed + fraction) * window
+    # previous * (1 - f) + current + 1 <= limit  =>  f >= 1 - (limit - current - 1) / previous
+    fraction = 1.0 - (limit - current - 1) / previous
+    return (fraction - elapsed) * window
+
+
+class MemoryRateLimitBackend:
+    """Sliding window counters held in process memory.
+
+    Each key keeps the hit count of the current and the previous fixed
+    window; the previous one is weighted by how much of it still overlaps the
+    sliding window. Limits are per process, so with N workers a client gets up
+    to N times the limit; use a shared backend in production.
+    """
+
+    name = "memory"
+
+    def __init__(self, maxsize=100000, timer=time.time):
+        self.timer = timer
+        self._counters = TTLCache(maxsize=maxsize, timer=timer)
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, window):
+        """Count one hit. Returns ``(allowed, retry_after_seconds)``; rejected hits are not counted."""
+        return self.hit_many([(key, limit, window)])
+
+    def hit_many(self, hits):
+        """Count one hit on every ``(key, limit, window)`` only if all of them allow it.
+
+        Returns ``(allowed, retry_after_seconds)``, waiting for the slowest key.
+        """
+        now = self.timer()
+        with self._lock:
+            updates = []
+            allowed, retry_after = True, 0
+            for key, limit, window in hits:
+                index, elapsed = _window_state(now, window)
+                state = self._counters.get(key)
+                if state is None or state[0] < index - 1:
+                    previous, current = 0, 0
+                elif state[0] == index - 1:
+                    previous, current = state[2], 0
+                else:
+                    previous, current = state[1], state[2]
+
+                if previous * (1 - elapsed) + current + 1 > limit:
+                    allowed = False
+                    retry_after = max(retry_after, _retry_after(previous, current, limit, window, elapsed))
+                updates.append((key, (index, previous, current + 1), (index + 2) * window))
+
+            if not allowed:
+                return False, retry_after
+            for key, state, expires_at in updates:
+                self._counters.set(key, state, expires_at=expires_at)
+            return True, 0
+
+
+class RedisRateLimitBackend:
+    """The same sliding window counters, shared between processes through Redis.
+
+    ``client`` is a redis-py client or anything with the same ``pipeline``,
+    ``incr``, ``expire``, ``get`` and ``decr`` methods. One round trip per
+    allowed call, two per rejected one.
+    """
+
+    name = "redis"
+
+    def __init__(self, client, prefix="ratelimit:", timer=time.time):
+        self.client = client
+        self.prefix = prefix
+        self.timer = timer
+
+    def hit(self, key, limit, window):
+        return self.hit_many([(key, limit, window)])
+
+    def hit_many(self, hits):
+        now = self.timer()
+        pipe = self.client.pipeline()
+        keys = []
+        for key, limit, window in hits:
+            index, elapsed = _window_state(now, window)
+            current_key = f"{self.prefix}{key}:{index}"
+            keys.append(current_key)
+            pipe.incr(current_key)
+            pipe.expire(current_key, math.ceil(window * 2))
+            pipe.get(f"{self.prefix}{key}:{index - 1}")
+        results = pipe.execute()
+
+        allowed, retry_after = True, 0
+        for position, (key, limit, window) in enumerate(hits):
+            current, _, previous = results[position * 3:position * 3 + 3]
+            previous = int(previous or 0)
+            elapsed = _window_state(now, window)[1]
+            if previous * (1 - elapsed) + current > limit:
+                allowed = False
+                retry_after = max(retry_after, _retry_after(previous, current - 1, limit, window, elapsed))
+
+        if not allowed:
+            # Take every hit of this call back out, so a rejection costs the client nothing
+            pipe = self.client.pipeline()
+            for current_key in keys:
+                pipe.decr(current_key)
+            pipe.execute()
+        return allowed, retry_after
+
+
+def create_rate_limit_backend(storage_url):
+    """Backend for RATE_LIMIT_STORAGE_URL: ``memory://`` or a ``redis://`` URL."""
+    if storage_url in (None, "", "memory://"):
+        return MemoryRateLimitBackend()
+    if storage_url.startswith(("redis://", "rediss://", "unix://")):
+        if redis is None:
+            raise RuntimeError("RATE_LIMIT_STORAGE_URL points at Redis but the redis package is not installed")
+        return RedisRateLimitBackend(redis.Redis.from_url(storage_url))
+    raise ValueError(f"Unsupported RATE_LIMIT_STORAGE_URL: {storage_url}")
@@ -0,0 +1,28 @@
+import threading
+import time
+
+
+class PeriodicJob(threading.Thread):
+    """Daemon thread that runs ``func`` inside an app context every ``interval`` seconds."""
+
+    def __init__(self, app, func, interval, name=None):
+        super().__init__(name=name or f"periodic-{func.__name__}", daemon=True)
+        self.app = app
+        self.func = func
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            started = time.perf_counter()
+            with self.app.app_context():
+                try:
+                    result = self.func()
+                    self.app.logger.info(
+                        "%s finished in %.3fs: %s", self.name, time.perf_counter() - started, result
+                    )
+                except Exception:
+                    self.app.logger.exception("%s failed", self.name)
+
+    def stop(self):
+        self._stop_event.set()
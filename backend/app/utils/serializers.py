@@ -0,0 +1,18 @@
+from operator import attrgetter
+
+
+def make_serializer(fields, extra=None):
+    """Build a function returning a dict of the given attributes of an object.
+
+    ``fields`` is the model's explicit allow-list of attribute names; only
+    these are ever exposed. ``extra`` maps additional keys to dotted
+    attribute paths such as ``"permission.name"``. All values are read with
+    one ``operator.attrgetter`` call. Datetimes are returned as-is for the
+    JSON provider to encode.
+    """
+    extra = extra or {}
+    keys = tuple(fields) + tuple(extra)
+    getter = attrgetter(*fields, *extra.values())
+    if len(keys) == 1:
+        return lambda obj: {keys[0]: getter(obj)}
+    return lambda obj: dict(zip(keys, getter(obj)))
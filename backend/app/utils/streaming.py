@@ -0,0 +1,25 @@
+from flask import Response, current_app, request, stream_with_context
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+def wants_ndjson():
+    """True when the client asked for a streamed export (``?stream=1`` or ``Accept: application/x-ndjson``)."""
+    if request.args.get("stream", "").lower() in ("1", "true"):
+        return True
+    return request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+
+def ndjson_response(rows):
+    """Stream an iterable of dicts as newline-delimited JSON, one line per row.
+
+    The request context is kept alive until the last row is written, so
+    ``rows`` may lazily read from the database session.
+    """
+    dumps = current_app.json.dumps
+
+    def generate():
+        for row in rows:
+            yield dumps(row) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
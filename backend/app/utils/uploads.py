@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+from flask import request
+
+CSV_MIMETYPES = ("text/csv", "application/csv")
+NDJSON_MIMETYPES = ("application/x-ndjson", "application/jsonl")
+
+
+class UploadError(ValueError):
+    """Raised when an upload can't be read at all, as opposed to a single bad row."""
+
+
+def iter_upload_records():
+    """Yield one record per row of the current request's JSON array, NDJSON or CSV body.
+
+    A multipart upload is read from its ``file`` field, with the format taken
+    from the part's content type or file extension. NDJSON and CSV are read
+    incrementally. Rows that aren't JSON objects are yielded unchanged so the
+    caller can report them individually.
+    """
+    if request.files:
+        upload = request.files.get("file")
+        if upload is None:
+            raise UploadError("Multipart uploads must use the 'file' field")
+        return _iter_stream(upload.stream, _format_of(upload.mimetype, upload.filename))
+
+    fmt = _format_of(request.mimetype, None)
+    if fmt == "json":
+        data = request.get_json(silent=True)
+        if not isinstance(data, list):
+            raise UploadError("JSON uploads must be an array of objects")
+        return iter(data)
+    return _iter_stream(request.stream, fmt)
+
+
+def _format_of(mimetype, filename):
+    filename = (filename or "").lower()
+    if mimetype in CSV_MIMETYPES or filename.endswith(".csv"):
+        return "csv"
+    if mimetype in NDJSON_MIMETYPES or filename.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if mimetype == "application/json" or filename.endswith(".json"):
+        return "json"
+    raise UploadError("Unsupported upload type; send JSON, NDJSON or CSV")
+
+
+def _iter_stream(stream, fmt):
+    if fmt == "json":
+        data = json.load(stream)
+        if not isinstance(data, list):
+            raise UploadError("JSON uploads must be an array of objects")
+        yield from data
+        return
+
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        yield from csv.DictReader(text)
+        return
+
+    for line in text:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield line
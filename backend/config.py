@@ -11,6 +11,155 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JSON_SORT_KEYS = False
 
+    # JWT signing. HS* algorithms use JWT_SECRET. EdDSA/ES*/RS* use a PEM private
+    # key from JWT_PRIVATE_KEY, or every <kid>.pem in JWT_KEYS_DIR, where
+    # JWT_KEY_ID names the signing key and the rest stay valid for verification
+    # (key rotation). Public keys are published at /api/v1/auth/.well-known/jwks.json.
+    JWT_ALGORITHM = os.environ.get("JWT_ALGORITHM", "HS256")
+    JWT_SECRET = os.environ.get("JWT_SECRET", "your-secret-key")
+    JWT_PRIVATE_KEY = os.environ.get("JWT_PRIVATE_KEY")
+    JWT_KEYS_DIR = os.environ.get("JWT_KEYS_DIR")
+    JWT_KEY_ID = os.environ.get("JWT_KEY_ID")
+    # LRU of verified token payloads keyed by a hash of the raw token; 0 disables it
+    TOKEN_DECODE_CACHE_SIZE = int(os.environ.get("TOKEN_DECODE_CACHE_SIZE", 10000))
+
+    # Password hashing runs on its own thread pool. At most WORKERS + QUEUE_SIZE
+    # hashes may be running or waiting; beyond that requests get 503 + Retry-After.
+    PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 4))
+    PASSWORD_HASH_QUEUE_SIZE = int(os.environ.get("PASSWORD_HASH_QUEUE_SIZE", 32))
+    PASSWORD_HASH_RETRY_AFTER = int(os.environ.get("PASSWORD_HASH_RETRY_AFTER", 1))
+    # Web worker processes on this host (gunicorn reads the same variable)
+    WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", 1))
+    # Worker processes for bulk hashing (POST /users/bulk); 0 hashes in the request thread.
+    # Each web worker gets its own pool, so by default the CPUs are split between them.
+    PASSWORD_HASH_PROCESSES = int(os.environ.get(
+        "PASSWORD_HASH_PROCESSES", max(1, (os.cpu_count() or 1) // max(1, WEB_CONCURRENCY))
+    ))
+    # Bulk imports hashing at once per web worker; further imports get 503 + Retry-After
+    PASSWORD_HASH_BULK_IMPORTS = int(os.environ.get("PASSWORD_HASH_BULK_IMPORTS", 1))
+
+    # POST /users/bulk: rows per INSERT batch and commit, and the per-upload row limit.
+    # The import runs inside the request, so keep MAX_ROWS x hash time / PASSWORD_HASH_PROCESSES
+    # under the server's request timeout (scrypt is ~0.1s per hash per core).
+    BULK_IMPORT_CHUNK_SIZE = int(os.environ.get("BULK_IMPORT_CHUNK_SIZE", 1000))
+    BULK_IMPORT_MAX_ROWS = int(os.environ.get("BULK_IMPORT_MAX_ROWS", 1000))
+    # Ids per DELETE ... IN (...) statement when syncing role/permission sets
+    RBAC_SYNC_BATCH_SIZE = int(os.environ.get("RBAC_SYNC_BATCH_SIZE", 500))
+
+    # Werkzeug hashing method (algorithm and cost) per profile. New hashes use
+    # PASSWORD_HASH_PROFILE; hashes made with other parameters are upgraded on
+    # login. Compare profiles with `flask passwords benchmark`.
+    PASSWORD_HASH_PROFILES = {
+        "fast": "pbkdf2:sha256:1000",
+        "pbkdf2": "pbkdf2:sha256:600000",
+        "scrypt": "scrypt:32768:8:1",
+    }
+    PASSWORD_HASH_PROFILE = os.environ.get("PASSWORD_HASH_PROFILE", "scrypt")
+
+    # In-process cache in front of the token_blocklist table
+    REVOCATION_CACHE_SIZE = int(os.environ.get("REVOCATION_CACHE_SIZE", 10000))
+    REVOCATION_NEGATIVE_CACHE_SIZE = int(os.environ.get("REVOCATION_NEGATIVE_CACHE_SIZE", 100000))
+    # Upper bound on how long a "not revoked" answer is trusted; revocations
+    # made by other worker processes become visible after at most this long.
+    REVOCATION_NEGATIVE_CACHE_TTL = int(os.environ.get("REVOCATION_NEGATIVE_CACHE_TTL", 60))
+
+    # Bloom filter of revoked JTIs; only filter hits reach the database. A background
+    # job rebuilds it from token_blocklist every REVOCATION_BLOOM_REFRESH_SECONDS and
+    # otherwise tops it up with rows revoked since the last sync every
+    # REVOCATION_BLOOM_SYNC_SECONDS, which must stay below REVOCATION_NEGATIVE_CACHE_TTL.
+    # A filter that hasn't synced within the TTL is not trusted, so a token revoked
+    # on another worker is accepted for at most REVOCATION_NEGATIVE_CACHE_TTL.
+    REVOCATION_BLOOM_ENABLED = os.environ.get("REVOCATION_BLOOM_ENABLED", "true").lower() == "true"
+    REVOCATION_BLOOM_CAPACITY = int(os.environ.get("REVOCATION_BLOOM_CAPACITY", 100000))
+    REVOCATION_BLOOM_ERROR_RATE = float(os.environ.get("REVOCATION_BLOOM_ERROR_RATE", 0.001))
+    REVOCATION_BLOOM_REFRESH_SECONDS = int(os.environ.get("REVOCATION_BLOOM_REFRESH_SECONDS", 300))
+    REVOCATION_BLOOM_SYNC_SECONDS = int(os.environ.get("REVOCATION_BLOOM_SYNC_SECONDS", 20))
+
+    # Expired token_blocklist rows are deleted in batches by `flask blocklist purge`
+    # or, when BLOCKLIST_PURGE_INTERVAL > 0, by a background thread every N seconds.
+    BLOCKLIST_PURGE_BATCH_SIZE = int(os.environ.get("BLOCKLIST_PURGE_BATCH_SIZE", 1000))
+    BLOCKLIST_PURGE_INTERVAL = int(os.environ.get("BLOCKLIST_PURGE_INTERVAL", 0))
+
+    # Per-user cache of effective permission names (see PermissionResolverService)
+    PERMISSION_CACHE_SIZE = int(os.environ.get("PERMISSION_CACHE_SIZE", 10000))
+    PERMISSION_CACHE_TTL = int(os.environ.get("PERMISSION_CACHE_TTL", 300))
+
+    # Requests to endpoints listed in endpoint_permissions require the mapped
+    # permission. The map is recompiled on every change made through the API
+    # and, to pick up changes from other workers, once it is older than the TTL.
+    ENFORCE_ENDPOINT_PERMISSIONS = os.environ.get("ENFORCE_ENDPOINT_PERMISSIONS", "true").lower() == "true"
+    ENDPOINT_PERMISSION_MAP_TTL = int(os.environ.get("ENDPOINT_PERMISSION_MAP_TTL", 60))
+
+    # Opt-in: embed is_active, role ids and token/permissions versions in access
+    # tokens so authentication and RBAC checks can skip the users/user_roles tables.
+    # Versions are re-read from users at most every USER_VERSION_CACHE_TTL seconds.
+    JWT_EMBED_CLAIMS = os.environ.get("JWT_EMBED_CLAIMS", "false").lower() == "true"
+    USER_VERSION_CACHE_SIZE = int(os.environ.get("USER_VERSION_CACHE_SIZE", 10000))
+    USER_VERSION_CACHE_TTL = int(os.environ.get("USER_VERSION_CACHE_TTL", 30))
+
+    # Keyset pagination for list endpoints; ?limit= is capped at PAGINATION_MAX_LIMIT
+    PAGINATION_DEFAULT_LIMIT = int(os.environ.get("PAGINATION_DEFAULT_LIMIT", 100))
+    PAGINATION_MAX_LIMIT = int(os.environ.get("PAGINATION_MAX_LIMIT", 500))
+    # Rows fetched per server-side cursor batch for NDJSON exports (?stream=1)
+    EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", 1000))
+
+    # JSON backend for responses: "auto" uses orjson when installed, else the stdlib encoder
+    JSON_ENCODER = os.environ.get("JSON_ENCODER", "auto")
+
+    # Connection pool profiles, turned into SQLALCHEMY_ENGINE_OPTIONS at startup.
+    # DB_POOL_PROFILE picks one; the DB_* variables below override single settings.
+    # Size pool_size + max_overflow to the threads per worker process.
+    DB_POOL_PROFILES = {
+        "default": {"pool_size": 5, "max_overflow": 10, "pool_timeout": 30, "pool_recycle": 1800, "pool_pre_ping": True},
+        # gunicorn gthread workers: one connection per thread, fail fast when exhausted
+        "threaded": {"pool_size": 16, "max_overflow": 8, "pool_timeout": 5, "pool_recycle": 1800, "pool_pre_ping": True},
+        # An external pooler (PgBouncer) owns the connections
+        "pgbouncer": {"poolclass": "null", "pool_pre_ping": False},
+    }
+    DB_POOL_PROFILE = os.environ.get("DB_POOL_PROFILE", "default")
+    DB_POOL_SIZE = os.environ.get("DB_POOL_SIZE")
+    DB_MAX_OVERFLOW = os.environ.get("DB_MAX_OVERFLOW")
+    DB_POOL_TIMEOUT = os.environ.get("DB_POOL_TIMEOUT")
+    DB_POOL_RECYCLE = os.environ.get("DB_POOL_RECYCLE")
+    DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING")
+    # Server-side statement timeout (PostgreSQL statement_timeout, MySQL max_execution_time); 0 disables
+    DB_STATEMENT_TIMEOUT_MS = os.environ.get("DB_STATEMENT_TIMEOUT_MS")
+
+    # Outbound mail; MAIL_USERNAME/MAIL_PASSWORD fall back to the older EMAIL_USER/EMAIL_PASSWORD
+    MAIL_SERVER = os.environ.get("MAIL_SERVER", "smtp.gmail.com")
+    MAIL_PORT = int(os.environ.get("MAIL_PORT", 587))
+    MAIL_USE_TLS = os.environ.get("MAIL_USE_TLS", "true").lower() == "true"
+    MAIL_USE_SSL = os.environ.get("MAIL_USE_SSL", "false").lower() == "true"
+    MAIL_USERNAME = os.environ.get("MAIL_USERNAME", os.environ.get("EMAIL_USER"))
+    MAIL_PASSWORD = os.environ.get("MAIL_PASSWORD", os.environ.get("EMAIL_PASSWORD"))
+    MAIL_DEFAULT_SENDER = os.environ.get("MAIL_DEFAULT_SENDER", MAIL_USERNAME)
+    MAIL_TIMEOUT = int(os.environ.get("MAIL_TIMEOUT", 10))
+    # Background sender threads, each keeping one SMTP connection open between messages;
+    # 0 sends inline in the calling request
+    MAIL_SENDER_THREADS = int(os.environ.get("MAIL_SENDER_THREADS", 2))
+    # Messages waiting for a sender; send() returns False once this many are queued
+    MAIL_QUEUE_SIZE = int(os.environ.get("MAIL_QUEUE_SIZE", 1000))
+    # Close a sender's SMTP connection after this many idle seconds
+    MAIL_IDLE_TIMEOUT = int(os.environ.get("MAIL_IDLE_TIMEOUT", 30))
+    # Transient failures are retried after MAIL_RETRY_BACKOFF, 2x, 4x ... seconds
+    MAIL_MAX_RETRIES = int(os.environ.get("MAIL_MAX_RETRIES", 3))
+    MAIL_RETRY_BACKOFF = float(os.environ.get("MAIL_RETRY_BACKOFF", 2))
+    # send_batch (mail campaigns) gives up on the remaining messages after this many
+    # connection attempts in a row have failed; 0 never gives up
+    MAIL_BATCH_MAX_CONNECT_FAILURES = int(os.environ.get("MAIL_BATCH_MAX_CONNECT_FAILURES", 5))
+
+    # Rate limits on expensive auth endpoints, keyed by endpoint name. "ip" counts per client
+    # address (use ProxyFix behind a proxy so remote_addr is the client), "account" per email
+    # in the request body. Values are [limit, window_seconds] over a sliding window.
+    RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMITS = {
+        "login_user": {"ip": [30, 60], "account": [10, 300]},
+        "register_user": {"ip": [10, 3600]},
+        "forgot_password": {"ip": [10, 3600], "account": [3, 3600]},
+    }
+    # "memory://" keeps counters per process; a redis:// URL shares them between workers
+    RATE_LIMIT_STORAGE_URL = os.environ.get("RATE_LIMIT_STORAGE_URL", "memory://")
+
 class DevelopmentConfig(Config):
     """Development configuration."""
     DEBUG = True
@@ -21,6 +170,17 @@ class DevelopmentConfig(Config):
 class TestingConfig(Config):
     """Testing configuration."""
     TESTING = True
+    PASSWORD_HASH_PROFILE = "fast"
+    PASSWORD_HASH_PROCESSES = 0
+    MAIL_SERVER = "localhost"
+    MAIL_PORT = 8025
+    MAIL_USE_TLS = False
+    MAIL_USERNAME = None
+    MAIL_PASSWORD = None
+    MAIL_DEFAULT_SENDER = "noreply@example.com"
+    MAIL_SENDER_THREADS = 1
+    MAIL_RETRY_BACKOFF = 0
+    RATE_LIMIT_ENABLED = False
     SQLALCHEMY_DATABASE_URI = os.environ.get(
         "TEST_DATABASE_URL", "sqlite:///test.db"
     )
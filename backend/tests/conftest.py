@@ -1,7 +1,15 @@
+import json
 import pytest
+import socketserver
+import threading
+import time
+from contextlib import contextmanager
+from email import message_from_bytes, policy
+from sqlalchemy import event
 from app import create_app
 from app.extensions import db
 from app.models.user import User
+from app.services.mail_service import MailService
 
 @pytest.fixture
 def app():
@@ -36,4 +44,106 @@ def init_database(app):
     db.session.add(user2)
     db.session.commit()
     
-    return {"user1": user1, "user2": user2}
\ No newline at end of file
+    return {"user1": user1, "user2": user2}
+
+@pytest.fixture
+def post_json(client):
+    """POST a JSON body and return the response's ``data``, asserting it succeeded."""
+    def post(url, payload, headers=None):
+        response = client.post(url, data=json.dumps(payload), content_type="application/json", headers=headers)
+        assert response.status_code in (200, 201)
+        return response.get_json()["data"]
+    return post
+
+@pytest.fixture
+def query_counter(app):
+    """Context manager collecting the SQL statements run inside its block.
+
+    Usage: ``with query_counter() as statements: ...`` then ``len(statements)``.
+    """
+    @contextmanager
+    def count_queries():
+        statements = []
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+    return count_queries
+
+class StubSMTPHandler(socketserver.StreamRequestHandler):
+    """Speaks just enough SMTP for smtplib: EHLO, AUTH PLAIN, MAIL, RCPT, DATA, RSET, NOOP, QUIT."""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        time.sleep(server.delay)
+        self.reply("220 stub ESMTP")
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip()
+            verb = command[:4].upper()
+            if verb == "EHLO":
+                self.reply("250-stub")
+                self.reply("250-AUTH PLAIN")
+                self.reply("250 8BITMIME")
+            elif verb == "AUTH":
+                server.logins.append(command)
+                self.reply("235 Authentication successful")
+            elif verb == "RCPT":
+                recipients.append(command)
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                for data_line in iter(self.rfile.readline, b".\r\n"):
+                    data.append(data_line[1:] if data_line.startswith(b"..") else data_line)
+                if server.fail_codes:
+                    self.reply(f"{server.fail_codes.pop(0)} Stub failure")
+                else:
+                    server.messages.append(message_from_bytes(b"".join(data), policy=policy.default))
+                    self.reply("250 OK")
+                recipients = []
+            elif verb in ("HELO", "MAIL", "RSET", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+class StubSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubSMTPHandler)
+        self.lock = threading.Lock()
+        self.messages = []
+        self.logins = []
+        # Reply codes to return for the next DATA commands, e.g. [451] for one transient failure
+        self.fail_codes = []
+        self.connections = 0
+        # Seconds to wait before the greeting, to simulate a slow server
+        self.delay = 0
+
+@pytest.fixture
+def smtp_server(app):
+    """A local SMTP server that records messages; MailService is pointed at it."""
+    server = StubSMTPServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    app.config["MAIL_SERVER"], app.config["MAIL_PORT"] = server.server_address
+    MailService.init_app(app)
+    yield server
+    MailService.shutdown()
+    server.shutdown()
+    server.server_close()
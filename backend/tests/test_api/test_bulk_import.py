@@ -0,0 +1,112 @@
+import io
+import json
+import pytest
+from werkzeug.security import check_password_hash
+from app.models.user import User
+from app.services.password_service import PasswordService
+
+def user_rows(count, start=0):
+    return [
+        {"username": f"bulk{i}", "email": f"bulk{i}@example.com", "password": f"password{i}"}
+        for i in range(start, start + count)
+    ]
+
+class TestBulkUserImport:
+    """Tests for POST /users/bulk."""
+
+    def test_json_array_in_chunks(self, app, client, query_counter):
+        """Rows are inserted with one INSERT per chunk and can log in afterwards."""
+        app.config["BULK_IMPORT_CHUNK_SIZE"] = 10
+        with query_counter() as statements:
+            response = client.post("/api/v1/users/bulk", json=user_rows(25))
+
+        assert response.status_code == 200
+        assert response.get_json()["data"] == {"created": 25, "failed": 0, "errors": [], "truncated": False}
+        assert len([s for s in statements if s.startswith("INSERT INTO users")]) == 3
+
+        user = User.query.filter_by(username="bulk7").one()
+        assert check_password_hash(user.password_hash, "password7")
+        assert PasswordService.stats()["bulk_hashed"] == 25
+
+    def test_per_row_errors(self, client, init_database):
+        """Invalid rows and duplicates are reported by row number; the rest are created."""
+        rows = user_rows(3) + [
+            {"username": "test_user1", "email": "new@example.com", "password": "x"},
+            {"username": "fresh", "email": "test2@example.com", "password": "x"},
+            {"username": "bulk0", "email": "other@example.com", "password": "x"},
+            {"username": "nopassword", "email": "np@example.com"},
+            "not an object",
+        ]
+        data = client.post("/api/v1/users/bulk", json=rows).get_json()["data"]
+
+        assert data["created"] == 3
+        assert data["errors"] == [
+            {"row": 4, "message": "Username already exists"},
+            {"row": 5, "message": "Email already exists"},
+            {"row": 6, "message": "Duplicate username in upload"},
+            {"row": 7, "message": "Missing required field: password"},
+            {"row": 8, "message": "Row must be an object with username, email and password"},
+        ]
+
+    def test_csv_and_ndjson_bodies(self, client):
+        """CSV and NDJSON request bodies are parsed row by row."""
+        csv_body = "username,email,password\ncsv1,csv1@example.com,pw1\ncsv2,csv2@example.com,pw2\n"
+        response = client.post("/api/v1/users/bulk", data=csv_body, content_type="text/csv")
+        assert response.get_json()["data"]["created"] == 2
+
+        ndjson_body = "\n".join(json.dumps(row) for row in user_rows(2)) + "\n{broken\n"
+        data = client.post("/api/v1/users/bulk", data=ndjson_body, content_type="application/x-ndjson").get_json()["data"]
+        assert data["created"] == 2
+        assert data["errors"][0]["row"] == 3
+
+    def test_multipart_file_upload(self, client):
+        """A CSV file posted as multipart form data is imported."""
+        upload = io.BytesIO(b"username,email,password\nfile1,file1@example.com,pw\n")
+        response = client.post("/api/v1/users/bulk", data={"file": (upload, "users.csv")}, content_type="multipart/form-data")
+        assert response.get_json()["data"]["created"] == 1
+
+    def test_row_limit_truncates(self, app, client):
+        """Rows beyond BULK_IMPORT_MAX_ROWS are not imported and the result says so."""
+        app.config["BULK_IMPORT_MAX_ROWS"] = 4
+        data = client.post("/api/v1/users/bulk", json=user_rows(6)).get_json()["data"]
+        assert data["created"] == 4 and data["truncated"]
+
+    @pytest.mark.parametrize("body, content_type", [
+        ('{"username": "x"}', "application/json"),
+        ("username,email", "text/plain"),
+    ])
+    def test_unreadable_upload_is_400(self, client, body, content_type):
+        """Bodies that aren't an array, NDJSON or CSV are rejected outright."""
+        response = client.post("/api/v1/users/bulk", data=body, content_type=content_type)
+        assert response.status_code == 400
+
+    def test_process_pool_hashing(self, app):
+        """hash_many spreads work over worker processes and returns hashes in order."""
+        app.config["PASSWORD_HASH_PROCESSES"] = 2
+        PasswordService.init_app(app)
+        try:
+            hashes = PasswordService.hash_many([f"pw{i}" for i in range(6)])
+        finally:
+            app.config["PASSWORD_HASH_PROCESSES"] = 0
+            PasswordService.init_app(app)
+
+        assert all(check_password_hash(h, f"pw{i}") for i, h in enumerate(hashes))
+
+    def test_concurrent_import_is_503(self, client):
+        """With every bulk hashing slot taken, an import fails fast with Retry-After and creates nothing."""
+        with PasswordService.bulk_hashing():
+            response = client.post("/api/v1/users/bulk", data=json.dumps(user_rows(2)), content_type="application/json")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"]
+        assert User.query.filter(User.username.like("bulk%")).count() == 0
+        assert PasswordService.stats()["bulk_rejected"] == 1
+
+        response = client.post("/api/v1/users/bulk", data=json.dumps(user_rows(2)), content_type="application/json")
+        assert response.get_json()["data"]["created"] == 2
+
+    def test_benchmark_command(self, runner):
+        """flask bench bulk-import compares both paths and leaves no users behind."""
+        result = runner.invoke(args=["bench", "bulk-import", "--rows", "3"])
+        assert result.exit_code == 0, result.output
+        assert "create_user loop" in result.output and "bulk_create_users" in result.output
+        assert User.query.filter(User.username.like("bench-import-%")).count() == 0
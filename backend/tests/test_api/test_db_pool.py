@@ -0,0 +1,81 @@
+import pytest
+from sqlalchemy import create_engine, exc as sa_exc
+from sqlalchemy.pool import NullPool
+from app.extensions import db
+from app.utils.db_pool import InstrumentedQueuePool, build_engine_options, pool_stats
+from app.utils.metrics import collect_stats
+from config import Config
+
+def pool_config(uri, **overrides):
+    config = {
+        "SQLALCHEMY_DATABASE_URI": uri,
+        "DB_POOL_PROFILES": Config.DB_POOL_PROFILES,
+        "DB_POOL_PROFILE": "default",
+    }
+    config.update(overrides)
+    return config
+
+class TestEngineOptions:
+    """Tests for turning DB_POOL_PROFILE and DB_* settings into engine options."""
+
+    def test_profile_with_overrides(self):
+        """Environment strings override single profile settings and are cast."""
+        options = build_engine_options(pool_config(
+            "postgresql://u:p@db/app", DB_POOL_PROFILE="threaded",
+            DB_POOL_SIZE="32", DB_POOL_PRE_PING="false", DB_STATEMENT_TIMEOUT_MS="5000"
+        ))
+        assert options["poolclass"] is InstrumentedQueuePool
+        assert options["pool_size"] == 32
+        assert options["max_overflow"] == Config.DB_POOL_PROFILES["threaded"]["max_overflow"]
+        assert options["pool_pre_ping"] is False
+        assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+    def test_mysql_statement_timeout(self):
+        options = build_engine_options(pool_config("mysql+pymysql://u:p@db/app", DB_STATEMENT_TIMEOUT_MS="2000"))
+        assert options["connect_args"] == {"init_command": "SET SESSION max_execution_time=2000"}
+
+    def test_pgbouncer_profile_uses_null_pool(self):
+        """With an external pooler there is nothing to size."""
+        options = build_engine_options(pool_config("postgresql://u:p@db/app", DB_POOL_PROFILE="pgbouncer"))
+        assert options == {"poolclass": NullPool, "pool_pre_ping": False}
+
+    def test_explicit_engine_options_win(self):
+        options = build_engine_options(pool_config(
+            "postgresql://u:p@db/app", SQLALCHEMY_ENGINE_OPTIONS={"pool_size": 2, "echo": True}
+        ))
+        assert options["pool_size"] == 2 and options["echo"] is True
+
+    def test_in_memory_sqlite_untouched(self):
+        assert build_engine_options(pool_config("sqlite://")) == {}
+
+    def test_unknown_profile_rejected(self):
+        with pytest.raises(ValueError):
+            build_engine_options(pool_config("postgresql://u:p@db/app", DB_POOL_PROFILE="huge"))
+
+class TestPoolMetrics:
+    """Tests for the checkout metrics exposed through /metrics."""
+
+    def test_app_engine_is_instrumented(self, app, init_database):
+        """Requests through the app's engine show up under db_pool."""
+        stats = collect_stats()["db_pool"]
+        assert stats["pool"] == "InstrumentedQueuePool"
+        assert stats["checkouts"] >= 1
+        assert stats["size"] == Config.DB_POOL_PROFILES["default"]["pool_size"]
+        assert db.engine.pool.metrics.acquire_max > 0
+
+    def test_exhausted_pool_counts_timeouts(self, tmp_path):
+        """A checkout that gives up after pool_timeout is counted, not hidden."""
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool,
+            pool_size=1, max_overflow=0, pool_timeout=0.05
+        )
+        try:
+            with engine.connect():
+                with pytest.raises(sa_exc.TimeoutError):
+                    engine.connect()
+                assert pool_stats(engine)["checked_out"] == 1
+            engine.dispose()
+            stats = pool_stats(engine)
+            assert stats["checkouts"] == 1 and stats["timeouts"] == 1
+        finally:
+            engine.dispose()
@@ -0,0 +1,59 @@
+import pytest
+from app.services.auth_service import AuthService
+from app.services.endpoint_permission_service import EndpointPermissionService
+
+@pytest.fixture
+def guarded_users(init_database, post_json):
+    """Map get_users to 'users:read' and grant it to user1 only."""
+    role = post_json("/api/v1/roles", {"name": "viewer"})
+    permission = post_json("/api/v1/permissions", {"name": "users:read"})
+    post_json("/api/v1/role-permissions", {"role_id": role["id"], "permission_id": permission["id"]})
+    post_json("/api/v1/user-roles", {"user_id": init_database["user1"].id, "role_id": role["id"]})
+    mapping = post_json("/api/v1/endpoint-permissions", {"endpoint_name": "get_users", "permission_id": permission["id"]})
+
+    return {
+        "mapping": mapping,
+        "allowed": {"Authorization": f"Bearer {AuthService.generate_access_token(init_database['user1'].id)}"},
+        "denied": {"Authorization": f"Bearer {AuthService.generate_access_token(init_database['user2'].id)}"},
+    }
+
+class TestEndpointPermissionEnforcement:
+    """Tests for enforcing endpoint_permissions at request time."""
+
+    def test_mapped_endpoint_requires_permission(self, client, guarded_users):
+        """Missing token is 401, missing permission is 403, granted permission is 200."""
+        assert client.get("/api/v1/users").status_code == 401
+        assert client.get("/api/v1/users", headers=guarded_users["denied"]).status_code == 403
+        assert client.get("/api/v1/users", headers=guarded_users["allowed"]).status_code == 200
+
+    def test_unmapped_endpoint_is_open(self, client, guarded_users):
+        """Endpoints without a mapping keep working without a token."""
+        assert client.get("/api/v1/roles").status_code == 200
+
+    def test_map_recompiled_on_delete(self, client, guarded_users):
+        """Deleting the mapping opens the endpoint again."""
+        response = client.delete(f"/api/v1/endpoint-permissions/{guarded_users['mapping']['id']}")
+        assert response.status_code == 200
+        assert client.get("/api/v1/users").status_code == 200
+
+    def test_map_invalidated_on_permission_delete(self, client, monkeypatch, post_json):
+        """Deleting a permission drops the compiled map, as renaming one does."""
+        permission = post_json("/api/v1/permissions", {"name": "reports:read"})
+        invalidations = []
+        monkeypatch.setattr(EndpointPermissionService, "invalidate_endpoint_map", lambda: invalidations.append(1))
+
+        assert client.delete(f"/api/v1/permissions/{permission['id']}").status_code == 200
+        assert invalidations == [1]
+
+    def test_enforcement_runs_no_rbac_queries_when_warm(self, client, guarded_users, query_counter):
+        """Once the map and the user's permissions are cached, authorization issues no queries."""
+        assert client.get("/api/v1/users", headers=guarded_users["allowed"]).status_code == 200
+
+        with query_counter() as statements:
+            assert client.get("/api/v1/users", headers=guarded_users["allowed"]).status_code == 200
+
+        rbac_tables = ("endpoint_permissions", "permissions", "user_roles", "role_permissions")
+        assert not [
+            s for s in statements
+            if any(f"FROM {table}" in s or f"JOIN {table}" in s for table in rbac_tables)
+        ]
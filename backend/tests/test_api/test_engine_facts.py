@@ -0,0 +1,30 @@
+from flask_sqlalchemy.session import Session
+from app.extensions import db
+from app.utils.engine_facts import _providers, get_engine_fact, get_engine_facts, register_engine_fact
+
+class TestEngineFacts:
+    """Tests for per-engine facts computed at startup."""
+
+    def test_facts_cached_per_engine(self, app):
+        """Dialect facts are read from the engine once and then served from the cache."""
+        facts = get_engine_facts()
+        assert facts["dialect"] == "sqlite"
+        assert get_engine_fact("driver") == "pysqlite"
+        assert get_engine_facts(db.engine) is facts
+
+    def test_registered_fact_is_computed_once(self, app):
+        calls = []
+        register_engine_fact("probe", lambda engine: calls.append(engine) or "ok")
+        try:
+            assert get_engine_fact("probe") == "ok"
+            assert get_engine_fact("probe") == "ok"
+            assert calls == [db.engine]
+        finally:
+            del _providers["probe"]
+
+    def test_requests_do_no_session_work(self, client, monkeypatch):
+        """Requests that never query no longer resolve a session bind."""
+        def get_bind(*args, **kwargs):
+            raise AssertionError("session bind resolved outside a query")
+        monkeypatch.setattr(Session, "get_bind", get_bind)
+        assert client.get("/apispec_1.json").status_code == 200
@@ -0,0 +1,81 @@
+import pytest
+from app.extensions import db
+from app.models.endpoint_permission import EndpointPermission
+from app.models.rbac import Permission, Role
+from app.models.user import User
+
+@pytest.fixture
+def rbac_rows(app):
+    permission = Permission(name="etag_perm")
+    db.session.add_all([Role(name="etag_role"), permission])
+    db.session.flush()
+    db.session.add(EndpointPermission(endpoint_name="etag_endpoint", permission_id=permission.id))
+    db.session.commit()
+    return {"permission": permission}
+
+def revalidate(client, url, etag):
+    return client.get(url, headers={"If-None-Match": etag})
+
+class TestConditionalGet:
+    """Tests for ETags and 304 responses on polled read endpoints."""
+
+    @pytest.mark.parametrize("url", ["/api/v1/roles", "/api/v1/permissions", "/api/v1/endpoint-permissions"])
+    def test_unchanged_list_is_304_after_one_probe(self, client, rbac_rows, query_counter, url):
+        """A matching If-None-Match costs a single probe query and returns no body."""
+        first = client.get(url)
+        assert first.status_code == 200 and first.headers["ETag"].startswith('W/"')
+
+        with query_counter() as statements:
+            second = revalidate(client, url, first.headers["ETag"])
+        assert second.status_code == 304
+        assert second.data == b""
+        assert second.headers["ETag"] == first.headers["ETag"]
+        assert len(statements) == 1
+
+    def test_list_etag_changes_with_data(self, client, rbac_rows):
+        etag = client.get("/api/v1/roles").headers["ETag"]
+
+        role = Role.query.filter_by(name="etag_role").one()
+        role.description = "changed"
+        db.session.commit()
+        updated = revalidate(client, "/api/v1/roles", etag)
+        assert updated.status_code == 200 and updated.headers["ETag"] != etag
+
+        etag = updated.headers["ETag"]
+        db.session.delete(role)
+        db.session.commit()
+        assert revalidate(client, "/api/v1/roles", etag).status_code == 200
+
+    def test_endpoint_permissions_follow_permission_names(self, client, rbac_rows):
+        """Listings show permission names, so renaming a permission changes the ETag."""
+        etag = client.get("/api/v1/endpoint-permissions").headers["ETag"]
+        rbac_rows["permission"].name = "etag_perm_renamed"
+        db.session.commit()
+        response = revalidate(client, "/api/v1/endpoint-permissions", etag)
+        assert response.status_code == 200
+        assert response.get_json()["data"][0]["permission_name"] == "etag_perm_renamed"
+
+    def test_query_string_is_part_of_the_etag(self, client, rbac_rows):
+        etag = client.get("/api/v1/roles").headers["ETag"]
+        assert client.get("/api/v1/roles?limit=1").headers["ETag"] != etag
+
+    def test_user_detail(self, client, init_database, query_counter):
+        user = init_database["user1"]
+        url = f"/api/v1/users/{user.id}"
+        etag = client.get(url).headers["ETag"]
+
+        with query_counter() as statements:
+            assert revalidate(client, url, etag).status_code == 304
+        assert len(statements) == 1
+
+        user.username = "renamed"
+        db.session.commit()
+        response = revalidate(client, url, etag)
+        assert response.status_code == 200 and response.get_json()["data"]["username"] == "renamed"
+
+        db.session.delete(db.session.get(User, user.id))
+        db.session.commit()
+        assert revalidate(client, url, response.headers["ETag"]).status_code == 404
+
+    def test_streamed_exports_are_not_tagged(self, client, rbac_rows):
+        assert "ETag" not in client.get("/api/v1/roles?stream=1").headers
@@ -0,0 +1,72 @@
+import pytest
+from datetime import datetime
+from app.models.endpoint_permission import EndpointPermission
+from app.models.rbac import Permission, Role
+from app.models.user import User
+from app.utils.json_provider import FastJSONProvider, orjson
+from app.utils.serializers import make_serializer
+
+@pytest.fixture(params=["stdlib", "orjson"])
+def provider(request, app):
+    """The app's JSON provider, forced onto each backend in turn."""
+    if request.param == "orjson" and orjson is None:
+        pytest.skip("orjson is not installed")
+    app.config["JSON_ENCODER"] = request.param
+    app.json = FastJSONProvider(app)
+    return app.json
+
+class TestFastJSONProvider:
+    """Tests for the pluggable JSON provider and model serializers."""
+
+    def test_datetimes_are_iso_8601(self, provider):
+        """Both backends write naive datetimes exactly like isoformat()."""
+        value = datetime(2024, 5, 1, 12, 30, 15, 123456)
+        assert provider.loads(provider.dumps({"at": value})) == {"at": value.isoformat()}
+
+    def test_backends_agree(self, provider):
+        """Keys are sorted and non-ASCII survives, whichever backend is active."""
+        payload = {"b": [1, 2.5, None, True], "a": "naïve"}
+        encoded = provider.dumps(payload)
+        assert provider.loads(encoded) == payload
+        assert encoded.index('"a"') < encoded.index('"b"')
+
+    def test_jsonify_model(self, client, init_database, provider):
+        """A single-user response renders created_at as an ISO string."""
+        user = init_database["user1"]
+        body = client.get(f"/api/v1/users/{user.id}").get_json()["data"]
+        assert body["created_at"] == user.created_at.isoformat()
+        assert "password_hash" not in body
+
+    def test_unknown_backend_rejected(self, app):
+        """Misconfigured JSON_ENCODER fails at startup."""
+        app.config["JSON_ENCODER"] = "simdjson"
+        with pytest.raises(ValueError):
+            FastJSONProvider(app)
+
+    def test_serializer(self):
+        """Serializers read plain and dotted attributes, including a single field."""
+        serialize = make_serializer(["id", "username"], extra={"created_year": "created_at.year"})
+        user = User(id=7, username="ada", created_at=datetime(2024, 1, 1))
+        assert serialize(user) == {"id": 7, "username": "ada", "created_year": 2024}
+        assert make_serializer(["id"])(user) == {"id": 7}
+
+    def test_user_serializer_is_allow_list(self):
+        """User.to_dict lists only its allowed fields, never secrets or token versions."""
+        now = datetime.utcnow()
+        user = User(id=1, username="ada", email="ada@example.com", password_hash="secret", created_at=now, is_active=True)
+        assert user.to_dict() == {
+            "id": 1, "username": "ada", "email": "ada@example.com", "created_at": now, "is_active": True
+        }
+
+    def test_rbac_serializers_are_allow_lists(self):
+        """Role, Permission and EndpointPermission expose only their listed fields."""
+        now = datetime.utcnow()
+        role = Role(id=1, name="admin", description=None, created_at=now, updated_at=now)
+        assert role.to_dict() == {"id": 1, "name": "admin", "description": None, "created_at": now}
+        permission = Permission(id=2, name="users:read", description="Read users", created_at=now, updated_at=now)
+        assert permission.to_dict() == {"id": 2, "name": "users:read", "description": "Read users", "created_at": now}
+
+        mapping = EndpointPermission(id=3, endpoint_name="get_users", permission=permission, created_at=now, updated_at=now)
+        assert set(mapping.to_dict()) == {
+            "id", "endpoint_name", "permission_id", "created_at", "updated_at", "permission_name"
+        }
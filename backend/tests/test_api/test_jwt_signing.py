@@ -0,0 +1,87 @@
+import json
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from werkzeug.security import generate_password_hash
+from app.extensions import db
+from app.models.user import User
+from app.services.auth_service import AuthService
+
+def private_pem(key):
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ).decode("utf-8")
+
+def public_pem(key):
+    return key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode("utf-8")
+
+@pytest.fixture
+def configure_keys(app):
+    """Reload AuthService keys from overridden config, restoring the defaults afterwards."""
+    original = dict(app.config)
+
+    def configure(**overrides):
+        app.config.update(overrides)
+        AuthService.init_app(app)
+
+    yield configure
+    app.config.clear()
+    app.config.update(original)
+    AuthService.init_app(app)
+
+@pytest.fixture
+def user_id(app):
+    user = User(username="signed_user", email="signed@example.com", password_hash=generate_password_hash("password123"))
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+class TestAsymmetricSigning:
+    """Tests for asymmetric JWT signing and the JWKS endpoint."""
+
+    def test_eddsa_tokens_verify_with_published_jwks(self, client, configure_keys, user_id):
+        configure_keys(JWT_ALGORITHM="EdDSA", JWT_PRIVATE_KEY=private_pem(ed25519.Ed25519PrivateKey.generate()), JWT_KEY_ID="ed-1")
+        token = AuthService.generate_access_token(user_id)
+
+        assert jwt.get_unverified_header(token) == {"alg": "EdDSA", "kid": "ed-1", "typ": "JWT"}
+        assert client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+
+        response = client.get("/api/v1/auth/.well-known/jwks.json")
+        assert response.status_code == 200
+        jwk = response.get_json()["keys"][0]
+        assert jwk["kid"] == "ed-1"
+        assert jwk["kty"] == "OKP"
+        assert "d" not in jwk
+
+        # A downstream service can verify locally from the JWKS alone
+        public_key = jwt.PyJWK(jwk).key
+        assert jwt.decode(token, public_key, algorithms=["EdDSA"])["sub"] == str(user_id)
+
+    def test_rotated_key_still_verifies(self, client, configure_keys, user_id, tmp_path):
+        old_key = ec.generate_private_key(ec.SECP256R1())
+        new_key = ec.generate_private_key(ec.SECP256R1())
+        (tmp_path / "old.pem").write_text(private_pem(old_key))
+        configure_keys(JWT_ALGORITHM="ES256", JWT_KEYS_DIR=str(tmp_path), JWT_KEY_ID="old")
+        old_token = AuthService.generate_access_token(user_id)
+
+        # Rotate: sign with the new key, keep only the public half of the old one
+        (tmp_path / "old.pem").write_text(public_pem(old_key))
+        (tmp_path / "new.pem").write_text(private_pem(new_key))
+        configure_keys(JWT_KEY_ID="new")
+        new_token = AuthService.generate_access_token(user_id)
+
+        assert jwt.get_unverified_header(new_token)["kid"] == "new"
+        for token in (old_token, new_token):
+            assert client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+
+        kids = {jwk["kid"] for jwk in client.get("/api/v1/auth/.well-known/jwks.json").get_json()["keys"]}
+        assert kids == {"old", "new"}
+
+    def test_symmetric_algorithm_publishes_no_keys(self, client):
+        assert client.get("/api/v1/auth/.well-known/jwks.json").get_json() == {"keys": []}
@@ -0,0 +1,163 @@
+import socket
+import time
+import pytest
+from jinja2 import UndefinedError
+from app.extensions import db
+from app.models.user import User
+from app.services.mail_service import MailService
+
+@pytest.fixture
+def unreachable_smtp(app):
+    """Point MailService at a local port nothing listens on, so every connection is refused."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    app.config["MAIL_SERVER"], app.config["MAIL_PORT"] = "127.0.0.1", port
+    MailService.init_app(app)
+    yield
+    MailService.shutdown()
+
+class TestMailQueue:
+    """Tests for the background mail queue against a local stub SMTP server."""
+
+    def test_messages_share_one_connection(self, smtp_server):
+        """A sender keeps its SMTP session open across messages."""
+        for i in range(5):
+            assert MailService.send(f"user{i}@example.com", "Hello", f"Message {i}")
+        assert MailService.flush(timeout=5)
+
+        assert [m["To"] for m in smtp_server.messages] == [f"user{i}@example.com" for i in range(5)]
+        assert smtp_server.connections == 1
+        stats = MailService.stats()
+        assert stats["sent"] == 5 and stats["connections"] == 1
+
+    def test_html_alternative(self, smtp_server):
+        MailService.send("a@example.com", "Hi", "plain body", html="<p>html body</p>")
+        MailService.flush(timeout=5)
+        message = smtp_server.messages[0]
+        assert message["From"] == "noreply@example.com"
+        assert message.get_body(("html",)).get_content().strip() == "<p>html body</p>"
+        assert message.get_body(("plain",)).get_content().strip() == "plain body"
+
+    def test_transient_failures_are_retried(self, smtp_server):
+        """4xx replies are retried on a fresh connection until the message goes through."""
+        smtp_server.fail_codes = [451, 451]
+        MailService.send("a@example.com", "Hi", "body")
+        MailService.flush(timeout=5)
+
+        assert len(smtp_server.messages) == 1
+        stats = MailService.stats()
+        assert stats["retried"] == 2 and stats["sent"] == 1 and stats["failed"] == 0
+
+    def test_permanent_failure_is_not_retried(self, smtp_server):
+        smtp_server.fail_codes = [550]
+        MailService.send("a@example.com", "Hi", "body")
+        MailService.flush(timeout=5)
+
+        assert smtp_server.messages == []
+        stats = MailService.stats()
+        assert stats["failed"] == 1 and stats["retried"] == 0
+
+    def test_login_with_configured_credentials(self, app, smtp_server):
+        app.config.update(MAIL_USERNAME="mailer", MAIL_PASSWORD="secret")
+        MailService.init_app(app)
+        MailService.send("a@example.com", "Hi", "body")
+        MailService.flush(timeout=5)
+        assert len(smtp_server.logins) == 1 and smtp_server.logins[0].startswith("AUTH PLAIN")
+
+    def test_full_queue_rejects(self, app, smtp_server):
+        """send() fails fast instead of blocking once MAIL_QUEUE_SIZE messages are waiting."""
+        smtp_server.delay = 0.5
+        app.config["MAIL_QUEUE_SIZE"] = 1
+        MailService.init_app(app)
+        results = [MailService.send("a@example.com", "Hi", "body") for _ in range(3)]
+        assert False in results
+        assert MailService.stats()["rejected"] == results.count(False)
+
+    def test_shutdown_interrupts_backoff(self, app, unreachable_smtp):
+        """With the server down and the queue full, shutdown neither blocks nor waits out the backoff."""
+        # Every attempt is refused and retried after 30s
+        app.config.update(MAIL_RETRY_BACKOFF=30, MAIL_QUEUE_SIZE=1)
+        MailService.init_app(app)
+        while MailService.send("a@example.com", "Hi", "body"):
+            pass
+        senders = list(MailService._senders)
+
+        started = time.perf_counter()
+        MailService.shutdown(timeout=5)
+        assert time.perf_counter() - started < 2
+        assert not any(sender.is_alive() for sender in senders)
+
+    def test_forgot_password_does_not_wait_for_smtp(self, client, init_database, smtp_server):
+        """The endpoint returns before a slow SMTP server has even greeted."""
+        smtp_server.delay = 1
+        started = time.perf_counter()
+        response = client.post("/api/v1/auth/forgot-password", json={"email": "test1@example.com"})
+        assert response.status_code == 200
+        assert time.perf_counter() - started < smtp_server.delay
+
+        assert MailService.flush(timeout=5)
+        assert len(smtp_server.messages) == 1
+
+class TestMailTemplates:
+    """Tests for precompiled templates and batch sending."""
+
+    def test_render_password_reset(self, app):
+        """Both alternatives are rendered and only the HTML one is escaped."""
+        message = MailService.render(
+            "password_reset", "a@example.com", username="<ada>", reset_url="http://x/reset?a=1&b=2", expires_in="1 hour"
+        )
+        assert message["Subject"] == "Password Reset Request"
+        text = message.get_body(("plain",)).get_content()
+        html = message.get_body(("html",)).get_content()
+        assert "Hello <ada>," in text and "http://x/reset?a=1&b=2" in text
+        assert "Hello &lt;ada&gt;," in html and 'href="http://x/reset?a=1&amp;b=2"' in html
+
+    def test_unknown_template_and_missing_variables(self, app):
+        with pytest.raises(ValueError):
+            MailService.render("welcome", "a@example.com")
+        with pytest.raises(UndefinedError):
+            MailService.render("password_reset", "a@example.com", username="ada")
+
+    def test_send_batch_uses_one_session(self, smtp_server):
+        """A batch is sent over a single connection and reports its throughput."""
+        messages = (MailService.build_message(f"u{i}@example.com", "Notice", "body") for i in range(20))
+        report = MailService.send_batch(messages)
+
+        assert report["sent"] == 20 and report["failed"] == 0
+        assert report["connections"] == 1 and smtp_server.connections == 1
+        assert report["per_second"] > 0
+
+    def test_reset_campaign_command(self, runner, init_database, smtp_server):
+        """flask mail reset-campaign emails every active user a reset link."""
+        db.session.add(User(username="inactive", email="inactive@example.com", password_hash="x", is_active=False))
+        db.session.commit()
+
+        result = runner.invoke(args=["mail", "reset-campaign"])
+
+        assert result.exit_code == 0, result.output
+        assert "Sent 2 (0 failed) over 1 connection(s)" in result.output
+        assert sorted(m["To"] for m in smtp_server.messages) == ["test1@example.com", "test2@example.com"]
+        assert "/auth/reset-password/" in smtp_server.messages[0].get_body(("plain",)).get_content()
+
+    def test_send_batch_aborts_when_unreachable(self, app, unreachable_smtp):
+        """Consecutive connection failures end the batch and list the recipients never tried."""
+        app.config["MAIL_BATCH_MAX_CONNECT_FAILURES"] = 2
+        MailService.init_app(app)
+        messages = (MailService.build_message(f"u{i}@example.com", "Notice", "body") for i in range(5))
+        report = MailService.send_batch(messages)
+
+        assert report["aborted"] is True
+        assert report["sent"] == 0 and report["failed"] == 1
+        assert report["not_attempted"] == [f"u{i}@example.com" for i in range(1, 5)]
+        assert MailService.stats()["retried"] == 1
+
+    def test_reset_campaign_reports_unattempted(self, app, runner, init_database, unreachable_smtp):
+        app.config["MAIL_BATCH_MAX_CONNECT_FAILURES"] = 1
+        MailService.init_app(app)
+
+        result = runner.invoke(args=["mail", "reset-campaign"])
+
+        assert result.exit_code == 1
+        assert "Not attempted: test2@example.com" in result.output
+        assert "1 message(s) not attempted" in result.output
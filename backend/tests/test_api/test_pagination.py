@@ -0,0 +1,158 @@
+import json
+from datetime import datetime
+import pytest
+from app.extensions import db
+from app.models.user import User
+from app.models.rbac import Role
+
+@pytest.fixture
+def many_users(app):
+    """Seed 25 users; every third one is inactive."""
+    db.session.add_all([
+        User(username=f"page_user{i}", email=f"page{i}@example.com", password_hash="x", is_active=i % 3 != 0)
+        for i in range(25)
+    ])
+    db.session.commit()
+
+def walk(client, url):
+    """Follow next_cursor until the last page; returns every page's body."""
+    pages = []
+    while True:
+        response = client.get(url if not pages else f"{url}&cursor={pages[-1]['pagination']['next_cursor']}")
+        assert response.status_code == 200
+        pages.append(response.get_json())
+        if not pages[-1]["pagination"]["has_more"]:
+            return pages
+
+class TestKeysetPagination:
+    """Tests for cursor pagination on list endpoints."""
+
+    def test_walks_every_row_once(self, client, many_users):
+        """Following next_cursor returns each user exactly once, in id order."""
+        pages = walk(client, "/api/v1/users?limit=10")
+
+        assert [len(page["data"]) for page in pages] == [10, 10, 5]
+        ids = [user["id"] for page in pages for user in page["data"]]
+        assert ids == sorted(ids) and len(set(ids)) == 25
+        assert pages[-1]["pagination"]["next_cursor"] is None
+
+    def test_response_does_not_include_password_hash(self, client, many_users):
+        """List rows are serialized through the model, not raw table rows."""
+        data = client.get("/api/v1/users?limit=1").get_json()["data"]
+        assert "password_hash" not in data[0]
+
+    def test_limit_defaults_and_is_capped(self, app, client, many_users):
+        """Without ?limit the configured default applies; larger limits are clamped to the maximum."""
+        app.config["PAGINATION_DEFAULT_LIMIT"] = 7
+        app.config["PAGINATION_MAX_LIMIT"] = 12
+
+        assert len(client.get("/api/v1/users").get_json()["data"]) == 7
+        body = client.get("/api/v1/users?limit=1000").get_json()
+        assert len(body["data"]) == 12
+        assert body["pagination"]["limit"] == 12
+
+    def test_filters(self, client, many_users):
+        """Whitelisted filters are applied together with the cursor."""
+        pages = walk(client, "/api/v1/users?limit=4&is_active=false")
+        users = [user for page in pages for user in page["data"]]
+        assert len(users) == 9
+        assert not any(user["is_active"] for user in users)
+
+        data = client.get("/api/v1/users?username=page_user5&unknown=1").get_json()["data"]
+        assert [user["username"] for user in data] == ["page_user5"]
+
+    def test_roles_are_paginated(self, client, app):
+        """Other list endpoints share the same pagination layer."""
+        db.session.add_all([Role(name=f"role{i}") for i in range(3)])
+        db.session.commit()
+
+        body = client.get("/api/v1/roles?limit=2").get_json()
+        assert len(body["data"]) == 2 and body["pagination"]["has_more"]
+        body = client.get(f"/api/v1/roles?limit=2&cursor={body['pagination']['next_cursor']}").get_json()
+        assert [role["name"] for role in body["data"]] == ["role2"]
+
+    @pytest.mark.parametrize("query", ["cursor=not-a-cursor", "limit=abc", "limit=0", "is_active=maybe"])
+    def test_bad_parameters_are_400(self, client, query):
+        """Malformed cursors, limits and filter values are client errors."""
+        response = client.get(f"/api/v1/users?{query}")
+        assert response.status_code == 400
+        assert response.get_json()["status"] == "error"
+
+
+class TestNdjsonExport:
+    """Tests for streamed NDJSON exports of list endpoints."""
+
+    def test_stream_query_parameter(self, app, client, many_users):
+        """?stream=1 returns every row, one JSON object per line, regardless of page size."""
+        app.config["EXPORT_BATCH_SIZE"] = 4
+        response = client.get("/api/v1/users?stream=1&limit=2")
+
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+        lines = response.get_data(as_text=True).splitlines()
+        assert len(lines) == 25
+        users = [json.loads(line) for line in lines]
+        assert [user["id"] for user in users] == sorted(user["id"] for user in users)
+        assert "password_hash" not in users[0]
+
+    def test_accept_header_and_filters(self, client, many_users):
+        """Accept: application/x-ndjson selects streaming; filters still apply."""
+        response = client.get("/api/v1/users?is_active=false", headers={"Accept": "application/x-ndjson"})
+
+        assert response.mimetype == "application/x-ndjson"
+        assert len(response.get_data(as_text=True).splitlines()) == 9
+
+    def test_default_accept_keeps_json(self, client, many_users):
+        """Browsers sending */* still get the paginated JSON envelope."""
+        response = client.get("/api/v1/users", headers={"Accept": "*/*"})
+        assert response.mimetype == "application/json"
+
+    def test_other_list_endpoints_stream(self, client, app):
+        """Roles export through the same streaming layer."""
+        db.session.add_all([Role(name=f"role{i}") for i in range(3)])
+        db.session.commit()
+
+        lines = client.get("/api/v1/roles?stream=1").get_data(as_text=True).splitlines()
+        assert [json.loads(line)["name"] for line in lines] == ["role0", "role1", "role2"]
+
+    def test_bad_cursor_fails_before_streaming(self, client):
+        """Cursor errors are reported as 400 instead of a truncated stream."""
+        assert client.get("/api/v1/users?stream=1&cursor=bogus").status_code == 400
+
+
+class TestFieldProjection:
+    """Tests for ?fields= sparse fieldsets on list endpoints."""
+
+    def test_default_fields_never_select_password_hash(self, client, many_users, query_counter):
+        """The default projection neither selects nor returns password_hash."""
+        with query_counter() as statements:
+            data = client.get("/api/v1/users?limit=1").get_json()["data"]
+
+        assert set(data[0]) == {"id", "username", "email", "created_at", "is_active"}
+        assert not [s for s in statements if "password_hash" in s]
+
+    def test_requested_fields_only(self, client, many_users):
+        """Only the requested columns (plus id) are returned; datetimes are ISO strings."""
+        data = client.get("/api/v1/users?fields=username,updated_at&limit=2").get_json()["data"]
+
+        assert [set(user) for user in data] == [{"id", "username", "updated_at"}] * 2
+        assert datetime.fromisoformat(data[0]["updated_at"])
+
+    def test_fields_apply_to_streamed_exports(self, client, many_users):
+        """NDJSON exports use the same projection."""
+        lines = client.get("/api/v1/users?stream=1&fields=email").get_data(as_text=True).splitlines()
+        assert set(json.loads(lines[0])) == {"id", "email"}
+
+    def test_fields_outside_whitelist_are_rejected(self, client):
+        """Columns missing from the whitelist, such as password_hash, are a 400."""
+        response = client.get("/api/v1/users?fields=username,password_hash")
+        assert response.status_code == 400
+        assert "password_hash" in response.get_json()["message"]
+
+    def test_endpoint_permission_name_is_projected(self, client):
+        """permission_name comes from a correlated subquery rather than a lazy load."""
+        permission = client.post("/api/v1/permissions", json={"name": "users:read"}).get_json()["data"]
+        client.post("/api/v1/endpoint-permissions", json={"endpoint_name": "noop", "permission_id": permission["id"]})
+
+        data = client.get("/api/v1/endpoint-permissions?fields=endpoint_name,permission_name").get_json()["data"]
+        assert data == [{"id": data[0]["id"], "endpoint_name": "noop", "permission_name": "users:read"}]
@@ -0,0 +1,67 @@
+import json
+import pytest
+from werkzeug.security import generate_password_hash, check_password_hash
+from app.extensions import db
+from app.services.password_service import PasswordService
+
+@pytest.fixture
+def saturated_pool(app):
+    """Hold every hashing slot so the next hash request is rejected."""
+    app.config.update(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_QUEUE_SIZE=1, PASSWORD_HASH_RETRY_AFTER=2)
+    PasswordService.init_app(app)
+    for _ in range(2):
+        PasswordService._slots.acquire()
+    yield
+    for _ in range(2):
+        PasswordService._slots.release()
+
+class TestPasswordHashingPool:
+    """Tests for the bounded password hashing pool."""
+
+    def test_register_records_hash_metrics(self, client):
+        payload = {"username": "pooluser", "email": "pool@example.com", "password": "securepassword123"}
+        response = client.post("/api/v1/auth/register", data=json.dumps(payload), content_type="application/json")
+        assert response.status_code == 201
+
+        stats = PasswordService.stats()
+        assert stats["completed"] == 1
+        assert stats["hash_time_avg_ms"] > 0
+        assert stats["in_flight"] == 0
+
+    def test_full_queue_returns_503(self, client, saturated_pool):
+        payload = {"username": "busyuser", "email": "busy@example.com", "password": "securepassword123"}
+        response = client.post("/api/v1/auth/register", data=json.dumps(payload), content_type="application/json")
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "2"
+        assert PasswordService.stats()["rejected"] == 1
+
+    def test_full_queue_rejects_login(self, client, init_database, saturated_pool):
+        payload = {"email": "test1@example.com", "password": "whatever"}
+        response = client.post("/api/v1/auth/login", data=json.dumps(payload), content_type="application/json")
+        assert response.status_code == 503
+
+class TestPasswordHashProfiles:
+    """Tests for configurable hashing profiles and rehash-on-login."""
+
+    def test_new_hashes_use_active_profile(self, app):
+        assert PasswordService.hash_password("secret").startswith("pbkdf2:sha256:1000$")
+
+    def test_login_upgrades_outdated_hash(self, client, init_database):
+        user = init_database["user1"]
+        user.password_hash = generate_password_hash("correct_password", "pbkdf2:sha256:2000")
+        db.session.commit()
+
+        payload = {"email": "test1@example.com", "password": "correct_password"}
+        response = client.post("/api/v1/auth/login", data=json.dumps(payload), content_type="application/json")
+        assert response.status_code == 200
+
+        db.session.refresh(user)
+        assert user.password_hash.startswith("pbkdf2:sha256:1000$")
+        assert not PasswordService.needs_rehash(user.password_hash)
+        assert check_password_hash(user.password_hash, "correct_password")
+
+    def test_benchmark_command(self, runner):
+        result = runner.invoke(args=["passwords", "benchmark", "--profile", "fast", "--seconds", "0.05"])
+        assert result.exit_code == 0
+        assert "pbkdf2:sha256:1000" in result.output
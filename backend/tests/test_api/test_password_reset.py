@@ -6,23 +6,17 @@ from unittest.mock import patch, MagicMock
 from werkzeug.security import generate_password_hash, check_password_hash
 from app.models.user import User
 from app.services.auth_service import AuthService
+from app.services.mail_service import MailService
 
 class TestPasswordReset:
     """Tests for password reset functionality."""
 
-    @patch('smtplib.SMTP')
-    def test_forgot_password(self, mock_smtp, client, app, init_database):
+    def test_forgot_password(self, client, init_database, smtp_server):
         """Test forgot password endpoint."""
         # Mock the environment variables
         with patch.dict('os.environ', {
-            'EMAIL_USER': 'test@example.com',
-            'EMAIL_PASSWORD': 'test_password',
             'BASE_SERVER_URL': 'http://localhost:5000'
         }):
-            # Setup mock SMTP connection
-            mock_connection = MagicMock()
-            mock_smtp.return_value.__enter__.return_value = mock_connection
-            
             # Prepare request
             payload = {
                 "email": "test1@example.com"  # Existing user from init_database
@@ -41,14 +35,14 @@ class TestPasswordReset:
             assert data["status"] == "success"
             assert "reset" in data["message"].lower()
             
-            # Verify SMTP was called
-            mock_connection.starttls.assert_called_once()
-            mock_connection.login.assert_called_once_with('test@example.com', 'test_password')
-            mock_connection.sendmail.assert_called_once()
+            # Verify the queued email reached the SMTP server
+            assert MailService.flush(timeout=5)
+            assert len(smtp_server.messages) == 1
+            message = smtp_server.messages[0]
+            assert message["To"] == "test1@example.com"
             
             # Verify email contains reset URL
-            send_args = mock_connection.sendmail.call_args[0]
-            email_content = send_args[2]
+            email_content = message.get_body(("plain",)).get_content()
             assert "reset your password" in email_content
             reset_url_match = re.search(r'(http://[^\s]+)', email_content)
             assert reset_url_match is not None
@@ -0,0 +1,51 @@
+import pytest
+from app.services.permission_resolver_service import PermissionResolverService
+
+@pytest.fixture
+def rbac(init_database, post_json):
+    """A user holding an 'editor' role with two permissions."""
+    PermissionResolverService.invalidate_all()
+    role = post_json("/api/v1/roles", {"name": "editor"})
+    read = post_json("/api/v1/permissions", {"name": "posts:read"})
+    write = post_json("/api/v1/permissions", {"name": "posts:write"})
+    for permission in (read, write):
+        post_json("/api/v1/role-permissions", {"role_id": role["id"], "permission_id": permission["id"]})
+
+    user_id = init_database["user1"].id
+    post_json("/api/v1/user-roles", {"user_id": user_id, "role_id": role["id"]})
+    return {"user_id": user_id, "role": role, "read": read, "write": write}
+
+class TestPermissionResolver:
+    """Tests for the cached user -> permission resolver."""
+
+    def test_resolves_in_one_query_then_from_cache(self, app, rbac, query_counter):
+        """The first lookup runs one joined query; later lookups run none."""
+        with query_counter() as statements:
+            with app.test_request_context():
+                permissions = PermissionResolverService.get_user_permissions(rbac["user_id"])
+            assert permissions == frozenset({"posts:read", "posts:write"})
+            assert len(statements) == 1
+
+            with app.test_request_context():
+                assert PermissionResolverService.has_permission(rbac["user_id"], "posts:write")
+        assert len(statements) == 1
+
+    def test_role_permission_change_invalidates(self, client, rbac):
+        """Removing a permission from a role is visible immediately."""
+        assert "posts:write" in PermissionResolverService.get_user_permissions(rbac["user_id"])
+
+        response = client.delete(
+            f"/api/v1/role-permissions?role_id={rbac['role']['id']}&permission_id={rbac['write']['id']}"
+        )
+        assert response.status_code == 200
+
+        assert PermissionResolverService.get_user_permissions(rbac["user_id"]) == frozenset({"posts:read"})
+
+    def test_user_role_change_invalidates(self, client, rbac):
+        """Removing a role from a user is visible immediately."""
+        assert PermissionResolverService.get_user_permissions(rbac["user_id"])
+
+        response = client.delete(f"/api/v1/user-roles?user_id={rbac['user_id']}&role_id={rbac['role']['id']}")
+        assert response.status_code == 200
+
+        assert PermissionResolverService.get_user_permissions(rbac["user_id"]) == frozenset()
@@ -0,0 +1,137 @@
+import inspect
+import itertools
+import uuid
+from datetime import datetime, timedelta
+import pytest
+import app.services as services
+from app.extensions import db
+from app.models.endpoint_permission import EndpointPermission
+from app.models.rbac import Permission, Role, RolePermission, UserRole
+from app.models.token_blocklist import TokenBlocklist
+from app.models.user import User
+from app.services import (
+    AuthService, EndpointPermissionService, PermissionResolverService, PermissionService,
+    RolePermissionService, RoleService, TokenBlocklistService, UserRoleService, UserService
+)
+
+_names = itertools.count()
+
+def seed(size):
+    """Add ``size`` rows to every table, all hanging off the first user, role and permission."""
+    users = [User(username=f"qc_user{next(_names)}", email=f"qc{next(_names)}@example.com") for _ in range(size)]
+    roles = [Role(name=f"qc_role{next(_names)}") for _ in range(size)]
+    permissions = [Permission(name=f"qc_perm{next(_names)}") for _ in range(size)]
+    db.session.add_all(users + roles + permissions)
+    db.session.flush()
+
+    first_user = db.session.scalar(db.select(User).order_by(User.id))
+    first_role = db.session.scalar(db.select(Role).order_by(Role.id))
+    db.session.add_all(
+        [UserRole(user_id=first_user.id, role_id=role.id) for role in roles]
+        + [RolePermission(role_id=first_role.id, permission_id=p.id) for p in permissions]
+        + [EndpointPermission(endpoint_name=f"qc_endpoint{next(_names)}", permission_id=p.id) for p in permissions]
+        + [
+            TokenBlocklist(jti=str(uuid.uuid4()), token_type="access", user_id=first_user.id,
+                           expires_at=datetime.now() + timedelta(hours=1))
+            for _ in range(size)
+        ]
+    )
+    db.session.commit()
+
+def first_id(model):
+    return db.session.scalar(db.select(model.id).order_by(model.id))
+
+def all_role_ids():
+    return list(db.session.scalars(db.select(Role.id)))
+
+# Every read path in app/services, called so that its result grows with the seeded data
+SCENARIOS = {
+    "UserService.get_all_users": lambda: UserService.get_all_users(limit=1000),
+    "UserService.export_users": lambda: list(UserService.export_users()),
+    "UserService.get_user_by_id": lambda: UserService.get_user_by_id(first_id(User)),
+    "UserService.get_user_version": lambda: UserService.get_user_version(first_id(User)),
+    "RoleService.get_all_roles": lambda: RoleService.get_all_roles(limit=1000),
+    "RoleService.export_roles": lambda: list(RoleService.export_roles()),
+    "RoleService.get_roles_version": lambda: RoleService.get_roles_version(),
+    "RoleService.get_role_by_id": lambda: RoleService.get_role_by_id(first_id(Role)),
+    "PermissionService.get_all_permissions": lambda: PermissionService.get_all_permissions(limit=1000),
+    "PermissionService.export_permissions": lambda: list(PermissionService.export_permissions()),
+    "PermissionService.get_permissions_version": lambda: PermissionService.get_permissions_version(),
+    "PermissionService.get_permission_by_id": lambda: PermissionService.get_permission_by_id(first_id(Permission)),
+    "UserRoleService.get_all_user_roles": lambda: UserRoleService.get_all_user_roles(limit=1000),
+    "UserRoleService.export_user_roles": lambda: list(UserRoleService.export_user_roles()),
+    "UserRoleService.get_roles_by_user": lambda: UserRoleService.get_roles_by_user(first_id(User)),
+    "RolePermissionService.get_all_role_permissions": lambda: RolePermissionService.get_all_role_permissions(limit=1000),
+    "RolePermissionService.export_role_permissions": lambda: list(RolePermissionService.export_role_permissions()),
+    "RolePermissionService.get_permissions_by_role": lambda: RolePermissionService.get_permissions_by_role(first_id(Role)),
+    "EndpointPermissionService.get_all_endpoint_permissions":
+        lambda: EndpointPermissionService.get_all_endpoint_permissions(limit=1000),
+    "EndpointPermissionService.export_endpoint_permissions":
+        lambda: list(EndpointPermissionService.export_endpoint_permissions()),
+    "EndpointPermissionService.get_endpoint_permissions_version":
+        lambda: EndpointPermissionService.get_endpoint_permissions_version(),
+    "EndpointPermissionService.get_endpoint_permission_by_id":
+        lambda: EndpointPermissionService.get_endpoint_permission_by_id(first_id(EndpointPermission)),
+    "EndpointPermissionService.compile_endpoint_map": lambda: EndpointPermissionService.compile_endpoint_map(),
+    "EndpointPermissionService.get_endpoint_map": lambda: EndpointPermissionService.get_endpoint_map(),
+    "EndpointPermissionService.get_required_permission":
+        lambda: EndpointPermissionService.get_required_permission("qc_endpoint"),
+    "PermissionResolverService.get_user_permissions":
+        lambda: PermissionResolverService.get_user_permissions(first_id(User)),
+    "PermissionResolverService.get_user_role_ids": lambda: PermissionResolverService.get_user_role_ids(first_id(User)),
+    "PermissionResolverService.get_role_permissions":
+        lambda: PermissionResolverService.get_role_permissions(all_role_ids()),
+    "AuthService.get_user_versions": lambda: AuthService.get_user_versions(first_id(User)),
+    "AuthService.get_jwks": lambda: AuthService.get_jwks(),
+    "TokenBlocklistService.rebuild_bloom_filter": lambda: TokenBlocklistService.rebuild_bloom_filter(),
+}
+
+def reset_state():
+    """Drop every cache and the identity map, so each call does its full amount of work."""
+    PermissionResolverService.invalidate_all()
+    EndpointPermissionService.invalidate_endpoint_map()
+    AuthService._user_versions.clear()
+    db.session.expunge_all()
+
+class TestQueryCounts:
+    """N+1 guard: a service call must run the same number of queries however many rows it returns."""
+
+    @pytest.mark.parametrize("name", sorted(SCENARIOS))
+    def test_query_count_is_independent_of_result_size(self, app, query_counter, name):
+        counts = []
+        for size in (2, 8):
+            seed(size)
+            reset_state()
+            with query_counter() as statements:
+                SCENARIOS[name]()
+            counts.append(len(statements))
+
+        assert counts[0] == counts[1], f"{name} ran {counts[0]} queries for small data but {counts[1]} for larger data"
+
+    def test_every_service_read_path_is_covered(self):
+        """New get_*/export_*/compile_* methods must be added to SCENARIOS."""
+        read_methods = {
+            f"{cls_name}.{attr}"
+            for cls_name, cls in vars(services).items() if inspect.isclass(cls)
+            for attr in vars(cls) if attr.startswith(("get_", "export_", "compile_", "rebuild_"))
+        }
+        assert sorted(read_methods - set(SCENARIOS)) == []
+
+    def test_endpoint_permission_detail_is_one_query(self, app, query_counter):
+        """The permission name is joined into the detail lookup, not lazy-loaded."""
+        seed(1)
+        reset_state()
+        endpoint_permission_id = first_id(EndpointPermission)
+        with query_counter() as statements:
+            data = EndpointPermissionService.get_endpoint_permission_by_id(endpoint_permission_id)
+        assert data["permission_name"].startswith("qc_perm")
+        assert len(statements) == 1
+
+    def test_endpoint_permission_repr_needs_no_query(self, app, query_counter):
+        """repr() reports permission_id instead of loading the permission."""
+        seed(1)
+        reset_state()
+        ep = db.session.scalar(db.select(EndpointPermission))
+        with query_counter() as statements:
+            assert f"permission_id={ep.permission_id}" in repr(ep)
+        assert statements == []
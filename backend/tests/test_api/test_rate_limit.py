@@ -0,0 +1,155 @@
+import pytest
+from app.services.rate_limit_service import RateLimitService
+from app.utils.rate_limit import MemoryRateLimitBackend, RedisRateLimitBackend
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+class FakeRedis:
+    """In-process stand-in for the redis-py calls RedisRateLimitBackend makes."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+    def decr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) - 1
+        return self.data[key]
+
+    def expire(self, key, seconds):
+        self.ttls[key] = seconds
+        return True
+
+    def get(self, key):
+        value = self.data.get(key)
+        return None if value is None else str(value).encode()
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name, args))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args) for name, args in self.calls]
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    clock = FakeClock()
+    if request.param == "memory":
+        backend = MemoryRateLimitBackend(timer=clock)
+    else:
+        backend = RedisRateLimitBackend(FakeRedis(), timer=clock)
+    backend.clock = clock
+    return backend
+
+@pytest.fixture
+def limited(app):
+    """Rate limiting switched on with small limits and the in-memory backend."""
+    app.config["RATE_LIMIT_ENABLED"] = True
+    app.config["RATE_LIMITS"] = {
+        "login_user": {"ip": [5, 60], "account": [2, 60]},
+        "forgot_password": {"ip": [3, 60]},
+    }
+    RateLimitService.init_app(app)
+    return app
+
+class TestRateLimitBackends:
+    """Tests for the sliding window counters, run against both backends."""
+
+    def test_limit_within_window(self, backend):
+        results = [backend.hit("k", 3, 60)[0] for _ in range(4)]
+        assert results == [True, True, True, False]
+
+    def test_rejected_hits_are_not_counted(self, backend):
+        """Hammering while limited does not push the reset further away."""
+        for _ in range(3):
+            backend.hit("k", 3, 60)
+        retry_after = [backend.hit("k", 3, 60)[1] for _ in range(5)]
+        assert len(set(retry_after)) == 1
+
+    def test_previous_window_decays(self, backend):
+        """The previous window's hits weigh less as the sliding window moves past them."""
+        backend.clock.now = 960.0  # start of a window
+        for _ in range(4):
+            backend.hit("k", 4, 60)
+        allowed, retry_after = backend.hit("k", 4, 60)
+        assert not allowed
+        # Halfway into the next window the previous 4 hits count as 2
+        backend.clock.now += retry_after
+        assert backend.hit("k", 4, 60)[0]
+        backend.clock.now = 960.0 + 60 + 30
+        assert [backend.hit("k", 4, 60)[0] for _ in range(2)] == [True, False]
+
+    def test_keys_are_independent(self, backend):
+        backend.hit("a", 1, 60)
+        assert not backend.hit("a", 1, 60)[0]
+        assert backend.hit("b", 1, 60)[0]
+
+    def test_hit_many_is_all_or_nothing(self, backend):
+        """A key that rejects keeps the other keys of the same call from being counted."""
+        backend.hit("full", 1, 60)
+        assert not backend.hit_many([("free", 1, 60), ("full", 1, 60)])[0]
+        assert backend.hit("free", 1, 60)[0]
+
+class TestRateLimitedEndpoints:
+    """Tests for 429 responses on the auth endpoints."""
+
+    def test_login_limited_per_account(self, client, limited):
+        """A third attempt on one account is refused before the password is checked."""
+        payload = {"email": "victim@example.com", "password": "guess"}
+        statuses = [client.post("/api/v1/auth/login", json=payload).status_code for _ in range(3)]
+        assert statuses == [401, 401, 429]
+
+        response = client.post("/api/v1/auth/login", json={"email": "VICTIM@example.com ", "password": "x"})
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+
+        # Another account from the same address still gets through until the IP limit
+        other = {"email": "other@example.com", "password": "guess"}
+        assert client.post("/api/v1/auth/login", json=other).status_code == 401
+
+    def test_account_rejection_spares_ip_budget(self, client, limited):
+        """Requests refused by the account limit don't use up the address's limit."""
+        payload = {"email": "victim@example.com", "password": "guess"}
+        statuses = [client.post("/api/v1/auth/login", json=payload).status_code for _ in range(6)]
+        assert statuses == [401, 401, 429, 429, 429, 429]
+
+        # Two of the five per-IP requests are spent; three remain for other accounts
+        statuses = [
+            client.post("/api/v1/auth/login", json={"email": f"u{i}@example.com", "password": "x"}).status_code
+            for i in range(4)
+        ]
+        assert statuses == [401, 401, 401, 429]
+
+    def test_forgot_password_limited_per_ip(self, client, limited):
+        statuses = [
+            client.post("/api/v1/auth/forgot-password", json={"email": f"u{i}@example.com"}).status_code
+            for i in range(4)
+        ]
+        assert statuses == [200, 200, 200, 429]
+        assert RateLimitService.stats()["limited"] == 1
+
+    def test_unlisted_endpoints_and_disabled_config(self, app, client):
+        """TestingConfig disables limits, and endpoints without rules are never counted."""
+        for _ in range(10):
+            assert client.post("/api/v1/auth/login", json={"email": "a@example.com", "password": "x"}).status_code == 401
+        assert RateLimitService.stats()["allowed"] == 0
+
+    def test_unknown_scope_rejected(self, app):
+        app.config["RATE_LIMITS"] = {"login_user": {"session": [1, 60]}}
+        with pytest.raises(ValueError):
+            RateLimitService.init_app(app)
@@ -0,0 +1,120 @@
+import pytest
+from sqlalchemy import event
+from app.extensions import db
+from app.models.rbac import Permission, Role, RolePermission, UserRole
+from app.models.user import User
+from app.services.permission_resolver_service import PermissionResolverService
+
+@pytest.fixture
+def rbac(app, init_database):
+    """Three roles and five permissions, none assigned."""
+    roles = [Role(name=f"role{i}") for i in range(3)]
+    permissions = [Permission(name=f"perm{i}") for i in range(5)]
+    db.session.add_all(roles + permissions)
+    db.session.commit()
+    return {
+        "user": init_database["user1"],
+        "role_ids": [role.id for role in roles],
+        "permission_ids": [permission.id for permission in permissions],
+    }
+
+@pytest.fixture
+def foreign_keys(app):
+    """Enforce foreign keys on SQLite, which leaves them off unless each connection asks."""
+    def enable(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    sqlite = db.engine.dialect.name == "sqlite"
+    if sqlite:
+        # Hand back the session's connection so every connection from here on is a new one
+        db.session.commit()
+        db.engine.dispose()
+        event.listen(db.engine, "connect", enable)
+    yield
+    if sqlite:
+        event.remove(db.engine, "connect", enable)
+        db.session.remove()
+        db.engine.dispose()
+
+class TestSetBasedAssignment:
+    """Tests for replacing a role's permissions or a user's roles in one request."""
+
+    def test_set_role_permissions_diffs(self, client, rbac):
+        """Only the difference against the current set is inserted or deleted."""
+        role_id = rbac["role_ids"][0]
+        p = rbac["permission_ids"]
+
+        first = client.put(f"/api/v1/roles/{role_id}/permissions", json={"permission_ids": p[:3]}).get_json()["data"]
+        assert first["added"] == p[:3] and first["removed"] == []
+
+        second = client.put(f"/api/v1/roles/{role_id}/permissions", json={"permission_ids": p[2:]}).get_json()["data"]
+        assert second == {"role_id": role_id, "permission_ids": p[2:], "added": p[3:], "removed": p[:2]}
+
+        stored = {rp.permission_id for rp in RolePermission.query.filter_by(role_id=role_id)}
+        assert stored == set(p[2:])
+
+    def test_sync_statement_count_does_not_grow_with_set_size(self, client, rbac, query_counter):
+        """Adding and removing many permissions takes a fixed number of statements."""
+        role_id = rbac["role_ids"][0]
+        many = [Permission(name=f"bulk{i}") for i in range(300)]
+        db.session.add_all(many)
+        db.session.commit()
+        client.put(f"/api/v1/roles/{role_id}/permissions", json={"permission_ids": rbac["permission_ids"]})
+
+        with query_counter() as statements:
+            response = client.put(f"/api/v1/roles/{role_id}/permissions", json={"permission_ids": [p.id for p in many]})
+
+        assert response.status_code == 200
+        writes = [s for s in statements if s.startswith(("INSERT INTO role_permissions", "DELETE FROM role_permissions"))]
+        assert len(writes) == 2
+        assert RolePermission.query.filter_by(role_id=role_id).count() == 300
+
+    def test_set_user_roles_bumps_version_and_invalidates(self, client, rbac):
+        """A changed role set bumps permissions_version and refreshes cached permissions."""
+        user = rbac["user"]
+        role_id = rbac["role_ids"][1]
+        client.put(f"/api/v1/roles/{role_id}/permissions", json={"permission_ids": rbac["permission_ids"][:1]})
+        assert PermissionResolverService.get_user_permissions(user.id) == frozenset()
+
+        response = client.put(f"/api/v1/users/{user.id}/roles", json={"role_ids": [role_id]})
+        assert response.get_json()["data"]["added"] == [role_id]
+        assert PermissionResolverService.get_user_permissions(user.id) == frozenset({"perm0"})
+        version = db.session.get(User, user.id).permissions_version
+        assert version == 1
+
+        # Unchanged set: nothing written, version untouched
+        assert client.put(f"/api/v1/users/{user.id}/roles", json={"role_ids": [role_id]}).status_code == 200
+        db.session.expire_all()
+        assert db.session.get(User, user.id).permissions_version == version
+
+    @pytest.mark.parametrize("url, body, status", [
+        ("/api/v1/roles/999/permissions", {"permission_ids": []}, 404),
+        ("/api/v1/users/999/roles", {"role_ids": []}, 404),
+        ("/api/v1/roles/{role}/permissions", {"permission_ids": [999]}, 400),
+        ("/api/v1/roles/{role}/permissions", {"permission_ids": "1,2"}, 400),
+    ])
+    def test_errors(self, client, rbac, url, body, status):
+        """Unknown owners are 404; unknown ids or malformed bodies are 400 and change nothing."""
+        response = client.put(url.format(role=rbac["role_ids"][0]), json=body)
+        assert response.status_code == status
+        assert RolePermission.query.count() == 0
+
+    def test_duplicate_single_assignment_is_409(self, client, rbac):
+        """The unique constraint turns a repeated assignment into a 409."""
+        payload = {"user_id": rbac["user"].id, "role_id": rbac["role_ids"][0]}
+        assert client.post("/api/v1/user-roles", json=payload).status_code == 201
+        assert client.post("/api/v1/user-roles", json=payload).status_code == 409
+        assert UserRole.query.count() == 1
+
+    @pytest.mark.parametrize("url, body, message", [
+        ("/api/v1/user-roles", {"user_id": 999, "role_id": "{role}"}, "Unknown user id: 999"),
+        ("/api/v1/user-roles", {"user_id": "{user}", "role_id": 999}, "Unknown role id: 999"),
+        ("/api/v1/role-permissions", {"role_id": 999, "permission_id": "{permission}"}, "Unknown role id: 999"),
+        ("/api/v1/role-permissions", {"role_id": "{role}", "permission_id": 999}, "Unknown permission id: 999"),
+    ])
+    def test_single_assignment_to_missing_row_is_400(self, client, rbac, foreign_keys, url, body, message):
+        """A foreign key violation names the missing row instead of posing as a duplicate."""
+        ids = {"{user}": rbac["user"].id, "{role}": rbac["role_ids"][0], "{permission}": rbac["permission_ids"][0]}
+        response = client.post(url, json={key: ids.get(value, value) for key, value in body.items()})
+        assert response.status_code == 400
+        assert response.get_json()["message"] == message
@@ -0,0 +1,54 @@
+import threading
+from app.extensions import db
+from app.models.user import User
+from app.services.password_service import PasswordService
+
+def register(client, username, email, password="securepassword123"):
+    return client.post("/api/v1/auth/register", json={"username": username, "email": email, "password": password})
+
+class TestRegistration:
+    """Tests for registration relying on the unique indexes instead of pre-check queries."""
+
+    def test_no_existence_queries(self, client, query_counter):
+        """The only statement against users is the INSERT itself."""
+        with query_counter() as statements:
+            response = register(client, "fresh", "fresh@example.com")
+        assert response.status_code == 201
+        assert response.get_json()["data"]["user"]["username"] == "fresh"
+        assert [s.split()[0] for s in statements if " users" in s] == ["INSERT"]
+
+    def test_duplicates_name_the_column(self, client, init_database):
+        taken_username = register(client, "test_user1", "new@example.com").get_json()
+        taken_email = register(client, "new_user", "test1@example.com").get_json()
+        assert taken_username["message"] == "Username already exists"
+        assert taken_email["message"] == "Email already exists"
+        assert User.query.count() == 2
+
+    def test_invalid_input_is_rejected_before_hashing(self, client):
+        for username, email in (("bad", "not-an-email"), ("x" * 65, "long@example.com"), ("", "a@example.com")):
+            assert register(client, username, email).status_code == 400
+        assert PasswordService.stats()["completed"] == 0
+
+    def test_concurrent_registrations_of_one_username(self, app):
+        """Exactly one of many simultaneous sign-ups for a username wins; the rest get a 400."""
+        db.session.commit()
+        threads = 6
+        barrier = threading.Barrier(threads)
+        results = [None] * threads
+
+        def attempt(i):
+            client = app.test_client()
+            barrier.wait()
+            response = register(client, "contested", f"contested{i}@example.com")
+            results[i] = (response.status_code, response.get_json()["message"])
+
+        workers = [threading.Thread(target=attempt, args=(i,)) for i in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        assert sorted(status for status, _ in results) == [201] + [400] * (threads - 1)
+        assert {message for status, message in results if status == 400} == {"Username already exists"}
+        db.session.expire_all()
+        assert User.query.filter_by(username="contested").count() == 1
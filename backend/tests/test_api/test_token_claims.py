@@ -0,0 +1,107 @@
+import json
+import jwt
+import pytest
+from werkzeug.security import generate_password_hash
+from app.extensions import db
+from app.models.user import User
+from app.services.permission_resolver_service import PermissionResolverService
+
+@pytest.fixture
+def claims_app(app):
+    app.config["JWT_EMBED_CLAIMS"] = True
+    yield app
+    app.config["JWT_EMBED_CLAIMS"] = False
+
+@pytest.fixture
+def claims_user(claims_app, post_json):
+    """A user granted 'roles:read', which guards GET /roles."""
+    user = User(username="claims_user", email="claims@example.com", password_hash=generate_password_hash("password123"))
+    db.session.add(user)
+    db.session.commit()
+
+    role = post_json("/api/v1/roles", {"name": "reader"})
+    permission = post_json("/api/v1/permissions", {"name": "roles:read"})
+    post_json("/api/v1/role-permissions", {"role_id": role["id"], "permission_id": permission["id"]})
+    post_json("/api/v1/user-roles", {"user_id": user.id, "role_id": role["id"]})
+    post_json("/api/v1/endpoint-permissions", {"endpoint_name": "get_roles", "permission_id": permission["id"]})
+
+    tokens = post_json("/api/v1/auth/login", {"email": "claims@example.com", "password": "password123"})
+    return {"user_id": user.id, "role": role, "headers": {"Authorization": f"Bearer {tokens['access_token']}"}, "tokens": tokens}
+
+class TestTokenClaims:
+    """Tests for the opt-in claims mode of access tokens."""
+
+    def test_access_token_carries_claims(self, claims_user):
+        payload = jwt.decode(claims_user["tokens"]["access_token"], options={"verify_signature": False})
+        assert payload["clm"] == {"v": 1, "act": True, "rid": [claims_user["role"]["id"]], "pv": 1, "tv": 0}
+
+    def test_authorization_skips_user_tables(self, client, claims_user, query_counter):
+        """With warm version and role caches, a guarded request never reads users or user_roles."""
+        assert client.get("/api/v1/roles", headers=claims_user["headers"]).status_code == 200
+        PermissionResolverService._cache.clear()
+
+        with query_counter() as statements:
+            assert client.get("/api/v1/roles", headers=claims_user["headers"]).status_code == 200
+
+        assert not [s for s in statements if "user_roles" in s or "FROM users" in s]
+
+    def test_logout_all_invalidates_tokens(self, client, claims_user):
+        response = client.post("/api/v1/auth/logout-all", headers=claims_user["headers"])
+        assert response.status_code == 200
+
+        assert client.get("/api/v1/auth/me", headers=claims_user["headers"]).status_code == 401
+        response = client.post(
+            "/api/v1/auth/refresh",
+            data=json.dumps({"refresh_token": claims_user["tokens"]["refresh_token"]}),
+            content_type="application/json"
+        )
+        assert response.status_code == 401
+
+    def test_deactivated_user_rejected(self, client, claims_user):
+        response = client.put(
+            f"/api/v1/users/{claims_user['user_id']}",
+            data=json.dumps({"is_active": False}),
+            content_type="application/json"
+        )
+        assert response.status_code == 200
+        assert client.get("/api/v1/auth/me", headers=claims_user["headers"]).status_code == 401
+
+    def test_role_change_makes_embedded_roles_stale(self, client, claims_user):
+        """After a role is removed, the token's role ids are ignored and access is denied."""
+        response = client.delete(f"/api/v1/user-roles?user_id={claims_user['user_id']}&role_id={claims_user['role']['id']}")
+        assert response.status_code == 200
+        assert client.get("/api/v1/roles", headers=claims_user["headers"]).status_code == 403
+
+    def test_versions_not_writable_through_update(self, client, claims_user):
+        response = client.put(
+            f"/api/v1/users/{claims_user['user_id']}",
+            data=json.dumps({"token_version": 0, "permissions_version": 1, "username": "renamed"}),
+            content_type="application/json"
+        )
+        assert response.status_code == 200
+        user = db.session.get(User, claims_user["user_id"])
+        assert user.username == "renamed"
+        assert (user.token_version, user.permissions_version) == (0, 1)
+
+        client.post("/api/v1/auth/logout-all", headers=claims_user["headers"])
+        client.put(
+            f"/api/v1/users/{claims_user['user_id']}",
+            data=json.dumps({"token_version": 0}),
+            content_type="application/json"
+        )
+        db.session.refresh(user)
+        assert user.token_version == 1
+
+def test_logout_all_refused_without_claims(client, app, post_json):
+    """Non-claims tokens carry no version to revoke, so logout-all must not report success."""
+    user = User(username="plain_user", email="plain@example.com", password_hash=generate_password_hash("password123"))
+    db.session.add(user)
+    db.session.commit()
+    tokens = post_json("/api/v1/auth/login", {"email": "plain@example.com", "password": "password123"})
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    response = client.post("/api/v1/auth/logout-all", headers=headers)
+    assert response.status_code == 409
+    db.session.refresh(user)
+    assert user.token_version == 0
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
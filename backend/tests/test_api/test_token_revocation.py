@@ -0,0 +1,192 @@
+import pytest
+from unittest.mock import patch
+from datetime import datetime, timedelta
+from werkzeug.security import generate_password_hash
+from app.extensions import db
+from app.models.user import User
+from app.models.token_blocklist import TokenBlocklist
+from app.services.auth_service import AuthService
+from app.services.token_blocklist_service import TokenBlocklistService
+
+@pytest.fixture
+def access_token(app):
+    TokenBlocklistService.clear_cache()
+    user = User(
+        username="cached_user",
+        email="cached@example.com",
+        password_hash=generate_password_hash("password123")
+    )
+    db.session.add(user)
+    db.session.commit()
+    return AuthService.generate_access_token(user.id)
+
+class TestTokenRevocationCache:
+    """Tests for the revocation cache in front of TokenBlocklist."""
+
+    def test_repeated_requests_skip_blocklist_query(self, client, access_token, query_counter):
+        """Only the first authenticated request should query the blocklist."""
+        headers = {"Authorization": f"Bearer {access_token}"}
+
+        assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+
+        with query_counter() as statements:
+            for _ in range(5):
+                response = client.get("/api/v1/auth/me", headers=headers)
+                assert response.status_code == 200
+
+        assert not [s for s in statements if "token_blocklist" in s]
+
+    def test_logout_populates_cache(self, client, access_token, query_counter):
+        """A logged-out token is rejected without another blocklist query."""
+        headers = {"Authorization": f"Bearer {access_token}"}
+
+        assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+        assert client.post("/api/v1/auth/logout", headers=headers).status_code == 200
+
+        with query_counter() as statements:
+            response = client.get("/api/v1/auth/me", headers=headers)
+        assert response.status_code == 401
+        assert not [s for s in statements if "token_blocklist" in s]
+
+    def test_revoked_token_loaded_from_database(self, client, access_token):
+        """A revocation stored before the cache was warm is still honoured."""
+        headers = {"Authorization": f"Bearer {access_token}"}
+        assert client.post("/api/v1/auth/logout", headers=headers).status_code == 200
+
+        TokenBlocklistService.clear_cache()
+
+        assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
+        assert TokenBlocklistService.stats()["revoked_cache"]["size"] == 1
+
+    def test_bloom_filter_answers_unrevoked_tokens(self, client, access_token, query_counter):
+        """Once the filter is built, unrevoked tokens never reach token_blocklist."""
+        headers = {"Authorization": f"Bearer {access_token}"}
+        TokenBlocklistService.rebuild_bloom_filter()
+
+        with query_counter() as statements:
+            response = client.get("/api/v1/auth/me", headers=headers)
+        assert response.status_code == 200
+        assert not [s for s in statements if "token_blocklist" in s]
+
+        assert TokenBlocklistService.stats()["bloom"]["negatives"] == 1
+
+        response = client.get("/api/v1/metrics", headers=headers)
+        bloom = response.get_json()["data"]["token_blocklist"]["bloom"]
+        assert bloom["filter"]["memory_bytes"] > 0
+
+    def test_bloom_filter_includes_revocations(self, client, access_token):
+        """Rebuilding the filter picks up rows already in token_blocklist."""
+        headers = {"Authorization": f"Bearer {access_token}"}
+        assert client.post("/api/v1/auth/logout", headers=headers).status_code == 200
+
+        TokenBlocklistService.clear_cache()
+        bloom = TokenBlocklistService.rebuild_bloom_filter()
+
+        assert len(bloom) == 1
+        assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
+        assert TokenBlocklistService.stats()["bloom"]["true_positives"] == 1
+
+    def test_other_workers_revocations_seen_within_negative_ttl(self, client, access_token):
+        """A row written by another process is picked up by the next sync, not the next rebuild."""
+        headers = {"Authorization": f"Bearer {access_token}"}
+        TokenBlocklistService.rebuild_bloom_filter()
+        payload = AuthService.decode_token(access_token)
+        db.session.add(TokenBlocklist(
+            jti=payload["jti"], token_type="access", user_id=int(payload["sub"]),
+            expires_at=datetime.now() + timedelta(hours=1)
+        ))
+        db.session.commit()
+
+        # Once the filter is older than the negative TTL it isn't trusted until the job syncs it
+        TokenBlocklistService._bloom_synced_at -= TokenBlocklistService._negative_ttl + 1
+        assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
+        assert TokenBlocklistService.stats()["bloom"]["syncs"] == 0
+
+        assert TokenBlocklistService.refresh_bloom_filter() == {"synced": 1}
+        assert payload["jti"] in TokenBlocklistService._bloom
+
+    def test_revocation_during_rebuild_is_kept(self, app, access_token, monkeypatch):
+        """A revocation recorded while the rebuild query runs is merged into the new filter."""
+        import app.services.token_blocklist_service as module
+
+        class RevokeWhileBuilding(module.BloomFilter):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                TokenBlocklistService._remember_revoked("concurrent-jti", datetime.now().timestamp() + 3600)
+
+        monkeypatch.setattr(module, "BloomFilter", RevokeWhileBuilding)
+        bloom = TokenBlocklistService.rebuild_bloom_filter()
+        assert "concurrent-jti" in bloom
+
+    def test_requests_never_build_the_filter(self, client, access_token, monkeypatch):
+        """Building and syncing is left to the background job; a failed run leaves requests on the database."""
+        from sqlalchemy.exc import OperationalError
+        calls = []
+        def failing_rebuild():
+            calls.append(1)
+            raise OperationalError("SELECT", {}, Exception("database unavailable"))
+        monkeypatch.setattr(TokenBlocklistService, "rebuild_bloom_filter", failing_rebuild)
+
+        with pytest.raises(OperationalError):
+            TokenBlocklistService.refresh_bloom_filter()
+        assert TokenBlocklistService.stats()["bloom"]["failures"] == 1
+
+        headers = {"Authorization": f"Bearer {access_token}"}
+        for _ in range(3):
+            assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+            TokenBlocklistService._not_revoked.clear()
+        assert len(calls) == 1
+        assert TokenBlocklistService.stats()["bloom"]["checks"] == 0
+
+class TestBlocklistPurge:
+    """Tests for purging expired token_blocklist rows."""
+
+    def test_purge_removes_only_expired_rows(self, runner, init_database):
+        """Expired rows are deleted in batches; live revocations are kept."""
+        user_id = init_database["user1"].id
+        now = datetime.now()
+        for i in range(5):
+            db.session.add(TokenBlocklist(
+                jti=f"expired-{i}", token_type="access", user_id=user_id,
+                expires_at=now - timedelta(minutes=1)
+            ))
+        db.session.add(TokenBlocklist(
+            jti="live", token_type="access", user_id=user_id,
+            expires_at=now + timedelta(hours=1)
+        ))
+        db.session.commit()
+
+        result = runner.invoke(args=["blocklist", "purge", "--batch-size", "2"])
+
+        assert result.exit_code == 0
+        assert "Purged 5 rows in 3 batches" in result.output
+        assert [row.jti for row in TokenBlocklist.query.all()] == ["live"]
+        assert TokenBlocklistService.stats()["last_purge"]["purged"] == 5
+
+class TestDecodedTokenCache:
+    """Tests for the LRU of verified token payloads."""
+
+    def test_repeated_token_decoded_once(self, client, access_token):
+        headers = {"Authorization": f"Bearer {access_token}"}
+
+        with patch.object(AuthService, "decode_token", wraps=AuthService.decode_token) as decode:
+            for _ in range(3):
+                assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+
+        assert decode.call_count == 1
+        assert AuthService.token_cache_stats()["hits"] == 2
+
+    def test_cached_payload_is_read_only(self, app, access_token):
+        """Callers share the cached payload, so none of them can change it for the next request."""
+        payload = AuthService.validate_token(access_token)
+        with pytest.raises(TypeError):
+            payload["sub"] = "0"
+        assert AuthService.validate_token(access_token) is payload
+
+    def test_logout_drops_cached_payload(self, client, access_token):
+        headers = {"Authorization": f"Bearer {access_token}"}
+        assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+        assert client.post("/api/v1/auth/logout", headers=headers).status_code == 200
+
+        assert AuthService.token_cache_stats()["size"] == 0
+        assert client.get("/api/v1/auth/me", headers=headers).status_code == 401